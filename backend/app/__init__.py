@@ -1,9 +1,12 @@
 # setting up flask
 from flask import Flask
 from flask_cors import CORS
+from app.startup import startup_timer
 
 
-def create_app():
+def create_app(background_init: bool = True):
+    # background_init: build the game service in a background thread right away
+    # (see /api/ready); when off it is built synchronously on the first game request
     app = Flask(__name__)
     
     # Enable CORS for frontend communication
@@ -17,7 +20,13 @@ def create_app():
     ], supports_credentials=True)
     
     # Register blueprints to make the app modular
-    from app.routes import game_bp
+    # (the ML stack is imported lazily, so this stays cheap; see /api/startup)
+    with startup_timer.phase('routes_import'):
+        from app.routes import game_bp
     app.register_blueprint(game_bp, url_prefix='/api')
+
+    if background_init:
+        from app.routes import start_background_init
+        start_background_init()
     
     return app
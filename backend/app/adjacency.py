@@ -0,0 +1,346 @@
+import threading
+from typing import Dict, List, Iterator, Set, Tuple
+from collections.abc import Mapping
+import numpy as np
+
+
+_EMPTY_NODES = np.zeros(0, dtype=np.int64)
+_EMPTY_INDPTR = np.zeros(1, dtype=np.int64)
+_EMPTY_INDICES = np.zeros(0, dtype=np.int32)
+
+
+def _gather_rows(indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray, nodes: np.ndarray):
+    # every entry of CSR rows `rows` as (neighbors, sources), sources taken from `nodes`
+    # (the node id each row belongs to)
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    # position of every edge in `indices`: each row's start offset plus a running counter
+    row_offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return (indices[row_offsets + np.arange(total)].astype(np.int64),
+            np.repeat(nodes, lengths).astype(np.int64))
+
+
+def _overlay_insert(nodes: np.ndarray, indptr: np.ndarray, indices: np.ndarray,
+                    sources: np.ndarray, targets: np.ndarray):
+    # overlay CSR with extra entries source -> target, without re-sorting the existing ones:
+    # only the new entries are sorted, then appended to the end of their node's row
+    # (rows of nodes not in the overlay yet are inserted in place)
+    order = np.lexsort((targets, sources))
+    sources, targets = sources[order], targets[order]
+    new_nodes, new_counts = np.unique(sources, return_counts=True)
+    # each new entry goes right after the last entry of its row, or where its row would start
+    positions = indptr[np.searchsorted(nodes, sources, side='right')]
+    indices = np.insert(indices, positions, targets.astype(np.int32))
+
+    # nodes without a row yet get an empty one, then every touched row grows by its new entries
+    rows = np.minimum(np.searchsorted(nodes, new_nodes), max(len(nodes) - 1, 0))
+    missing = new_nodes[nodes[rows] != new_nodes] if len(nodes) else new_nodes
+    missing_rows = np.searchsorted(nodes, missing)
+    nodes = np.insert(nodes, missing_rows, missing)
+    counts = np.insert(np.diff(indptr), missing_rows, 0)
+    counts[np.searchsorted(nodes, new_nodes)] += new_counts
+    return nodes.astype(np.int64), np.concatenate([[0], np.cumsum(counts)]).astype(np.int64), indices
+
+
+class AdjacencySnapshot:
+    # immutable state of a CSRAdjacency: CSR arrays plus the overlay at one point in time
+    # readers take one snapshot and traverse it without locks while writers publish new ones
+    # the overlay is a second, small CSR keyed by a sorted array of node ids, so frontier
+    # rows are selected with searchsorted just like the main arrays
+
+    __slots__ = ('indptr', 'indices', 'overlay_nodes', 'overlay_indptr', 'overlay_indices', 'num_nodes')
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, overlay_nodes: np.ndarray,
+                 overlay_indptr: np.ndarray, overlay_indices: np.ndarray, num_nodes: int):
+        # overlay_nodes[i] owns overlay_indices[overlay_indptr[i]:overlay_indptr[i + 1]],
+        # never modified once published
+        self.indptr = indptr
+        self.indices = indices
+        self.overlay_nodes = overlay_nodes
+        self.overlay_indptr = overlay_indptr
+        self.overlay_indices = overlay_indices
+        self.num_nodes = num_nodes
+
+    @property
+    def overlay_edges(self) -> int:
+        # directed overlay entries (two per undirected edge)
+        return len(self.overlay_indices)
+
+    @property
+    def num_edges(self) -> int:
+        # number of undirected edges
+        return (len(self.indices) + self.overlay_edges) // 2
+
+    def overlay_rows(self, nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # (overlay row of each node that has one, mask of those nodes)
+        positions = np.searchsorted(self.overlay_nodes, nodes)
+        positions = np.minimum(positions, len(self.overlay_nodes) - 1)
+        found = self.overlay_nodes[positions] == nodes
+        return positions[found], found
+
+    def neighbors(self, node: int) -> np.ndarray:
+        # neighbor ids of a node as an int32 array
+        indptr = self.indptr
+        if node + 1 < len(indptr):
+            base = self.indices[indptr[node]:indptr[node + 1]]
+        else:
+            base = self.indices[:0]
+        if len(self.overlay_nodes):
+            position = int(np.searchsorted(self.overlay_nodes, node))
+            if position < len(self.overlay_nodes) and self.overlay_nodes[position] == node:
+                extra = self.overlay_indices[self.overlay_indptr[position]:self.overlay_indptr[position + 1]]
+                return np.concatenate([base, extra])
+        return base
+
+    def degrees(self) -> np.ndarray:
+        # degree of every node
+        indptr = self.indptr
+        degrees = np.zeros(max(self.num_nodes, len(indptr) - 1), dtype=np.int64)
+        degrees[:len(indptr) - 1] = np.diff(indptr)
+        degrees[self.overlay_nodes] += np.diff(self.overlay_indptr)
+        return degrees
+
+    def has_edge(self, source: int, target: int) -> bool:
+        return bool(np.any(self.neighbors(source) == target))
+
+    def expand(self, frontier: np.ndarray):
+        # expand a whole BFS level at once (sparse matrix x sparse frontier vector)
+        # returns (neighbors, sources): every edge leaving the frontier as two parallel arrays
+        csr_frontier = frontier[frontier < len(self.indptr) - 1]
+        neighbors, sources = _gather_rows(self.indptr, self.indices, csr_frontier, csr_frontier)
+        if len(self.overlay_nodes) == 0:
+            return neighbors, sources
+
+        # overlay rows of frontier nodes, gathered the same way
+        rows, found = self.overlay_rows(frontier)
+        extra_neighbors, extra_sources = _gather_rows(self.overlay_indptr, self.overlay_indices,
+                                                      rows, frontier[found])
+        return np.concatenate([neighbors, extra_neighbors]), np.concatenate([sources, extra_sources])
+
+
+class CSRAdjacency:
+    # compact undirected adjacency over integer node ids
+    # bulk-loaded edges live in CSR form: indptr (int64) and int32 neighbor ids,
+    # so each edge costs 4 bytes per direction instead of a Python string in a set
+    # edges added one word at a time at runtime go to a small overlay
+    # that gets merged into the CSR arrays once it grows past merge_threshold
+    # (or 1/8 of the CSR size, so merge cost stays amortized O(1) per edge)
+    #
+    # copy-on-write: all state sits in an immutable AdjacencySnapshot that writers replace
+    # in a single assignment (arrays are rebuilt; small inserts copy the overlay CSR around
+    # their new entries instead of re-sorting it), so readers never lock and never see a
+    # half-applied update; writers are serialized
+
+    def __init__(self, merge_threshold: int = 4096):
+        self.merge_threshold = merge_threshold
+        self._write_lock = threading.RLock()
+        self._snapshot = AdjacencySnapshot(np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32),
+                                           _EMPTY_NODES, _EMPTY_INDPTR, _EMPTY_INDICES, 0)
+
+    @classmethod
+    def from_csr(cls, indptr: np.ndarray, indices: np.ndarray, merge_threshold: int = 4096) -> 'CSRAdjacency':
+        # wrap existing CSR arrays (e.g. memory-mapped from an artifact bundle) without copying
+        # merges always build new arrays, so the given buffers are never written
+        adjacency = cls(merge_threshold)
+        adjacency._snapshot = AdjacencySnapshot(indptr, indices, _EMPTY_NODES, _EMPTY_INDPTR, _EMPTY_INDICES,
+                                                len(indptr) - 1)
+        return adjacency
+
+    def snapshot(self) -> AdjacencySnapshot:
+        # current state, safe to traverse while writers keep adding edges
+        return self._snapshot
+
+    @property
+    def indptr(self) -> np.ndarray:
+        return self._snapshot.indptr
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self._snapshot.indices
+
+    @property
+    def overlay(self) -> Dict[int, Tuple[int, ...]]:
+        # overlay as node id -> extra neighbor ids (for inspection, traversals use the arrays)
+        snapshot = self._snapshot
+        indptr = snapshot.overlay_indptr
+        return {
+            node: tuple(snapshot.overlay_indices[indptr[i]:indptr[i + 1]].tolist())
+            for i, node in enumerate(snapshot.overlay_nodes.tolist())
+        }
+
+    @property
+    def num_nodes(self) -> int:
+        return self._snapshot.num_nodes
+
+    @property
+    def num_edges(self) -> int:
+        # number of undirected edges
+        return self._snapshot.num_edges
+
+    @property
+    def nbytes(self) -> int:
+        # memory held by the adjacency arrays, overlay included
+        snapshot = self._snapshot
+        return sum(array.nbytes for array in (snapshot.indptr, snapshot.indices, snapshot.overlay_nodes,
+                                              snapshot.overlay_indptr, snapshot.overlay_indices))
+
+    def ensure_nodes(self, num_nodes: int):
+        # make room for node ids up to num_nodes - 1
+        with self._write_lock:
+            snapshot = self._snapshot
+            if num_nodes > snapshot.num_nodes:
+                self._publish(snapshot.indptr, snapshot.indices, *self._overlay_arrays(snapshot), num_nodes)
+
+    def add_edges(self, sources: np.ndarray, targets: np.ndarray, bulk: bool = False) -> int:
+        # add undirected edges source[i] <-> target[i], returns the number of edges added
+        # callers only pass edges that touch newly added nodes, so edges are never duplicated
+        # bulk=True merges straight into the CSR arrays (used for batch loads)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if len(sources) == 0:
+            return 0
+
+        with self._write_lock:
+            self.ensure_nodes(int(max(sources.max(), targets.max())) + 1)
+            if bulk:
+                self._merge(sources, targets)
+                return len(sources)
+
+            # insert both directions of the new edges into the overlay CSR: only the new
+            # entries are sorted, the existing overlay is copied around them, so a small
+            # commit stays cheap even while the overlay holds up to 1/8 of the CSR size
+            snapshot = self._snapshot
+            overlay = _overlay_insert(*self._overlay_arrays(snapshot),
+                                      np.concatenate([sources, targets]), np.concatenate([targets, sources]))
+            self._publish(snapshot.indptr, snapshot.indices, *overlay, snapshot.num_nodes)
+            if len(overlay[2]) >= max(self.merge_threshold, len(snapshot.indices) // 8):
+                self.compact()
+
+        return len(sources)
+
+    def neighbors(self, node: int) -> np.ndarray:
+        # neighbor ids of a node as an int32 array
+        return self._snapshot.neighbors(node)
+
+    def degrees(self) -> np.ndarray:
+        # degree of every node
+        return self._snapshot.degrees()
+
+    def has_edge(self, source: int, target: int) -> bool:
+        return self._snapshot.has_edge(source, target)
+
+    def expand(self, frontier: np.ndarray):
+        # every edge leaving a BFS frontier, see AdjacencySnapshot.expand
+        return self._snapshot.expand(frontier)
+
+    def compact(self):
+        # merge the overlay into the CSR arrays (published together, so no reader sees
+        # an edge twice or misses one)
+        with self._write_lock:
+            snapshot = self._snapshot
+            if snapshot.overlay_edges == 0:
+                return
+            # overlay already holds both directions
+            sources, targets = self._overlay_edge_arrays(snapshot)
+            self._merge(sources, targets, symmetric=False, drop_overlay=True)
+
+    def csr(self):
+        # CSR arrays covering every node, with the overlay merged in
+        with self._write_lock:
+            self.compact()
+            snapshot = self._snapshot
+            if len(snapshot.indptr) - 1 < snapshot.num_nodes:
+                self._pad_indptr()
+            snapshot = self._snapshot
+            return snapshot.indptr, snapshot.indices
+
+    def freeze(self):
+        # merge the overlay and mark the CSR arrays read-only, so forked workers share them
+        # later merges build new (private) arrays and never write the frozen ones
+        indptr, indices = self.csr()
+        indptr.flags.writeable = False
+        indices.flags.writeable = False
+
+    @property
+    def frozen_nbytes(self) -> int:
+        # bytes in read-only CSR arrays
+        snapshot = self._snapshot
+        return sum(array.nbytes for array in (snapshot.indptr, snapshot.indices) if not array.flags.writeable)
+
+    def _publish(self, indptr: np.ndarray, indices: np.ndarray, overlay_nodes: np.ndarray,
+                 overlay_indptr: np.ndarray, overlay_indices: np.ndarray, num_nodes: int):
+        self._snapshot = AdjacencySnapshot(indptr, indices, overlay_nodes, overlay_indptr, overlay_indices,
+                                           num_nodes)
+
+    @staticmethod
+    def _overlay_arrays(snapshot: AdjacencySnapshot):
+        return snapshot.overlay_nodes, snapshot.overlay_indptr, snapshot.overlay_indices
+
+    @staticmethod
+    def _overlay_edge_arrays(snapshot: AdjacencySnapshot) -> Tuple[np.ndarray, np.ndarray]:
+        # overlay entries as parallel (source, target) arrays
+        sources = np.repeat(snapshot.overlay_nodes, np.diff(snapshot.overlay_indptr))
+        return sources, snapshot.overlay_indices.astype(np.int64)
+
+    def _merge(self, sources: np.ndarray, targets: np.ndarray, symmetric: bool = True, drop_overlay: bool = False):
+        # rebuild the CSR arrays with extra edges (one counting sort, O(E))
+        if symmetric:
+            sources, targets = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+
+        snapshot = self._snapshot
+        indptr, indices = snapshot.indptr, snapshot.indices
+        csr_nodes = len(indptr) - 1
+        existing_sources = np.repeat(np.arange(csr_nodes, dtype=np.int64), np.diff(indptr))
+        all_sources = np.concatenate([existing_sources, sources])
+        all_targets = np.concatenate([indices.astype(np.int64), targets])
+
+        order = np.lexsort((all_targets, all_sources))
+        counts = np.bincount(all_sources, minlength=snapshot.num_nodes)
+        overlay = ((_EMPTY_NODES, _EMPTY_INDPTR, _EMPTY_INDICES) if drop_overlay
+                   else self._overlay_arrays(snapshot))
+        self._publish(
+            np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+            all_targets[order].astype(np.int32),
+            *overlay,
+            snapshot.num_nodes
+        )
+
+    def _pad_indptr(self):
+        # extend indptr with empty rows for nodes without CSR edges
+        snapshot = self._snapshot
+        indptr = snapshot.indptr
+        missing = snapshot.num_nodes - (len(indptr) - 1)
+        self._publish(
+            np.concatenate([indptr, np.full(missing, indptr[-1], dtype=np.int64)]),
+            snapshot.indices,
+            *self._overlay_arrays(snapshot),
+            snapshot.num_nodes
+        )
+
+
+class GraphView(Mapping):
+    # read-only word -> set of neighbor words mapping over a CSRAdjacency
+    # only words with at least one neighbor are listed, like the old defaultdict(set)
+
+    def __init__(self, adjacency: CSRAdjacency, index: Dict[str, int], words: List[str]):
+        # index / words: the live word -> id and id -> word lookups of the embedding matrix
+        self._adjacency = adjacency
+        self._index = index
+        self._words = words
+
+    def __getitem__(self, word: str) -> Set[str]:
+        node = self._index.get(word)
+        if node is None:
+            raise KeyError(word)
+        neighbors = self._adjacency.neighbors(node)
+        if len(neighbors) == 0:
+            raise KeyError(word)
+        return {self._words[i] for i in neighbors.tolist()}
+
+    def __iter__(self) -> Iterator[str]:
+        for node in np.nonzero(self._adjacency.degrees())[0].tolist():
+            yield self._words[node]
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._adjacency.degrees()))
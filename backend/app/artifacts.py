@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import List, Dict, Optional, NamedTuple, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# bump when the bundle layout changes so old bundles are rebuilt instead of misread
+# (2: the manifest records the embedding backend)
+ARTIFACT_FORMAT_VERSION = 2
+
+MANIFEST_FILE = 'manifest.json'
+VOCAB_FILE = 'vocab.json'
+EMBEDDINGS_FILE = 'embeddings.npy'
+INDPTR_FILE = 'indptr.npy'
+INDICES_FILE = 'indices.npy'
+PUZZLES_FILE = 'puzzles.json'
+LANDMARKS_FILE = 'landmarks.npy'
+LANDMARK_DISTANCES_FILE = 'landmark_distances.npy'
+
+
+class ArtifactBundle(NamedTuple):
+    # prebuilt vocabulary embeddings and CSR graph (plus optional puzzles and landmark tables)
+    manifest: Dict
+    words: List[str]
+    embeddings: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    puzzles: List[Dict]
+    landmark_ids: Optional[np.ndarray] = None
+    landmark_distances: Optional[np.ndarray] = None
+
+
+def vocab_hash(words: List[str]) -> str:
+    # stable hash of a vocabulary, independent of order and case
+    normalized = sorted({word.lower().strip() for word in words})
+    return hashlib.sha256('\n'.join(normalized).encode('utf-8')).hexdigest()
+
+
+def save_bundle(path: str, words: List[str], embeddings: np.ndarray, indptr: np.ndarray, indices: np.ndarray,
+                model_name: str, similarity_threshold: float, vocabulary: List[str],
+                puzzles: Optional[List[Dict]] = None,
+                landmarks: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                embedding_backend: str = 'torch') -> Dict:
+    # write an artifact bundle to a directory
+    # words / embeddings / indptr / indices: graph contents, row i of embeddings is words[i]
+    # vocabulary: the word list the bundle was built from (hashed into the manifest)
+    # landmarks: (landmark ids, uint8 distance tables) from SemanticGraph.export_landmarks
+    # embedding_backend: backend the embeddings came from (onnx vectors differ slightly from torch)
+    # the manifest is written last, so a bundle without one is incomplete and ignored
+    os.makedirs(path, exist_ok=True)
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    np.save(os.path.join(path, EMBEDDINGS_FILE), np.ascontiguousarray(embeddings, dtype=np.float32))
+    np.save(os.path.join(path, INDPTR_FILE), np.asarray(indptr, dtype=np.int64))
+    np.save(os.path.join(path, INDICES_FILE), np.asarray(indices, dtype=np.int32))
+    with open(os.path.join(path, VOCAB_FILE), 'w', encoding='utf-8') as f:
+        json.dump(list(words), f)
+    if puzzles is not None:
+        with open(os.path.join(path, PUZZLES_FILE), 'w', encoding='utf-8') as f:
+            json.dump(puzzles, f)
+    if landmarks is not None:
+        np.save(os.path.join(path, LANDMARKS_FILE), np.asarray(landmarks[0], dtype=np.int32))
+        np.save(os.path.join(path, LANDMARK_DISTANCES_FILE), np.ascontiguousarray(landmarks[1], dtype=np.uint8))
+
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'model_name': model_name,
+        'embedding_backend': embedding_backend,
+        'embedding_dim': int(embeddings.shape[1]),
+        'similarity_threshold': similarity_threshold,
+        'vocab_hash': vocab_hash(vocabulary),
+        'word_count': len(words),
+        'edge_count': int(len(indices)) // 2,
+        'puzzle_count': len(puzzles) if puzzles is not None else 0,
+        'landmark_count': len(landmarks[0]) if landmarks is not None else 0,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(f"Wrote artifact bundle to {path}: {manifest['word_count']} words, {manifest['edge_count']} edges")
+    return manifest
+
+
+def read_manifest(path: str) -> Optional[Dict]:
+    # read a bundle's manifest, None if the bundle is missing or incomplete
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def bundle_mismatch(manifest: Dict, model_name: str, similarity_threshold: float, vocabulary: List[str],
+                    embedding_backend: str = 'torch') -> Optional[str]:
+    # explain why a bundle can't be used for this configuration, None if it matches
+    # (runtime words are encoded with the service's backend, so the bundle's must match)
+    if manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        return f"format version {manifest.get('format_version')} != {ARTIFACT_FORMAT_VERSION}"
+    if manifest.get('model_name') != model_name:
+        return f"model {manifest.get('model_name')} != {model_name}"
+    if manifest.get('embedding_backend') != embedding_backend:
+        return f"embedding backend {manifest.get('embedding_backend')} != {embedding_backend}"
+    if abs(manifest.get('similarity_threshold', -1.0) - similarity_threshold) > 1e-9:
+        return f"threshold {manifest.get('similarity_threshold')} != {similarity_threshold}"
+    if manifest.get('vocab_hash') != vocab_hash(vocabulary):
+        return "vocabulary hash differs"
+    return None
+
+
+def load_bundle(path: str, mmap: bool = True) -> ArtifactBundle:
+    # load an artifact bundle; arrays are memory-mapped read-only by default,
+    # so startup costs a page-in instead of an embedding pass
+    manifest = read_manifest(path)
+    if manifest is None:
+        raise FileNotFoundError(f"No artifact manifest in {path}")
+
+    mmap_mode = 'r' if mmap else None
+    embeddings = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode=mmap_mode)
+    indptr = np.load(os.path.join(path, INDPTR_FILE), mmap_mode=mmap_mode)
+    indices = np.load(os.path.join(path, INDICES_FILE), mmap_mode=mmap_mode)
+    with open(os.path.join(path, VOCAB_FILE), 'r', encoding='utf-8') as f:
+        words = json.load(f)
+
+    puzzles = []
+    puzzles_path = os.path.join(path, PUZZLES_FILE)
+    if os.path.exists(puzzles_path):
+        with open(puzzles_path, 'r', encoding='utf-8') as f:
+            puzzles = json.load(f)
+
+    landmark_ids = landmark_distances = None
+    if manifest.get('landmark_count') and os.path.exists(os.path.join(path, LANDMARK_DISTANCES_FILE)):
+        landmark_ids = np.load(os.path.join(path, LANDMARKS_FILE))
+        landmark_distances = np.load(os.path.join(path, LANDMARK_DISTANCES_FILE), mmap_mode=mmap_mode)
+
+    return ArtifactBundle(manifest, words, embeddings, indptr, indices, puzzles,
+                          landmark_ids, landmark_distances)
@@ -0,0 +1,140 @@
+import time
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class BucketedEncoder:
+    # bulk encoding with inputs grouped by tokenized length
+    # words and short phrases tokenize to a handful of lengths (mostly 3-5 tokens with
+    # [CLS]/[SEP]), so every model batch is cut from a single length bucket and needs no padding
+    # the batch size is calibrated once, on the first large enough bulk call, by encoding
+    # consecutive chunks of real input at each candidate size and keeping the fastest per item
+    # (the calibration chunks are part of the workload, so their embeddings are kept)
+    # one untimed warm-up chunk goes first, then every candidate is timed CALIBRATION_REPEATS
+    # times in interleaved rounds and scored by its best run, so a cold cache or a noisy
+    # neighbour on one run doesn't lock in a bad size for the life of the process
+    # the plan is scaled to the largest bucket available: a smaller call (e.g. the 400-word
+    # startup preload) drops to MIN_CALIBRATION_REPEATS rounds and then leaves out the
+    # largest candidates that don't fit, as long as at least two still do
+
+    CANDIDATE_BATCH_SIZES = (16, 32, 64, 128)
+    CALIBRATION_REPEATS = 3
+    MIN_CALIBRATION_REPEATS = 2
+
+    def __init__(self, encode_fn: Callable[[List[str], int], np.ndarray],
+                 length_fn: Callable[[List[str]], Sequence[int]],
+                 batch_size: Optional[int] = None, default_batch_size: int = 32,
+                 candidate_batch_sizes: Sequence[int] = CANDIDATE_BATCH_SIZES):
+        # encode_fn(texts, batch_size): the model call, one row per text
+        # length_fn(texts): token count of each text
+        # batch_size: fixed batch size (skips calibration)
+        # default_batch_size: used until calibration has run
+        self.encode_fn = encode_fn
+        self.length_fn = length_fn
+        self.batch_size = batch_size
+        self.default_batch_size = default_batch_size
+        self.candidate_batch_sizes = tuple(sorted(candidate_batch_sizes))
+
+        self._lock = threading.Lock()
+        self.calibration: Optional[Dict[int, float]] = None
+        self.bulk_calls = 0
+        self.texts_encoded = 0
+        self.bucket_counts: Dict[int, int] = {}
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        # embed texts, returned in input order
+        if not texts:
+            return self.encode_fn([], self.default_batch_size)
+
+        lengths = np.asarray(self.length_fn(texts), dtype=np.int64)
+        # stable sort, so texts of one length keep their relative order
+        order = np.argsort(lengths, kind='stable')
+        sorted_lengths = lengths[order]
+        boundaries = np.flatnonzero(np.diff(sorted_lengths)) + 1
+        buckets = np.split(order, boundaries)
+
+        rows: List[Optional[np.ndarray]] = [None] * len(buckets)
+        calibrate_bucket = self._calibration_bucket(buckets)
+        if calibrate_bucket is not None:
+            bucket = buckets[calibrate_bucket]
+            rows[calibrate_bucket] = self._calibrate([texts[i] for i in bucket])
+
+        batch_size = self.batch_size or self.default_batch_size
+        for b, bucket in enumerate(buckets):
+            if rows[b] is None:
+                rows[b] = self.encode_fn([texts[i] for i in bucket], batch_size)
+
+        embeddings = np.empty((len(texts), rows[0].shape[1]), dtype=np.float32)
+        for bucket, bucket_rows in zip(buckets, rows):
+            embeddings[bucket] = bucket_rows
+
+        with self._lock:
+            self.bulk_calls += 1
+            self.texts_encoded += len(texts)
+            for length, bucket in zip(sorted_lengths[np.concatenate([[0], boundaries])].tolist(), buckets):
+                self.bucket_counts[length] = self.bucket_counts.get(length, 0) + len(bucket)
+        return embeddings
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'batchSize': self.batch_size,
+                'calibration': self.calibration,
+                'bulkCalls': self.bulk_calls,
+                'textsEncoded': self.texts_encoded,
+                'tokenLengthHistogram': dict(sorted(self.bucket_counts.items()))
+            }
+
+    def _calibration_plan(self, num_texts: int) -> Optional[Tuple[Tuple[int, ...], int]]:
+        # (candidate sizes, rounds) that num_texts can fill with full chunks after the warm-up:
+        # every candidate if possible, fewer rounds before fewer candidates,
+        # None when not even the two smallest fit (partial batches would skew the timings)
+        warmup = self.candidate_batch_sizes[0]
+        for count in range(len(self.candidate_batch_sizes), 1, -1):
+            candidates = self.candidate_batch_sizes[:count]
+            for repeats in range(self.CALIBRATION_REPEATS, self.MIN_CALIBRATION_REPEATS - 1, -1):
+                if warmup + repeats * sum(candidates) <= num_texts:
+                    return candidates, repeats
+        return None
+
+    def _calibration_bucket(self, buckets: List[np.ndarray]) -> Optional[int]:
+        # the largest bucket, if calibration is still pending and it can fill a calibration plan
+        # (smaller calls keep the default size)
+        if self.batch_size is not None:
+            return None
+        largest = max(range(len(buckets)), key=lambda b: len(buckets[b]))
+        if self._calibration_plan(len(buckets[largest])) is None:
+            return None
+        return largest
+
+    def _calibrate(self, texts: List[str]) -> np.ndarray:
+        # warm up on the smallest size, time rounds of one chunk per planned candidate,
+        # then encode the rest at the size with the best time per text
+        candidates, repeats = self._calibration_plan(len(texts))
+        warmup = candidates[0]
+        chunks = [self.encode_fn(texts[:warmup], warmup)]
+        position = warmup
+        timings = {size: float('inf') for size in candidates}
+        for _ in range(repeats):
+            for size in candidates:
+                chunk = texts[position:position + size]
+                started = time.perf_counter()
+                chunks.append(self.encode_fn(chunk, size))
+                timings[size] = min(timings[size], (time.perf_counter() - started) / len(chunk))
+                position += size
+
+        best = min(timings, key=timings.get)
+        with self._lock:
+            if self.batch_size is None:
+                self.batch_size = best
+                self.calibration = {size: round(seconds * 1000, 4) for size, seconds in timings.items()}
+                logger.info(f"Calibrated encode batch size {best} over {len(texts)} texts, {repeats} rounds "
+                            f"(ms per text: {self.calibration})")
+
+        if position < len(texts):
+            chunks.append(self.encode_fn(texts[position:], self.batch_size))
+        return np.concatenate(chunks)
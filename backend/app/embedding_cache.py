@@ -0,0 +1,102 @@
+import time
+from typing import Dict, Hashable, List, Optional, Tuple
+import numpy as np
+from app.lru_cache import LRUCache
+
+
+class EmbeddingCache(LRUCache):
+    # in-memory LRU of normalized embedding rows, keyed by normalized text
+    # sits in front of the embedding store and the model, so words looked up ad hoc
+    # (or rejected / evicted by the graph) don't go back through the transformer
+    # with ttl_seconds set, entries also expire that long after they were stored
+
+    def __init__(self, max_size: int, embedding_dim: int, ttl_seconds: Optional[float] = None):
+        super().__init__(max_size)
+        self.embedding_dim = embedding_dim
+        self.ttl_seconds = ttl_seconds
+        self._stored_at: Dict[Hashable, float] = {}
+        self.expirations = 0
+
+    def get(self, key: Hashable, default=LRUCache.MISSING):
+        with self._lock:
+            row = self._live_row(key, time.monotonic())
+            if row is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return row
+
+    def peek(self, key: Hashable, default=LRUCache.MISSING):
+        # the cached row without touching recency or counters (expired rows count as absent)
+        with self._lock:
+            row = self._data.get(key)
+            if row is None or (self.ttl_seconds is not None
+                               and time.monotonic() - self._stored_at[key] > self.ttl_seconds):
+                return default
+            return row
+
+    def lookup(self, keys: List[str]) -> Tuple[np.ndarray, List[int]]:
+        # same contract as EmbeddingStore.lookup: one row per key (zeros for misses)
+        # plus the positions that still have to be encoded
+        embeddings = np.zeros((len(keys), self.embedding_dim), dtype=np.float32)
+        missing = []
+        now = time.monotonic()
+        with self._lock:
+            for pos, key in enumerate(keys):
+                row = self._live_row(key, now)
+                if row is None:
+                    missing.append(pos)
+                    self.misses += 1
+                    continue
+                self.hits += 1
+                embeddings[pos] = row
+        return embeddings, missing
+
+    def put(self, key: Hashable, value: np.ndarray):
+        self.put_many([key], [value])
+
+    def put_many(self, keys: List[str], embeddings: np.ndarray):
+        # cache one row per key; rows are stored as read-only copies, so neither the caller's
+        # array nor anyone handed a row by get() / peek() can modify a cached vector
+        now = time.monotonic()
+        with self._lock:
+            for key, row in zip(keys, embeddings):
+                row = np.array(row, dtype=np.float32)
+                row.flags.writeable = False
+                self._data[key] = row
+                self._data.move_to_end(key)
+                if self.ttl_seconds is not None:
+                    self._stored_at[key] = now
+            while len(self._data) > self.max_size:
+                key, _ = self._data.popitem(last=False)
+                self._stored_at.pop(key, None)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._stored_at.clear()
+
+    def _live_row(self, key: Hashable, now: float) -> Optional[np.ndarray]:
+        # the cached row marked as recently used, None when absent or expired (lock held)
+        row = self._data.get(key)
+        if row is None:
+            return None
+        if self.ttl_seconds is not None and now - self._stored_at[key] > self.ttl_seconds:
+            del self._data[key]
+            del self._stored_at[key]
+            self.expirations += 1
+            return None
+        self._data.move_to_end(key)
+        return row
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._data) * self.embedding_dim * np.dtype(np.float32).itemsize
+
+    def get_stats(self) -> Dict:
+        stats = dict(super().get_stats(), bytes=self.nbytes)
+        if self.ttl_seconds is not None:
+            stats['ttlSeconds'] = self.ttl_seconds
+            stats['expirations'] = self.expirations
+        return stats
@@ -0,0 +1,195 @@
+from typing import List, Dict, Optional, Iterator
+from collections.abc import Mapping
+import numpy as np
+
+
+class EmbeddingMatrix:
+    # growable contiguous float32 matrix holding one embedding row per word
+    # words get dense integer ids in insertion order (word -> id index, id -> word list),
+    # so similarity against the whole vocabulary is a single matmul on a view of the buffer
+    # capacity doubles when full, which keeps the amortized insert cost O(d)
+    #
+    # rows can be frozen into a read-only base (see freeze / from_array): the base is never
+    # written again, so forked workers or memory-mapped bundles share its pages, and words
+    # added later go to a small private tail buffer
+    #
+    # concurrent readers are safe as long as they only touch rows below a size they were
+    # given (see SemanticGraph snapshots): appends write rows past the size, and the
+    # (base, tail) pair is replaced in a single assignment after the rows are copied over
+
+    def __init__(self, embedding_dim: int, initial_capacity: int = 1024):
+        self.embedding_dim = embedding_dim
+        self._initial_capacity = max(initial_capacity, 1)
+        # frozen rows [0, base_size), read-only, and the tail buffer holding rows [base_size, size)
+        self._buffers = (
+            np.zeros((0, embedding_dim), dtype=np.float32),
+            np.zeros((self._initial_capacity, embedding_dim), dtype=np.float32)
+        )
+        self._size = 0
+
+        # word -> row id and row id -> word
+        self.index: Dict[str, int] = {}
+        self.words: List[str] = []
+
+    @classmethod
+    def from_array(cls, words: List[str], embeddings: np.ndarray) -> 'EmbeddingMatrix':
+        # wrap an existing (possibly memory-mapped, read-only) matrix as the frozen base, no copy
+        matrix = cls(embeddings.shape[1])
+        matrix._buffers = (embeddings, matrix._data)
+        matrix._size = len(words)
+        matrix.words = list(words)
+        matrix.index = {word: i for i, word in enumerate(matrix.words)}
+        return matrix
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.index
+
+    @property
+    def _base(self) -> np.ndarray:
+        return self._buffers[0]
+
+    @property
+    def _data(self) -> np.ndarray:
+        return self._buffers[1]
+
+    @property
+    def base_size(self) -> int:
+        return len(self._base)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        # all filled rows; a view when they sit in one buffer, otherwise a copy
+        return self.rows(0, self._size)
+
+    @property
+    def nbytes(self) -> int:
+        base, data = self._buffers
+        return base.nbytes + data.nbytes
+
+    @property
+    def frozen_nbytes(self) -> int:
+        # bytes in the read-only base (shared between forked workers / with the page cache)
+        return self._base.nbytes
+
+    def get_id(self, word: str) -> Optional[int]:
+        return self.index.get(word)
+
+    def vector(self, word_id: int) -> np.ndarray:
+        base, data = self._buffers
+        if word_id < len(base):
+            return base[word_id]
+        return data[word_id - len(base)]
+
+    def vectors(self, word_ids) -> np.ndarray:
+        word_ids = np.asarray(word_ids, dtype=np.int64)
+        base, data = self._buffers
+        base_size = len(base)
+        if base_size == 0:
+            return data[word_ids]
+        in_base = word_ids < base_size
+        if in_base.all():
+            return base[word_ids]
+        out = np.empty((len(word_ids), self.embedding_dim), dtype=np.float32)
+        out[in_base] = base[word_ids[in_base]]
+        out[~in_base] = data[word_ids[~in_base] - base_size]
+        return out
+
+    def rows(self, start: int, end: int) -> np.ndarray:
+        # rows [start, end): a view when the range doesn't straddle the base / tail split
+        base, data = self._buffers
+        base_size = len(base)
+        if end <= base_size:
+            return base[start:end]
+        if start >= base_size:
+            return data[start - base_size:end - base_size]
+        return np.concatenate([base[start:], data[:end - base_size]])
+
+    def add(self, word: str, embedding: np.ndarray) -> int:
+        # append one word, returns its id (existing id if already present)
+        existing = self.index.get(word)
+        if existing is not None:
+            return existing
+
+        self._reserve(self._size + 1)
+        word_id = self._size
+        self._data[word_id - len(self._base)] = embedding
+        self.words.append(word)
+        self.index[word] = word_id
+        self._size += 1
+        return word_id
+
+    def add_many(self, words: List[str], embeddings: np.ndarray) -> np.ndarray:
+        # append a batch of new words in one copy, returns their ids
+        # callers pass words that are not in the matrix yet
+        count = len(words)
+        self._reserve(self._size + count)
+        start = self._size
+        offset = start - len(self._base)
+        self._data[offset:offset + count] = embeddings
+        for i, word in enumerate(words):
+            self.index[word] = start + i
+        self.words.extend(words)
+        self._size += count
+        return np.arange(start, start + count, dtype=np.int64)
+
+    def similarities(self, embeddings: np.ndarray, end: Optional[int] = None) -> np.ndarray:
+        # cosine similarity of each given (normalized) embedding to every word (or words [0, end))
+        # a single vector gives shape (n,), a batch gives (k, n)
+        end = self._size if end is None else end
+        base, data = self._buffers
+        base_size = len(base)
+        if base_size == 0 or end <= base_size:
+            return embeddings @ self.rows(0, end).T
+        # base and tail separately, so the frozen base is never copied
+        return np.concatenate([
+            embeddings @ base.T,
+            embeddings @ data[:end - base_size].T
+        ], axis=-1)
+
+    def freeze(self):
+        # move every row into a read-only base and start a fresh private tail
+        # call before forking workers: pages of the base are then never written again
+        if self._size == len(self._base):
+            return
+        base = np.ascontiguousarray(self.matrix, dtype=np.float32).copy()
+        base.flags.writeable = False
+        self._buffers = (base, np.zeros((self._initial_capacity, self.embedding_dim), dtype=np.float32))
+
+    def _reserve(self, rows: int):
+        # grow the tail buffer by doubling until it can hold `rows` rows in total
+        rows -= len(self._base)
+        capacity = self._data.shape[0]
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        tail_size = self._size - len(self._base)
+        grown = np.zeros((capacity, self.embedding_dim), dtype=np.float32)
+        grown[:tail_size] = self._data[:tail_size]
+        self._buffers = (self._base, grown)
+
+
+class EmbeddingView(Mapping):
+    # read-only word -> embedding mapping backed by an EmbeddingMatrix
+    # keeps dict-style access (`word in graph.word_embeddings`, `[word]`, len) working
+
+    def __init__(self, matrix: EmbeddingMatrix):
+        self._matrix = matrix
+
+    def __getitem__(self, word: str) -> np.ndarray:
+        word_id = self._matrix.get_id(word)
+        if word_id is None:
+            raise KeyError(word)
+        return self._matrix.vector(word_id)
+
+    def __contains__(self, word) -> bool:
+        return word in self._matrix
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._matrix.words[:len(self._matrix)])
+
+    def __len__(self) -> int:
+        return len(self._matrix)
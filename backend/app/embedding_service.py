@@ -1,8 +1,18 @@
 import os
-from typing import List, Dict, Optional
+import threading
+from typing import List, Dict, Optional, TYPE_CHECKING
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import logging
+from app.embedding_store import EmbeddingStore, normalize_word
+from app.embedding_cache import EmbeddingCache
+from app.encode_batcher import EncodeBatcher
+from app.bucketed_encoder import BucketedEncoder
+from app.startup import startup_timer
+
+# sentence_transformers pulls in torch (seconds of import time and hundreds of MB of RSS),
+# so it is only imported when the model is first needed
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 # set cache directory for model (matches Dockerfile)
 # Use HF_HOME instead of TRANSFORMERS_CACHE (deprecated)
@@ -14,49 +24,225 @@ if 'TRANSFORMERS_CACHE' in os.environ:
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
 class EmbeddingService:
     # service for generating and managing word embeddings using sentence-transformers
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+
+    BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+    # encodes with at least this many texts are bucketed by token length (see app/bucketed_encoder.py)
+    BUCKETING_MIN_TEXTS = 64
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, store_dir: Optional[str] = None,
+                 batch_max_size: Optional[int] = None, batch_max_wait_ms: Optional[float] = None,
+                 backend: Optional[str] = None, onnx_dir: Optional[str] = None,
+                 cache_size: Optional[int] = None):
         # init embedding service
+        # store_dir: optional directory for the persistent embedding store
+        # (defaults to EMBEDDING_STORE_DIR, disabled when neither is set)
+        # batch_max_size / batch_max_wait_ms: micro-batching settings for encode_word
+        # (default to ENCODE_BATCH_SIZE / ENCODE_MAX_WAIT_MS, a wait of 0 disables batching)
+        # backend: 'torch' (sentence-transformers), 'onnx' or 'onnx-int8' (app/onnx_backend.py),
+        # defaults to EMBEDDING_BACKEND; onnx_dir (or ONNX_MODEL_DIR) holds the exported model
+        # cache_size: entries in the in-memory embedding cache (defaults to EMBEDDING_CACHE_SIZE, 0 disables)
         self.model_name = model_name
-        self.model: Optional[SentenceTransformer] = None
+        self.backend = backend or os.environ.get('EMBEDDING_BACKEND', 'torch')
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"Unknown embedding backend: {self.backend}")
+        self.onnx_dir = onnx_dir or os.environ.get('ONNX_MODEL_DIR', '/app/models/onnx')
+        self._model: Optional["SentenceTransformer"] = None
+        self._model_lock = threading.Lock()
         # all-MiniLM-L6-v2 produces 384-dimensional embeddings
         self.embedding_dim = 384  
-        self._load_model()
-    
+
+        # words encoded once are kept on disk so restarts and new workers skip the model
+        # (ONNX backends get their own store, their vectors differ slightly from torch)
+        store_dir = store_dir or os.environ.get('EMBEDDING_STORE_DIR')
+        self.store: Optional[EmbeddingStore] = None
+        if store_dir:
+            store_key = self.model_name if self.backend == 'torch' else f"{self.model_name}@{self.backend}"
+            self.store = EmbeddingStore(store_dir, store_key, self.embedding_dim)
+
+        # recently encoded words are also kept in memory, in front of the store and the model
+        # (10k entries of 384 float32 is about 15 MB)
+        if cache_size is None:
+            cache_size = int(os.environ.get('EMBEDDING_CACHE_SIZE', 10000))
+        self.cache: Optional[EmbeddingCache] = None
+        if cache_size > 0:
+            self.cache = EmbeddingCache(cache_size, self.embedding_dim)
+
+        # concurrent single-word requests are coalesced into one model batch
+        if batch_max_size is None:
+            batch_max_size = int(os.environ.get('ENCODE_BATCH_SIZE', 32))
+        if batch_max_wait_ms is None:
+            batch_max_wait_ms = float(os.environ.get('ENCODE_MAX_WAIT_MS', 5))
+        self.batcher: Optional[EncodeBatcher] = None
+        if batch_max_wait_ms > 0 and batch_max_size > 1:
+            self.batcher = EncodeBatcher(self.encode, batch_max_size, batch_max_wait_ms)
+
+        # inputs are single words or short phrases: cap the sequence length well below the
+        # model's 256 (ENCODE_MAX_SEQ_LENGTH) and bucket bulk encodes by token length so batches
+        # carry no padding; the bulk batch size is calibrated on first use unless
+        # ENCODE_BULK_BATCH_SIZE fixes it
+        self.max_seq_length = int(os.environ.get('ENCODE_MAX_SEQ_LENGTH', 32))
+        bulk_batch_size = os.environ.get('ENCODE_BULK_BATCH_SIZE')
+        self.bulk_encoder = BucketedEncoder(
+            self._encode_batch,
+            self._token_lengths,
+            batch_size=int(bulk_batch_size) if bulk_batch_size else None
+        )
+
+    @property
+    def model(self) -> "SentenceTransformer":
+        # the sentence-transformer, loaded on first access
+        if self._model is None:
+            self.load_model()
+        return self._model
+
+    @model.setter
+    def model(self, model: Optional["SentenceTransformer"]):
+        self._model = model
+
+    def is_model_loaded(self) -> bool:
+        return self._model is not None
+
+    def load_model(self) -> "SentenceTransformer":
+        # import the ML stack and load the model (once, safe to call from several threads)
+        with self._model_lock:
+            if self._model is not None:
+                return self._model
+            self._load_model()
+            return self._model
+
     def _load_model(self):
         # load the sentence-transformer model
         try:
+            if self.backend != 'torch':
+                self._load_onnx_model()
+                return
+            with startup_timer.phase('ml_import'):
+                from sentence_transformers import SentenceTransformer
             logger.info(f"Loading sentence-transformer model: {self.model_name}")
-            self.model = SentenceTransformer(self.model_name)
+            with startup_timer.phase('model_load'):
+                model = SentenceTransformer(self.model_name)
+            model.max_seq_length = min(model.max_seq_length, self.max_seq_length)
+            self._model = model
             logger.info("Model loaded successfully")
         except Exception as e:
             logger.error(f"Error loading model: {e}")
             raise
     
+    def _load_onnx_model(self):
+        # onnxruntime backend, same encode() interface as SentenceTransformer and no torch import
+        with startup_timer.phase('ml_import'):
+            from app.onnx_backend import OnnxEmbeddingBackend
+        logger.info(f"Loading ONNX model ({self.backend}) from {self.onnx_dir}")
+        with startup_timer.phase('model_load'):
+            model = OnnxEmbeddingBackend(self.onnx_dir, quantized=self.backend == 'onnx-int8')
+        if model.model_name != self.model_name:
+            raise ValueError(f"ONNX model in {self.onnx_dir} is {model.model_name}, expected {self.model_name}")
+        model.max_seq_length = min(model.max_seq_length, self.max_seq_length)
+        self._model = model
+        logger.info("Model loaded successfully")
+
     def encode(self, texts: List[str]) -> np.ndarray:
         # generate embeddings for a list of texts/words
-        if self.model is None:
-            raise RuntimeError("Model not loaded. Call _load_model() first.")
-        
         if isinstance(texts, str):
             texts = [texts]
-        
+
+        if self.cache is None or not texts:
+            return self._encode_uncached(texts)
+
+        # serve cached rows and encode the misses (deduplicated) in one call
+        keys = [normalize_word(text) for text in texts]
+        embeddings, missing = self.cache.lookup(keys)
+        if missing:
+            missing_keys = list(dict.fromkeys(keys[i] for i in missing))
+            new_embeddings = self._encode_uncached(missing_keys)
+            self.cache.put_many(missing_keys, new_embeddings)
+
+            rows = {key: i for i, key in enumerate(missing_keys)}
+            for i in missing:
+                embeddings[i] = new_embeddings[rows[keys[i]]]
+
+        return embeddings
+
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
+        if self.store is None or not texts:
+            return self._encode_with_model(texts)
+
+        # serve stored rows and only run the model for words never seen before
+        embeddings, missing = self.store.lookup(texts)
+        if missing:
+            missing_words = list(dict.fromkeys(normalize_word(texts[i]) for i in missing))
+            new_embeddings = self._encode_with_model(missing_words)
+            self.store.append(missing_words, new_embeddings)
+
+            rows = {word: i for i, word in enumerate(missing_words)}
+            for i in missing:
+                embeddings[i] = new_embeddings[rows[normalize_word(texts[i])]]
+
+        return embeddings
+
+    def _encode_with_model(self, texts: List[str]) -> np.ndarray:
+        # run the sentence-transformer on a list of texts (loads it on first use)
+        # large batches (vocabulary preloads, artifact builds) are bucketed by token length
+        if len(texts) >= self.BUCKETING_MIN_TEXTS:
+            return self.bulk_encoder.encode(texts)
+        return self._encode_batch(texts)
+
+    def _encode_batch(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        model = self.model
+        if model is None:
+            raise RuntimeError("Model not loaded. Call load_model() first.")
+
         # generate embeddings
-        embeddings = self.model.encode(
+        embeddings = model.encode(
             texts,
+            batch_size=batch_size,
             convert_to_numpy=True,
             # normalize for cosine similarity
             normalize_embeddings=True  
         )
         
         return embeddings
+
+    def _token_lengths(self, texts: List[str]) -> List[int]:
+        # tokenized length of each text (with special tokens, capped at max_seq_length)
+        model = self.model
+        if hasattr(model, 'token_lengths'):
+            return model.token_lengths(texts)
+        encoded = model.tokenizer(texts, add_special_tokens=True, truncation=True, max_length=model.max_seq_length)
+        return [len(ids) for ids in encoded['input_ids']]
     
     def encode_word(self, word: str) -> np.ndarray:
         # embed a single word
+        # cached words skip the batcher's wait for other requests; the check is a peek, so
+        # each request is counted once in the cache stats, by the lookup in encode()
+        if self.cache is not None and self.cache.peek(normalize_word(word), None) is not None:
+            return self.encode([word])[0]
+        if self.batcher is not None:
+            return self.batcher.encode(word)
         embedding = self.encode([word])
         return embedding[0]
+
+    def get_batching_stats(self) -> Optional[Dict]:
+        # micro-batching statistics, None when batching is disabled
+        if self.batcher is None:
+            return None
+        return self.batcher.get_stats()
     
+    def get_cache_stats(self) -> Optional[Dict]:
+        # in-memory embedding cache statistics, None when the cache is disabled
+        if self.cache is None:
+            return None
+        return self.cache.get_stats()
+
+    def get_bulk_encoding_stats(self) -> Dict:
+        # token-length bucketing and batch size calibration
+        return dict(self.bulk_encoder.get_stats(), maxSeqLength=self.max_seq_length)
+
     def get_embedding_dim(self) -> int:
         # get the dimension of embeddings produced by this model
         return self.embedding_dim
\ No newline at end of file
@@ -0,0 +1,311 @@
+import os
+import sys
+import json
+import time
+import socket
+import struct
+import atexit
+import signal
+import argparse
+import threading
+import subprocess
+import socketserver
+import logging
+from typing import List, Dict, Optional
+import numpy as np
+from app.encode_batcher import EncodeBatcher
+from app.embedding_store import FileLock
+from app.embedding_service import EmbeddingService, DEFAULT_MODEL_NAME
+
+logger = logging.getLogger(__name__)
+
+# one process owns the sentence-transformer and serves every worker over a Unix socket
+#
+# wire format (both directions): 4-byte big-endian length + JSON header,
+# encode responses are followed by the raw float32 rows (shape given in the header)
+#   {"op": "encode", "texts": [...]} -> {"ok": true, "shape": [n, d]} + n * d * 4 bytes
+#   {"op": "ping"}                   -> {"ok": true, "model": ...}
+#   {"op": "stats"}                  -> {"ok": true, "stats": {...}}
+# failures answer {"ok": false, "error": "..."}
+
+DEFAULT_SOCKET_PATH = '/tmp/six-degrees-embedding.sock'
+
+_LENGTH = struct.Struct('>I')
+
+
+def _send_frame(sock: socket.socket, header: Dict, payload: bytes = b''):
+    data = json.dumps(header).encode('utf-8')
+    sock.sendall(_LENGTH.pack(len(data)) + data + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Embedding sidecar connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _recv_header(sock: socket.socket) -> Dict:
+    (length,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    return json.loads(_recv_exact(sock, length).decode('utf-8'))
+
+
+class EmbeddingSidecarServer:
+    # serves encode requests from all workers with one embedding service
+    # small requests (single words from gameplay) go through an EncodeBatcher, so words
+    # from different workers share model calls; bulk requests are encoded directly
+
+    def __init__(self, socket_path: str, embedding_service, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.socket_path = socket_path
+        self.embedding_service = embedding_service
+        self.batcher = EncodeBatcher(embedding_service.encode, max_batch_size, max_wait_ms)
+        self.requests = 0
+
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                server._handle_connection(self.request)
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        # owner-only from the moment bind() creates the socket file
+        umask = os.umask(0o177)
+        try:
+            self._server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+        finally:
+            os.umask(umask)
+        self._server.daemon_threads = True
+
+    def serve_forever(self):
+        logger.info(f"Embedding sidecar listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def start(self) -> threading.Thread:
+        # serve from a background thread (used by tests)
+        thread = threading.Thread(target=self.serve_forever, name='embedding-sidecar', daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self):
+        self._server.shutdown()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        self.requests += 1
+        if not texts:
+            return np.zeros((0, self.embedding_service.get_embedding_dim()), dtype=np.float32)
+        if len(texts) > self.batcher.max_batch_size:
+            return self.embedding_service.encode(texts)
+        futures = [self.batcher.submit(text) for text in texts]
+        return np.stack([future.result() for future in futures])
+
+    def _handle_connection(self, sock: socket.socket):
+        # one connection per client thread, requests are answered in order
+        while True:
+            try:
+                request = _recv_header(sock)
+            except (ConnectionError, OSError):
+                return
+            try:
+                self._handle_request(sock, request)
+            except (ConnectionError, OSError):
+                return
+            except Exception as e:
+                logger.error(f"Embedding sidecar request failed: {e}")
+                _send_frame(sock, {'ok': False, 'error': str(e)})
+
+    def _handle_request(self, sock: socket.socket, request: Dict):
+        op = request.get('op')
+        if op == 'encode':
+            embeddings = np.ascontiguousarray(self.encode(request.get('texts', [])), dtype=np.float32)
+            _send_frame(sock, {'ok': True, 'shape': list(embeddings.shape)}, embeddings.tobytes())
+        elif op == 'ping':
+            _send_frame(sock, {'ok': True, 'model': self.embedding_service.model_name})
+        elif op == 'stats':
+            stats = dict(self.batcher.get_stats(), requests=self.requests)
+            _send_frame(sock, {'ok': True, 'stats': stats})
+        else:
+            _send_frame(sock, {'ok': False, 'error': f"Unknown op: {op}"})
+
+
+class SidecarEmbeddingClient:
+    # drop-in replacement for EmbeddingService that forwards encodes to the sidecar
+    # each thread keeps its own connection, reopened after a fork (sockets can't be shared)
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH,
+                 model_name: str = DEFAULT_MODEL_NAME,
+                 embedding_dim: int = 384, connect_timeout: float = 120.0,
+                 backend: Optional[str] = None):
+        # connect_timeout: how long the first request (or load_model()) waits for the sidecar
+        #   to come up; it only binds its socket once its model is loaded
+        # backend: the sidecar's embedding backend, defaults to EMBEDDING_BACKEND like the
+        #   sidecar it starts (see EmbeddingService)
+        self.socket_path = socket_path
+        self.model_name = model_name
+        self.backend = backend or os.environ.get('EMBEDDING_BACKEND', 'torch')
+        self.embedding_dim = embedding_dim
+        self.connect_timeout = connect_timeout
+        self._local = threading.local()
+        self._ready = False
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        # generate embeddings for a list of texts/words
+        if isinstance(texts, str):
+            texts = [texts]
+        header, payload = self._request({'op': 'encode', 'texts': list(texts)}, with_payload=True)
+        return np.frombuffer(payload, dtype=np.float32).reshape(header['shape']).copy()
+
+    def encode_word(self, word: str) -> np.ndarray:
+        return self.encode([word])[0]
+
+    def get_embedding_dim(self) -> int:
+        return self.embedding_dim
+
+    def load_model(self):
+        # the model lives in the sidecar: wait until it answers
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                self._exchange({'op': 'ping'})
+                return
+            except (ConnectionError, OSError):
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(f"Embedding sidecar at {self.socket_path} did not come up")
+                self._close()
+                time.sleep(0.2)
+
+    def is_model_loaded(self) -> bool:
+        return self._ready
+
+    def get_batching_stats(self) -> Optional[Dict]:
+        # batching statistics of the sidecar (across all workers)
+        try:
+            header, _ = self._exchange({'op': 'stats'})
+        except (ConnectionError, OSError):
+            return None
+        return header['stats']
+
+    def get_bulk_encoding_stats(self) -> Optional[Dict]:
+        # bulk encodes are bucketed inside the sidecar
+        return None
+
+    def get_cache_stats(self) -> Optional[Dict]:
+        # the embedding cache lives in the sidecar
+        return None
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None and self._local.pid == os.getpid():
+            return sock
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self._local.sock = sock
+        self._local.pid = os.getpid()
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None and self._local.pid == os.getpid():
+            sock.close()
+        self._local.sock = None
+
+    def _request(self, request: Dict, with_payload: bool = False):
+        # send one request, first waiting for the sidecar if it has never answered yet
+        # (e.g. workers that load an artifact bundle encode before anything calls load_model)
+        if not self._ready:
+            self.load_model()
+        return self._exchange(request, with_payload)
+
+    def _exchange(self, request: Dict, with_payload: bool = False):
+        # send one request, retrying once on a stale connection (e.g. sidecar restarted)
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                _send_frame(sock, request)
+                header = _recv_header(sock)
+                payload = b''
+                if with_payload and header.get('ok'):
+                    rows, dim = header['shape']
+                    payload = _recv_exact(sock, rows * dim * 4)
+                break
+            except (ConnectionError, OSError):
+                self._close()
+                if attempt:
+                    raise
+        self._ready = True
+        if not header.get('ok'):
+            raise RuntimeError(f"Embedding sidecar error: {header.get('error')}")
+        return header, payload
+
+
+def start_sidecar(socket_path: str, model_name: str) -> Optional[subprocess.Popen]:
+    # start the sidecar process unless one is already serving socket_path
+    # the lock file keeps concurrently starting workers from spawning several
+    with FileLock(socket_path + '.lock'):
+        probe = SidecarEmbeddingClient(socket_path, model_name, connect_timeout=0)
+        try:
+            probe.load_model()
+            return None
+        except RuntimeError:
+            pass
+
+        logger.info(f"Starting embedding sidecar on {socket_path}")
+        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'app.embedding_sidecar', '--socket', socket_path, '--model', model_name],
+            cwd=backend_dir
+        )
+        atexit.register(_stop_process, process)
+        return process
+
+
+def _stop_process(process: subprocess.Popen):
+    if process.poll() is None:
+        process.terminate()
+
+
+def embedding_service_from_env():
+    # EMBEDDING_SIDECAR=1 starts (or joins) the shared sidecar and returns a client for it,
+    # None otherwise (the caller then loads its own EmbeddingService)
+    if os.environ.get('EMBEDDING_SIDECAR', '0') != '1':
+        return None
+    socket_path = os.environ.get('EMBEDDING_SIDECAR_SOCKET', DEFAULT_SOCKET_PATH)
+    start_sidecar(socket_path, DEFAULT_MODEL_NAME)
+    return SidecarEmbeddingClient(socket_path, DEFAULT_MODEL_NAME)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared embedding sidecar")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH, help="Unix socket path")
+    parser.add_argument('--model', default=DEFAULT_MODEL_NAME, help="sentence-transformers model")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    # exit through serve_forever's cleanup (removes the socket file) when the app stops us
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    # the sidecar batches itself, so the service's own batcher is off
+    embedding_service = EmbeddingService(args.model, batch_max_wait_ms=0)
+    embedding_service.load_model()
+    EmbeddingSidecarServer(
+        args.socket,
+        embedding_service,
+        max_batch_size=int(os.environ.get('ENCODE_BATCH_SIZE', 32)),
+        max_wait_ms=float(os.environ.get('ENCODE_MAX_WAIT_MS', 5))
+    ).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
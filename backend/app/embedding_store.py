@@ -0,0 +1,258 @@
+import os
+import re
+import json
+import fcntl
+import threading
+import logging
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_word(word: str) -> str:
+    # words are stored and looked up in the same normalized form the graph uses
+    return word.lower().strip()
+
+
+class EmbeddingStore:
+    # persistent on-disk embedding store keyed by (model_name, normalized word)
+    # layout under root_dir/<model slug>/:
+        # embeddings.npy - contiguous float32 matrix (capacity x dim), opened with np.memmap
+        # vocab.json     - model name and dimension (written once)
+        # words.jsonl    - append-only word log, one JSON string per line (line i -> row i)
+    # the matrix is preallocated and grown by doubling and the word log is only appended to,
+    # so appends are amortized O(1); readers pick up new words by reading the log from the
+    # byte offset they last stopped at, and only the first len(words) rows are ever read
+
+    EMBEDDINGS_FILE = 'embeddings.npy'
+    VOCAB_FILE = 'vocab.json'
+    WORDS_FILE = 'words.jsonl'
+    LOCK_FILE = '.lock'
+
+    def __init__(self, root_dir: str, model_name: str, embedding_dim: int, initial_capacity: int = 1024):
+        # init embedding store, creating it on disk if it doesn't exist yet
+        self.model_name = model_name
+        self.embedding_dim = embedding_dim
+        self.initial_capacity = initial_capacity
+
+        # one directory per model so vectors from different models never mix
+        slug = re.sub(r'[^a-zA-Z0-9._-]+', '_', model_name)
+        self.path = os.path.join(root_dir, slug)
+        self._embeddings_path = os.path.join(self.path, self.EMBEDDINGS_FILE)
+        self._vocab_path = os.path.join(self.path, self.VOCAB_FILE)
+        self._words_path = os.path.join(self.path, self.WORDS_FILE)
+        self._lock_path = os.path.join(self.path, self.LOCK_FILE)
+
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.memmap] = None
+        self._words: List[str] = []
+        self._index: Dict[str, int] = {}
+        # bytes of the word log consumed so far (always at a line boundary)
+        self._words_offset = 0
+
+        os.makedirs(self.path, exist_ok=True)
+        with self._file_lock():
+            if not os.path.exists(self._vocab_path):
+                self._create()
+            elif not os.path.exists(self._words_path):
+                self._migrate()
+        self._reload()
+        logger.info(f"Embedding store at {self.path} has {len(self._words)} words")
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __contains__(self, word: str) -> bool:
+        return normalize_word(word) in self._index
+
+    def lookup(self, words: List[str]) -> Tuple[np.ndarray, List[int]]:
+        # look up stored embeddings for a list of words
+        # returns (embeddings, missing) where embeddings has one row per input word
+        # (zeros for words not in the store) and missing lists the positions to encode
+        keys = [normalize_word(w) for w in words]
+        with self._lock:
+            # pick up rows appended by other processes since we last looked
+            if any(k not in self._index for k in keys):
+                self._reload_if_changed()
+
+            embeddings = np.zeros((len(keys), self.embedding_dim), dtype=np.float32)
+            missing = []
+            found_positions = []
+            found_rows = []
+            for pos, key in enumerate(keys):
+                row = self._index.get(key)
+                if row is None:
+                    missing.append(pos)
+                else:
+                    found_positions.append(pos)
+                    found_rows.append(row)
+
+            if found_rows:
+                embeddings[found_positions] = self._matrix[found_rows]
+
+        return embeddings, missing
+
+    def append(self, words: List[str], embeddings: np.ndarray):
+        # append new word embeddings to the store
+        # words already present (e.g. added by another worker) are skipped
+        if len(words) == 0:
+            return
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+
+        with self._lock, self._file_lock():
+            # merge whatever other processes wrote before taking the file lock
+            self._reload_if_changed()
+            # drop a partial line left by a writer that died mid-append
+            if os.path.getsize(self._words_path) > self._words_offset:
+                os.truncate(self._words_path, self._words_offset)
+
+            new_words = []
+            new_rows = []
+            for word, embedding in zip(words, embeddings):
+                key = normalize_word(word)
+                if key in self._index:
+                    continue
+                self._index[key] = len(self._words) + len(new_words)
+                new_words.append(key)
+                new_rows.append(embedding)
+
+            if not new_words:
+                return
+
+            start = len(self._words)
+            end = start + len(new_words)
+            if end > self._matrix.shape[0]:
+                self._grow(end)
+
+            # rows are written and flushed before their words are logged,
+            # so a reader never sees an index pointing at unwritten data
+            writable = np.load(self._embeddings_path, mmap_mode='r+')
+            writable[start:end] = np.stack(new_rows)
+            writable.flush()
+            del writable
+
+            self._words.extend(new_words)
+            self._append_words(new_words)
+            self._open_matrix()
+
+        logger.debug(f"Stored {len(new_words)} new embeddings ({len(self._words)} total)")
+
+    def _create(self):
+        # create an empty store on disk
+        matrix = np.lib.format.open_memmap(
+            self._embeddings_path, mode='w+', dtype=np.float32,
+            shape=(self.initial_capacity, self.embedding_dim)
+        )
+        matrix.flush()
+        del matrix
+        open(self._words_path, 'w', encoding='utf-8').close()
+        self._write_header()
+
+    def _grow(self, min_rows: int):
+        # reallocate the matrix with doubled capacity and swap it in atomically
+        capacity = max(self._matrix.shape[0], 1)
+        while capacity < min_rows:
+            capacity *= 2
+
+        tmp_path = self._embeddings_path + '.tmp'
+        grown = np.lib.format.open_memmap(
+            tmp_path, mode='w+', dtype=np.float32, shape=(capacity, self.embedding_dim)
+        )
+        count = len(self._words)
+        grown[:count] = self._matrix[:count]
+        grown.flush()
+        del grown
+        os.replace(tmp_path, self._embeddings_path)
+        self._open_matrix()
+        logger.info(f"Grew embedding store to {capacity} rows")
+
+    def _write_header(self):
+        # write the vocab header atomically
+        tmp_path = self._vocab_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'model_name': self.model_name, 'embedding_dim': self.embedding_dim}, f)
+        os.replace(tmp_path, self._vocab_path)
+
+    def _migrate(self):
+        # stores written before the word log kept the whole word list in vocab.json
+        with open(self._vocab_path, 'r', encoding='utf-8') as f:
+            vocab = json.load(f)
+        self._words_offset = 0
+        self._append_words(vocab.get('words', []))
+        self._write_header()
+
+    def _append_words(self, words: List[str]):
+        # append words to the log; a single write per batch, flushed before returning
+        with open(self._words_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(word) + '\n' for word in words))
+            f.flush()
+            os.fsync(f.fileno())
+            self._words_offset = f.tell()
+
+    def _reload(self):
+        # read the vocab header and the whole word log, and map the matrix read-only
+        with open(self._vocab_path, 'r', encoding='utf-8') as f:
+            vocab = json.load(f)
+
+        if vocab.get('model_name') != self.model_name or vocab.get('embedding_dim') != self.embedding_dim:
+            raise ValueError(
+                f"Embedding store at {self.path} was built for "
+                f"{vocab.get('model_name')} ({vocab.get('embedding_dim')}d), not {self.model_name}"
+            )
+
+        self._words = []
+        self._index = {}
+        self._words_offset = 0
+        self._read_new_words()
+        self._open_matrix()
+
+    def _reload_if_changed(self):
+        # the log only grows, so its size tells whether other processes appended words
+        # (a log shorter than what we consumed was recreated: read it from scratch)
+        size = os.path.getsize(self._words_path)
+        if size < self._words_offset:
+            self._reload()
+        elif size > self._words_offset:
+            if self._read_new_words():
+                self._open_matrix()
+
+    def _read_new_words(self) -> int:
+        # read complete lines past the consumed offset, returns the number of new words
+        with open(self._words_path, 'rb') as f:
+            f.seek(self._words_offset)
+            data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return 0
+        new_words = [json.loads(line) for line in data[:end].decode('utf-8').splitlines()]
+        for word in new_words:
+            self._index[word] = len(self._words)
+            self._words.append(word)
+        self._words_offset += end
+        return len(new_words)
+
+    def _open_matrix(self):
+        self._matrix = np.load(self._embeddings_path, mmap_mode='r')
+
+    def _file_lock(self):
+        # exclusive lock shared by every process using this store directory
+        return FileLock(self._lock_path)
+
+
+class FileLock:
+    # context manager around an flock'd lock file
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def __enter__(self):
+        self._fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
@@ -0,0 +1,123 @@
+import os
+import time
+import queue
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Callable, List, Dict, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EncodeBatcher:
+    # micro-batching front-end for an encode function
+    # single-word requests from concurrent threads are gathered for up to max_wait_ms
+    # (or until max_batch_size words are waiting) and encoded in one model call,
+    # then each caller gets its own row back
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray],
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        # encode_fn: batch encoder, takes a list of texts and returns one row per text
+        # max_batch_size: largest batch sent to encode_fn
+        # max_wait_ms: how long the first request in a batch waits for company
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+
+        # batch statistics
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._full_batches = 0
+        self._batch_sizes: Dict[int, int] = {}
+
+    def submit(self, text: str) -> Future:
+        # queue a text for encoding, returns a future resolving to its embedding row
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def encode(self, text: str) -> np.ndarray:
+        # encode a single text, blocking until its batch has run
+        return self.submit(text).result()
+
+    def get_stats(self) -> Dict:
+        # report how full batches were
+        with self._stats_lock:
+            batches = self._batches
+            return {
+                'batches': batches,
+                'items': self._items,
+                'fullBatches': self._full_batches,
+                'avgBatchSize': self._items / batches if batches else 0.0,
+                'avgFillRatio': self._items / (batches * self.max_batch_size) if batches else 0.0,
+                'batchSizeHistogram': dict(sorted(self._batch_sizes.items())),
+                'maxBatchSize': self.max_batch_size,
+                'maxWaitMs': self.max_wait * 1000.0
+            }
+
+    def _ensure_worker(self):
+        # start the worker thread lazily, and again in a forked child
+        # (threads don't survive fork, so a pre-fork worker is useless in gunicorn workers)
+        pid = os.getpid()
+        if self._worker is not None and self._worker_pid == pid:
+            return
+        with self._start_lock:
+            if self._worker is not None and self._worker_pid == pid:
+                return
+            if self._worker_pid != pid:
+                # drop any requests inherited from the parent process
+                self._queue = queue.Queue()
+            self._worker = threading.Thread(target=self._run, name='encode-batcher', daemon=True)
+            self._worker_pid = pid
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            # gather more requests until the batch is full or the wait runs out
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        batch.append(self._queue.get_nowait())
+                    else:
+                        batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[tuple]):
+        # encode each distinct text once and hand every caller its row
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            embeddings = self.encode_fn(texts)
+        except Exception as e:
+            logger.error(f"Batched encode failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        rows = {text: i for i, text in enumerate(texts)}
+        for text, future in batch:
+            future.set_result(embeddings[rows[text]])
+
+        with self._stats_lock:
+            self._batches += 1
+            self._items += len(batch)
+            if len(batch) >= self.max_batch_size:
+                self._full_batches += 1
+            self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
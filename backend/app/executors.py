@@ -0,0 +1,119 @@
+import os
+import threading
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# bounded executors for the expensive parts of a request (model inference, uncached searches)
+# gunicorn runs gthread workers, so every request has its own thread and cheap lookups answer
+# right away; heavy work is handed to a small pool with a fixed number of slots
+# (running + queued), and a request that finds the pool full fails fast with ExecutorBusy
+# instead of tying up another thread, so the remaining threads stay free for cheap requests
+# run() waits for the result on the request thread, so the pools cap concurrency rather than
+# free request threads: up to every slot of every pool can hold a request thread at once, and
+# gunicorn.conf.py sizes `threads` above that total
+
+
+class ExecutorBusy(RuntimeError):
+    # raised when every slot of an executor is taken
+    pass
+
+
+class BoundedExecutor:
+    # thread pool admitting at most max_workers running + max_queue waiting tasks
+    # the pool is created lazily per process: threads don't survive a fork, so a pool
+    # started in the gunicorn master is replaced in each worker
+
+    def __init__(self, name: str, max_workers: int, max_queue: int = 0):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._in_flight = 0
+        self._running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        # schedule fn(*args, **kwargs), raises ExecutorBusy when no slot is free
+        with self._lock:
+            self._ensure_pool()
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorBusy(f"{self.name} executor is busy")
+            self._in_flight += 1
+            self.submitted += 1
+            pool = self._pool
+        try:
+            return pool.submit(self._run, fn, args, kwargs)
+        except BaseException:
+            self._release(started=False)
+            raise
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        # run fn on the pool and wait for its result (exceptions are re-raised here)
+        # the calling thread blocks meanwhile, so this limits how many run at once, it doesn't
+        # hand the request thread back
+        return self.submit(fn, *args, **kwargs).result()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'maxWorkers': self.max_workers,
+                'maxQueue': self.max_queue,
+                'running': self._running,
+                'queued': self._in_flight - self._running,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'rejected': self.rejected
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            pool = self._pool if self._pid == os.getpid() else None
+            self._pool = None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def _ensure_pool(self):
+        # (called with the lock held)
+        if self._pool is not None and self._pid == os.getpid():
+            return
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        self._pid = os.getpid()
+        # tasks counted in the parent never finish in this process
+        self._in_flight = 0
+        self._running = 0
+
+    def _run(self, fn: Callable[..., Any], args, kwargs) -> Any:
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._release(started=True)
+
+    def _release(self, started: bool):
+        with self._lock:
+            self._in_flight -= 1
+            if started:
+                self._running -= 1
+                self.completed += 1
+
+
+def executor_from_env(name: str, workers_var: str, default_workers: int) -> BoundedExecutor:
+    # executor sized from the environment; EXECUTOR_QUEUE_SIZE is the waiting room of each pool
+    return BoundedExecutor(
+        name,
+        max_workers=int(os.environ.get(workers_var, default_workers)),
+        max_queue=int(os.environ.get('EXECUTOR_QUEUE_SIZE', 4))
+    )
@@ -1,8 +1,13 @@
 import logging
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict, Set
 from app.embedding_service import EmbeddingService
 from app.semantic_graph import SemanticGraph
 from app.word_database import WordDatabase
+from app.lru_cache import LRUCache
+from app.puzzle_pool import PuzzlePool, Puzzle
+from app.path_dag import PathDAG
+from app import artifacts
+from app.startup import startup_timer
 
 logger = logging.getLogger(__name__)
 
@@ -12,24 +17,66 @@ class GameService:
         # embedding service for generating word vectors
         # semantic graph for finding paths between words
 
-    def __init__(self, similarity_threshold: float = 0.45, word_file: Optional[str] = None):
+    def __init__(self, similarity_threshold: float = 0.45, word_file: Optional[str] = None,
+                 puzzle_pool_size: int = 32, artifact_dir: Optional[str] = None,
+                 embedding_service: Optional[EmbeddingService] = None, max_preload_words: Optional[int] = 400,
+                 freeze_vocabulary: bool = False, graph_build_workers: int = 1, path_search: str = 'bfs',
+                 landmark_count: int = 32):
         # init game service
+        # puzzle_pool_size: puzzles kept per step count (2-6) for /game/new, 0 disables the pool
+        # artifact_dir: prebuilt bundle from build_artifacts.py, loaded instead of embedding
+        #   the vocabulary when its model, threshold and vocabulary match
+        # max_preload_words: words embedded at startup without a bundle, None loads them all
+        # freeze_vocabulary: keep the loaded graph fixed; words outside it get temporary
+        #   embeddings and are searched as virtual nodes instead of being inserted
+        # graph_build_workers: processes for the vocabulary threshold join (offline builds use all cores)
+        # path_search: 'bfs' or 'astar' for optimal paths (see SemanticGraph.find_path)
+        # landmark_count: landmark distance tables bounding / pruning path searches
+        #   (app/landmarks.py), loaded from the bundle when it has them, 0 disables
         logger.info("Initializing game service...")
 
         # init components
-        self.embedding_service = EmbeddingService()
+        self.embedding_service = embedding_service or EmbeddingService()
         self.word_database = WordDatabase(word_file)
         self.semantic_graph = SemanticGraph(
             self.embedding_service,
-            similarity_threshold=similarity_threshold
+            similarity_threshold=similarity_threshold,
+            build_workers=graph_build_workers,
+            path_search=path_search
         )
 
+        # reverse BFS distance maps from active target words, used for hints
+        # each entry is (graph version, {word: steps to target})
+        self.distance_fields = LRUCache(256)
+
+        # shortest-path DAGs (every optimal route) for scoring, each entry is (graph version, dag)
+        self.path_dags = LRUCache(256)
+
         # pre-load common words into the graph for better performance
-        self._preload_words()
+        bundle = self._load_artifacts(artifact_dir) if artifact_dir else None
+        if bundle is None:
+            self._preload_words(max_preload_words)
+        if landmark_count > 0:
+            self._load_landmarks(bundle, landmark_count)
+        if freeze_vocabulary:
+            self.semantic_graph.freeze_vocabulary()
+
+        # verified puzzles are produced in the background so /game/new never searches
+        self.puzzle_pool: Optional[PuzzlePool] = None
+        if puzzle_pool_size > 0:
+            self.puzzle_pool = PuzzlePool(
+                self.generate_puzzles,
+                capacity=puzzle_pool_size,
+                low_watermark=max(1, puzzle_pool_size // 4),
+                version_fn=lambda: self.semantic_graph.version
+            )
+            if bundle is not None:
+                self.puzzle_pool.add(self._bundle_puzzles(bundle))
+            self.puzzle_pool.start()
 
         logger.info("Game service initialized successfully")
 
-    def _preload_words(self, max_words: int = 400):
+    def _preload_words(self, max_words: Optional[int] = 400):
         # pre-load words into the semantic graph for better connectivity
         # increased to 400 for better variety while maintaining speed
         # uses random sampling to ensure diverse word selection
@@ -37,15 +84,70 @@ class GameService:
         all_words = self.word_database.get_all_words()
         
         # Use random sampling instead of first N words for better variety
-        if len(all_words) > max_words:
+        if max_words is not None and len(all_words) > max_words:
             words_to_load = random.sample(all_words, max_words)
         else:
             words_to_load = all_words
 
         logger.info(f"Pre-loading {len(words_to_load)} diverse words into semantic graph...")
-        self.semantic_graph.add_words(words_to_load)
+        # load the model up front so readiness reports it as its own phase
+        self.embedding_service.load_model()
+        with startup_timer.phase('vocab_embed'):
+            embeddings = self.embedding_service.encode(words_to_load)
+        with startup_timer.phase('graph_build'):
+            self.semantic_graph.add_words(words_to_load, embeddings)
         logger.info(f"Pre-loading complete. Graph now has {len(self.semantic_graph.get_all_words())} words")
 
+    def _load_artifacts(self, artifact_dir: str) -> Optional[artifacts.ArtifactBundle]:
+        # load a prebuilt bundle into the semantic graph, None if it's missing or stale
+        manifest = artifacts.read_manifest(artifact_dir)
+        if manifest is None:
+            logger.warning(f"No artifact bundle in {artifact_dir}, embedding vocabulary at startup")
+            return None
+
+        mismatch = artifacts.bundle_mismatch(
+            manifest,
+            self.embedding_service.model_name,
+            self.semantic_graph.similarity_threshold,
+            self.word_database.get_all_words(),
+            self.embedding_service.backend
+        )
+        if mismatch:
+            logger.warning(f"Ignoring artifact bundle in {artifact_dir}: {mismatch}")
+            return None
+
+        with startup_timer.phase('artifact_load'):
+            bundle = artifacts.load_bundle(artifact_dir)
+            self.semantic_graph.load_arrays(bundle.words, bundle.embeddings, bundle.indptr, bundle.indices)
+        logger.info(f"Loaded artifact bundle from {artifact_dir} ({manifest['created_at']})")
+        return bundle
+
+    def _load_landmarks(self, bundle: Optional[artifacts.ArtifactBundle], count: int):
+        # bundled tables when they cover the loaded graph, otherwise build them now
+        if bundle is not None and bundle.landmark_distances is not None:
+            try:
+                self.semantic_graph.load_landmarks(bundle.landmark_ids, bundle.landmark_distances)
+                return
+            except ValueError as e:
+                logger.warning(f"Ignoring bundled landmark tables: {e}")
+        with startup_timer.phase('landmarks'):
+            self.semantic_graph.build_landmarks(count)
+
+    def _bundle_puzzles(self, bundle: artifacts.ArtifactBundle) -> List[Puzzle]:
+        # puzzles stored in a bundle were verified on the bundled graph, which is the current one
+        version = self.semantic_graph.version
+        return [
+            Puzzle(p['start'], p['target'], p['path'], len(p['path']) - 1, version)
+            for p in bundle.puzzles
+        ]
+
+    def prepare_for_fork(self):
+        # quiesce background threads and freeze shared arrays before gunicorn forks workers
+        # the puzzle producer restarts in each worker on first use (it is pid-aware)
+        if self.puzzle_pool is not None:
+            self.puzzle_pool.stop(wait=True)
+        self.semantic_graph.freeze()
+
     def validate_word(self, word: str) -> bool:
         # validate a word
         return self.word_database.word_exists(word)
@@ -70,6 +172,101 @@ class GameService:
         path = self.semantic_graph.bfs_path(start_word, target_word, max_steps)
         return path
 
+    def get_distance_field(self, target_word: str, max_steps: int = 6) -> Dict[str, int]:
+        # hop distance from every word within max_steps to target_word
+        # computed with one reverse BFS per target and reused until the graph gains edges
+        target = target_word.lower().strip()
+        cache_key = (target, max_steps)
+        cached = self.distance_fields.get(cache_key)
+        if cached is not LRUCache.MISSING and cached[0] == self.semantic_graph.version:
+            return cached[1]
+
+        # add the target first, then tag the field with the version read before the search:
+        # a commit racing with the search can only make the entry look older (a later miss)
+        self.semantic_graph.add_word(target)
+        version = self.semantic_graph.version
+        distances, _ = self.semantic_graph.level_bfs(target, max_steps=max_steps)
+        self.distance_fields.put(cache_key, (version, distances))
+        return distances
+
+    def get_path_dag(self, start_word: str, target_word: str, max_steps: int = 6) -> Optional[PathDAG]:
+        # all shortest paths between two words, reused until the graph gains edges
+        cache_key = (start_word.lower().strip(), target_word.lower().strip(), max_steps)
+        cached = self.path_dags.get(cache_key)
+        if cached is not LRUCache.MISSING and cached[0] == self.semantic_graph.version:
+            return cached[1]
+
+        # a dag carries the snapshot it was built on; a miss is tagged with the version
+        # read before the search, so a racing commit can only make it look older
+        version = self.semantic_graph.version
+        dag = self.semantic_graph.path_dag(start_word, target_word, max_steps)
+        self.path_dags.put(cache_key, (dag.snapshot.version if dag is not None else version, dag))
+        return dag
+
+    def get_alternative_paths(self, start_word: str, target_word: str, exclude: List[Optional[List[str]]],
+                              limit: int = 3) -> Tuple[int, List[List[str]]]:
+        # (number of optimal paths, up to limit optimal paths other than the excluded ones)
+        if not self.validate_word(start_word) or not self.validate_word(target_word):
+            return 0, []
+        dag = self.get_path_dag(start_word, target_word)
+        if dag is None:
+            return 0, []
+        excluded = {tuple(w.lower().strip() for w in path) for path in exclude if path}
+        alternatives = []
+        for path in dag.iter_paths(limit + len(excluded)):
+            if tuple(path) not in excluded:
+                alternatives.append(path)
+            if len(alternatives) >= limit:
+                break
+        return dag.count(), alternatives
+
+    def has_distance_field(self, target_word: str, max_steps: int = 6) -> bool:
+        # whether get_distance_field would answer from the cache (no search)
+        cached = self.distance_fields.peek((target_word.lower().strip(), max_steps))
+        return cached is not LRUCache.MISSING and cached[0] == self.semantic_graph.version
+
+    def has_puzzles(self) -> bool:
+        # whether get_random_word_pair can be served from the puzzle pool
+        return self.puzzle_pool is not None and sum(self.puzzle_pool.depth().values()) > 0
+
+    def get_hint(self, current_word: str, target_word: str, used_words: Set[str]) -> Tuple[Optional[str], Optional[int]]:
+        # pick the next word towards the target from the target's distance field
+        # returns (hint_word, steps_remaining); steps_remaining is None when the target
+        # can't be reached from current_word within 6 steps
+        if not self.validate_word(current_word) or not self.validate_word(target_word):
+            return None, None
+
+        current = current_word.lower().strip()
+        if not self.semantic_graph.word_exists(current):
+            self.semantic_graph.add_word(current)
+
+        distance_field = self.get_distance_field(target_word)
+        neighbors = self.semantic_graph.get_neighbors(current)
+        steps_remaining = distance_field.get(current)
+        if steps_remaining is None and not self.semantic_graph.word_exists(current):
+            # a word outside the frozen vocabulary is one hop past its closest graph neighbor
+            reachable = [distance_field[n] for n in neighbors if n in distance_field]
+            if reachable and min(reachable) < 6:
+                steps_remaining = min(reachable) + 1
+        if not steps_remaining:
+            return None, None
+
+        # any unused neighbor one step closer to the target lies on a shortest path
+        candidates = []
+        for neighbor in neighbors:
+            if neighbor in used_words:
+                continue
+            distance = distance_field.get(neighbor)
+            if distance is not None:
+                candidates.append((distance, neighbor))
+
+        if not candidates:
+            return None, steps_remaining
+
+        # closest unused neighbor, alphabetical among ties so hints are stable
+        _, hint_word = min(candidates)
+        return hint_word, steps_remaining
+
     def validate_path(self, path: List[str]) -> Tuple[bool, Optional[str]]:
         # validate a player's path
         # path: list of words representing the player's path
@@ -101,22 +298,12 @@ class GameService:
         # Normalize all words first
         normalized_path = [word.lower().strip() for word in path]
         
-        # Batch add all words to the graph first to ensure proper connections
-        # This ensures that when we check connections, all words are already in the graph
-        # and connected to each other if they meet the similarity threshold
-        words_to_add = [word for word in normalized_path if not self.semantic_graph.word_exists(word)]
-        if words_to_add:
-            self.semantic_graph.add_words(words_to_add)
-        
-        # Now check semantic connections between consecutive words
-        # All words are now guaranteed to be in the graph
-        for i in range(len(normalized_path) - 1):
-            word1 = normalized_path[i]
-            word2 = normalized_path[i + 1]
-
-            # check if words are semantically connected
-            # Both words are now guaranteed to be in the graph
-            if not self.semantic_graph.are_connected(word1, word2):
+        # check semantic connections between all consecutive words at once
+        # (get_similarities batch-adds words missing from the graph first)
+        pairs = list(zip(normalized_path, normalized_path[1:]))
+        similarities = self.semantic_graph.get_similarities(pairs)
+        for (word1, word2), similarity in zip(pairs, similarities.tolist()):
+            if similarity < self.semantic_graph.similarity_threshold:
                 return False, f"Words '{word1}' and '{word2}' are not semantically connected"
 
         return True, None
@@ -145,7 +332,8 @@ class GameService:
         if player_path[-1].lower().strip() != target_word.lower().strip():
             return 0, f"Path must end with '{target_word}'", algorithm_path
         
-        # get algorithm's optimal path
+        # get algorithm's optimal path again: validate_path may have added words to the graph.
+        # this is a path cache hit unless those words actually added edges
         algorithm_path = self.find_optimal_path(start_word, target_word, max_steps=6)
         
         if algorithm_path is None:
@@ -187,11 +375,62 @@ class GameService:
         
         return score, message, algorithm_path
 
+    def generate_puzzles(self) -> List[Puzzle]:
+        # produce a batch of verified puzzles for the pool
+        # one vectorized BFS from a random graph word gives candidate targets at every
+        # step count, and only words already in the graph are used (no model calls)
+        import random
+        words = self.semantic_graph.get_all_words()
+        if len(words) < 2:
+            return []
+
+        start = random.choice(words)
+        if not self.validate_word(start):
+            return []
+
+        version = self.semantic_graph.version
+        distances, _ = self.semantic_graph.level_bfs(start, max_steps=6)
+        targets_by_steps: Dict[int, List[str]] = {}
+        for word, steps in distances.items():
+            if 2 <= steps <= 6 and self.validate_word(word):
+                targets_by_steps.setdefault(steps, []).append(word)
+
+        puzzles = []
+        for steps, targets in targets_by_steps.items():
+            target = random.choice(targets)
+            path = self.semantic_graph.bfs_path(start, target, max_steps=6)
+            if path and len(path) - 1 == steps:
+                puzzles.append(Puzzle(start, target, path, steps, version))
+        return puzzles
+
+    def get_puzzle(self, steps: Optional[int] = None) -> Optional[Puzzle]:
+        # pop a verified puzzle from the pool, None when the pool is empty
+        # puzzles verified on an older graph are re-checked (a cached BFS) before use
+        if self.puzzle_pool is None:
+            return None
+        self.puzzle_pool.start()
+
+        for _ in range(self.puzzle_pool.capacity):
+            puzzle = self.puzzle_pool.pop(steps)
+            if puzzle is None:
+                return None
+            if puzzle.graph_version == self.semantic_graph.version:
+                return puzzle
+
+            path = self.semantic_graph.bfs_path(puzzle.start, puzzle.target, max_steps=6)
+            if path and 2 <= len(path) - 1 <= 6:
+                return Puzzle(puzzle.start, puzzle.target, path, len(path) - 1, self.semantic_graph.version)
+        return None
+
     def get_random_word_pair(self) -> Tuple[str, str]:
         # get a random pair of words that have a path between them (2-6 steps)
-        # optimized for speed: prefer pre-loaded words, but allow fallback
+        # served from the puzzle pool; the search below only runs while the pool is empty
         import random
 
+        puzzle = self.get_puzzle()
+        if puzzle is not None:
+            return puzzle.start, puzzle.target
+
         # prefer words already in the graph (pre-loaded) for speed
         words_in_graph = self.semantic_graph.get_all_words()
         all_words = self.word_database.get_all_words()
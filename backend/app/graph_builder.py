@@ -0,0 +1,96 @@
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# blocked threshold join: every pair of embedding rows with similarity >= threshold
+# the similarity matrix is never materialized, only block_size x block_size tiles of it,
+# and each tile is reduced to its edges with np.nonzero before the next one is computed,
+# so peak memory is set by the block size plus the edges found, not by the vocabulary squared
+#
+# row blocks are independent, so with workers > 1 they are spread over a process pool;
+# workers are forked and inherit the matrix copy-on-write (no pickling of embeddings)
+
+DEFAULT_BLOCK_SIZE = 2048
+
+# embeddings shared with forked pool workers (set only while a pool is running)
+_join_matrix: Optional[np.ndarray] = None
+
+
+def threshold_join(embeddings: np.ndarray, similarity_threshold: float, start: int = 0,
+                   block_size: int = DEFAULT_BLOCK_SIZE, workers: int = 1) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    # yield (sources, targets) edge blocks for the normalized rows of embeddings:
+    # every pair i > j with i >= start and embeddings[i] . embeddings[j] >= similarity_threshold
+    # (start > 0 joins only the rows added since start, against everything before them)
+    # edges come out one row block at a time (in row order) as int32 arrays
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    num_rows = len(embeddings)
+    row_blocks = [(r0, min(r0 + block_size, num_rows)) for r0 in range(start, num_rows, block_size)]
+    if not row_blocks:
+        return
+
+    workers = min(workers, len(row_blocks))
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        for r0, r1 in row_blocks:
+            yield _join_rows(embeddings, similarity_threshold, r0, r1, block_size)
+        return
+
+    yield from _parallel_join(embeddings, similarity_threshold, row_blocks, block_size, workers)
+
+
+def _parallel_join(embeddings: np.ndarray, similarity_threshold: float, row_blocks: List[Tuple[int, int]],
+                   block_size: int, workers: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    # at most 2 * workers blocks are in flight, so finished edges don't pile up unread
+    global _join_matrix
+    logger.info(f"Joining {len(row_blocks)} row blocks of {len(embeddings)} embeddings on {workers} workers")
+    _join_matrix = embeddings
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as executor:
+            pending = deque()
+            for r0, r1 in row_blocks:
+                pending.append(executor.submit(_join_shared_rows, similarity_threshold, r0, r1, block_size))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    finally:
+        _join_matrix = None
+
+
+def _join_shared_rows(similarity_threshold: float, r0: int, r1: int, block_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    # pool task: runs in a forked worker against the inherited matrix
+    return _join_rows(_join_matrix, similarity_threshold, r0, r1, block_size)
+
+
+def _join_rows(embeddings: np.ndarray, similarity_threshold: float, r0: int, r1: int,
+               block_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    # edges from rows [r0, r1) to every earlier row, one column tile at a time
+    rows = embeddings[r0:r1]
+    sources = []
+    targets = []
+    for c0 in range(0, r1, block_size):
+        c1 = min(c0 + block_size, r1)
+        mask = rows @ embeddings[c0:c1].T >= similarity_threshold
+        if c1 > r0:
+            # tile crosses the diagonal: keep only column < row (no self loops, each pair once)
+            mask &= np.tri(r1 - r0, c1 - c0, k=r0 - c0 - 1, dtype=bool)
+        tile_rows, tile_cols = np.nonzero(mask)
+        sources.append((tile_rows + r0).astype(np.int32))
+        targets.append((tile_cols + c0).astype(np.int32))
+    return np.concatenate(sources), np.concatenate(targets)
+
+
+def collect_edges(blocks: Iterator[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    # concatenate streamed edge blocks (8 bytes per edge)
+    sources = []
+    targets = []
+    for block_sources, block_targets in blocks:
+        sources.append(block_sources)
+        targets.append(block_targets)
+    if not sources:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+    return np.concatenate(sources), np.concatenate(targets)
@@ -0,0 +1,106 @@
+import os
+import threading
+import logging
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceNotReady(RuntimeError):
+    # raised when the service is still initializing (or initialization failed)
+    pass
+
+
+class BackgroundInitializer:
+    # builds an expensive object (the game service) once, either in a background thread
+    # started at app creation or synchronously on first use when background init is off
+    # the thread is per process: after a fork (gunicorn workers) it is started again
+    # unless the parent already finished
+
+    NOT_STARTED = 'not_started'
+    INITIALIZING = 'initializing'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+        self._value: Any = None
+        self._error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+
+    def start(self):
+        # start initializing in the background (no-op when ready or already running here)
+        # also retries after a failed attempt
+        with self._lock:
+            if self._value is not None or self._running():
+                return
+            self._error = None
+            self._thread = threading.Thread(target=self._run, name='service-init', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def get(self, timeout: Optional[float] = 0) -> Any:
+        # the initialized value
+        # once a background attempt was started in this process, waits up to timeout seconds
+        # (None waits forever) and raises ServiceNotReady if it isn't done or failed (start()
+        # retries); without one, initializes synchronously
+        if self._value is not None:
+            return self._value
+
+        with self._lock:
+            thread = self._thread if self._started_here() else None
+        if thread is not None:
+            thread.join(timeout)
+            if self._value is None:
+                raise ServiceNotReady(self._error or "Service is still initializing")
+            return self._value
+
+        with self._lock:
+            if self._value is None:
+                self._initialize()
+            if self._value is None:
+                raise ServiceNotReady(self._error)
+            return self._value
+
+    def is_ready(self) -> bool:
+        return self._value is not None
+
+    def status(self) -> Dict:
+        with self._lock:
+            if self._value is not None:
+                state = self.READY
+            elif self._running():
+                state = self.INITIALIZING
+            elif self._error is not None:
+                state = self.FAILED
+            else:
+                state = self.NOT_STARTED
+            return {'status': state, 'error': self._error}
+
+    def _started_here(self) -> bool:
+        # a thread started in another process (before a fork) doesn't exist here
+        return self._thread is not None and self._thread_pid == os.getpid()
+
+    def _running(self) -> bool:
+        return self._started_here() and self._thread.is_alive()
+
+    def _run(self):
+        # hold no lock while building, so status() stays responsive
+        value = self._build()
+        with self._lock:
+            if value is not None and self._value is None:
+                self._value = value
+
+    def _initialize(self):
+        # synchronous path, called with the lock held
+        self._value = self._build()
+
+    def _build(self) -> Any:
+        try:
+            return self.factory()
+        except Exception as e:
+            logger.error(f"Service initialization failed: {e}")
+            self._error = str(e)
+            return None
@@ -0,0 +1,285 @@
+import logging
+from typing import Dict, Optional, Sequence
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# landmark distance oracle (ALT): hop distances from a few well-spread landmark words to every
+# word, one uint8 row per landmark (32 landmarks cost 32 bytes per word)
+# by the triangle inequality, for any landmark L and words u, v:
+#   |d(L, u) - d(L, v)| <= d(u, v) <= d(L, u) + d(L, v)
+# so a column lookup per landmark bounds the distance of any pair without a search, and a
+# landmark that reaches exactly one of the two proves they are disconnected
+#
+# landmarks are chosen farthest-point first: each next landmark is the word farthest from all
+# chosen so far (words no landmark reaches count as farthest, so every sizeable component
+# gets one), which spreads them over the periphery where the bounds are tightest
+
+UNREACHABLE = 255
+MAX_DISTANCE = 254
+
+
+def bfs_distances(adjacency, num_nodes: int, source: int) -> np.ndarray:
+    # hop distance from source to every node as uint8, UNREACHABLE where there is no path
+    # (distances past MAX_DISTANCE are clipped to it)
+    distances = np.full(num_nodes, UNREACHABLE, dtype=np.uint8)
+    distances[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    level = 0
+    while len(frontier):
+        level += 1
+        neighbors, _ = adjacency.expand(frontier)
+        frontier = np.unique(neighbors[distances[neighbors] == UNREACHABLE])
+        distances[frontier] = min(level, MAX_DISTANCE)
+    return distances
+
+
+class _ColumnTail:
+    # growable (k, capacity) buffer for the columns of words added after the base
+    # shared by every index extended from the same base; size counts the columns in use, so
+    # only the newest index (the one whose columns end at size) may write past it
+    __slots__ = ('data', 'size')
+
+    def __init__(self, data: np.ndarray, size: int = 0):
+        self.data = data
+        self.size = size
+
+
+def _merge_columns(ids: np.ndarray, columns: np.ndarray, new_ids: np.ndarray, new_columns: np.ndarray):
+    # union of two sorted (ids, node-major columns) sets, new_ids replacing ids they share
+    keep = ~np.isin(ids, new_ids)
+    ids = np.concatenate([ids[keep], new_ids])
+    columns = np.concatenate([columns[keep], new_columns])
+    order = np.argsort(ids, kind='stable')
+    return ids[order], columns[order]
+
+
+class LandmarkIndex:
+    # immutable landmark tables over one graph snapshot; updates return a new index,
+    # so readers holding a snapshot never see a half-updated table
+    #
+    # storage is copy-on-write like EmbeddingMatrix: columns [0, base_size) sit in a frozen
+    # base (built tables, or a memory-mapped bundle) that is never written, later words go
+    # to a capacity-doubled tail that extended indexes share, and existing columns an
+    # extension lowers go to a small sorted overlay private to the new index
+    # the overlay is folded into a new base once it grows past merge_threshold (or 1/8 of
+    # the words), so a commit costs O(k) per changed column instead of O(k * words)
+
+    def __init__(self, landmark_ids: np.ndarray, distances: np.ndarray, merge_threshold: int = 4096):
+        # landmark_ids: (k,) node ids; distances: (k, num_nodes) uint8, row i from landmark_ids[i]
+        self.landmark_ids = np.asarray(landmark_ids, dtype=np.int32)
+        self.merge_threshold = merge_threshold
+        self._base = distances
+        self._tail = _ColumnTail(np.zeros((len(self.landmark_ids), 0), dtype=np.uint8))
+        self._num_nodes = distances.shape[1]
+        self._overlay_ids = np.zeros(0, dtype=np.int64)
+        self._overlay_columns = np.zeros((0, len(self.landmark_ids)), dtype=np.uint8)
+        # largest finite distance in each row (the landmark's eccentricity)
+        # extended indexes only raise it from the columns they change, so it may over-estimate
+        # after decreases, which keeps max_lower_bound a valid cap
+        if distances.size:
+            self.eccentricities = np.where(distances == UNREACHABLE, 0, distances).max(axis=1).astype(np.int64)
+        else:
+            self.eccentricities = np.zeros(len(self.landmark_ids), dtype=np.int64)
+
+    @classmethod
+    def build(cls, adjacency, num_nodes: int, count: int = 32) -> 'LandmarkIndex':
+        # choose up to count landmarks farthest-point first and BFS from each
+        # the first is the best-connected word; isolated words are never chosen
+        degrees = adjacency.degrees()[:num_nodes]
+        candidates = degrees > 0
+        if count <= 0 or not candidates.any():
+            return cls(np.zeros(0, dtype=np.int32), np.zeros((0, num_nodes), dtype=np.uint8))
+
+        landmark = int(np.argmax(degrees))
+        landmark_ids = []
+        rows = []
+        # distance to the nearest landmark, unreachable counting as farther than anything
+        nearest = np.full(num_nodes, UNREACHABLE, dtype=np.int16)
+        while len(landmark_ids) < count:
+            row = bfs_distances(adjacency, num_nodes, landmark)
+            landmark_ids.append(landmark)
+            rows.append(row)
+            np.minimum(nearest, row, out=nearest)
+            # farthest candidate, best connected among ties
+            priority = np.where(candidates, nearest, -1)
+            farthest = np.flatnonzero(priority == priority.max())
+            landmark = int(farthest[np.argmax(degrees[farthest])])
+            if nearest[landmark] <= 0:
+                break
+
+        logger.info(f"Built {len(landmark_ids)} landmark distance tables over {num_nodes} words")
+        return cls(np.array(landmark_ids, dtype=np.int32), np.stack(rows))
+
+    def __len__(self) -> int:
+        return len(self.landmark_ids)
+
+    @property
+    def num_nodes(self) -> int:
+        return self._num_nodes
+
+    @property
+    def base_size(self) -> int:
+        return self._base.shape[1]
+
+    @property
+    def overlay_size(self) -> int:
+        return len(self._overlay_ids)
+
+    @property
+    def distances(self) -> np.ndarray:
+        # (k, num_nodes) tables; a view of the base when nothing was added since, otherwise a copy
+        if self._num_nodes == self.base_size:
+            if not len(self._overlay_ids):
+                return self._base
+            distances = self._base.copy()
+        else:
+            distances = np.empty((len(self), self._num_nodes), dtype=np.uint8)
+            distances[:, :self.base_size] = self._base
+            distances[:, self.base_size:] = self._tail.data[:, :self._num_nodes - self.base_size]
+        distances[:, self._overlay_ids] = self._overlay_columns.T
+        return distances
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._base.nbytes + self._tail.data.nbytes + self._overlay_columns.nbytes
+                   + self._overlay_ids.nbytes + self.landmark_ids.nbytes)
+
+    def _columns(self, node_ids: np.ndarray) -> np.ndarray:
+        # (k, len(node_ids)) landmark distances of the given nodes, a copy
+        base_size = self.base_size
+        in_base = node_ids < base_size
+        if in_base.all():
+            columns = self._base[:, node_ids]
+        else:
+            columns = np.empty((len(self), len(node_ids)), dtype=np.uint8)
+            columns[:, in_base] = self._base[:, node_ids[in_base]]
+            columns[:, ~in_base] = self._tail.data[:, node_ids[~in_base] - base_size]
+        if len(self._overlay_ids):
+            positions = np.minimum(np.searchsorted(self._overlay_ids, node_ids), len(self._overlay_ids) - 1)
+            hit = self._overlay_ids[positions] == node_ids
+            if hit.any():
+                columns[:, hit] = self._overlay_columns[positions[hit]].T
+        return columns
+
+    def lower_bounds(self, node_ids, target_id: int) -> np.ndarray:
+        # lower bound on the hop distance from each node to target_id (int64),
+        # UNREACHABLE when some landmark proves there is no path
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        if len(self) == 0:
+            return np.zeros(len(node_ids), dtype=np.int64)
+        columns = self._columns(np.append(node_ids, target_id)).astype(np.int64)
+        node_rows = columns[:, :-1]
+        target_row = columns[:, -1:]
+        node_reached = node_rows != UNREACHABLE
+        target_reached = target_row != UNREACHABLE
+        gaps = np.where(node_reached & target_reached, np.abs(node_rows - target_row), 0)
+        bounds = gaps.max(axis=0)
+        bounds[(node_reached != target_reached).any(axis=0)] = UNREACHABLE
+        return bounds
+
+    def max_lower_bound(self, target_id: int) -> int:
+        # largest lower_bounds value any node connected to target_id can get, from the
+        # eccentricities alone (searches skip the per-node check when it fits their budget)
+        if len(self) == 0:
+            return 0
+        target_row = self._columns(np.array([target_id], dtype=np.int64))[:, 0].astype(np.int64)
+        reached = target_row != UNREACHABLE
+        if not reached.any():
+            return 0
+        return int(np.maximum(target_row, self.eccentricities - target_row)[reached].max())
+
+    def lower_bound(self, source_id: int, target_id: int) -> int:
+        return int(self.lower_bounds([source_id], target_id)[0])
+
+    def upper_bound(self, source_id: int, target_id: int) -> Optional[int]:
+        # shortest detour through a landmark, None when no landmark reaches both
+        columns = self._columns(np.array([source_id, target_id], dtype=np.int64)).astype(np.int64)
+        source_row, target_row = columns[:, 0], columns[:, 1]
+        both = (source_row != UNREACHABLE) & (target_row != UNREACHABLE)
+        if not both.any():
+            return None
+        return int((source_row + target_row)[both].min())
+
+    def extended(self, adjacency, num_nodes: int, new_ids: Sequence[int]) -> 'LandmarkIndex':
+        # tables after words new_ids (and their edges) were added, computed incrementally
+        # adding edges only ever shortens distances, so starting from the new words and their
+        # neighbors, every decrease is pushed outwards level by level until nothing changes
+        # (a few small expansions per commit instead of a BFS per landmark)
+        # callers extend one index at a time (SemanticGraph commits under its writer lock)
+        old_size = self._num_nodes
+        new_ids = np.asarray(new_ids, dtype=np.int64)
+        # columns changed by this commit, node-major: every added word starts unreachable
+        changed_ids = np.arange(old_size, num_nodes, dtype=np.int64)
+        changed = np.full((len(changed_ids), len(self)), UNREACHABLE, dtype=np.uint8)
+
+        def current(node_ids):
+            # (len(node_ids), k) distances with this commit's changes applied
+            columns = np.full((len(node_ids), len(self)), UNREACHABLE, dtype=np.uint8)
+            old = node_ids < old_size
+            if old.any():
+                columns[old] = self._columns(node_ids[old]).T
+            if len(changed_ids):
+                positions = np.minimum(np.searchsorted(changed_ids, node_ids), len(changed_ids) - 1)
+                hit = changed_ids[positions] == node_ids
+                columns[hit] = changed[positions[hit]]
+            return columns
+
+        if len(self) and len(new_ids):
+            neighbors, _ = adjacency.expand(new_ids)
+            frontier = np.unique(np.concatenate([new_ids, neighbors]))
+            while len(frontier):
+                neighbors, sources = adjacency.expand(frontier)
+                if len(neighbors) == 0:
+                    break
+                source_rows = current(frontier)[np.searchsorted(frontier, sources)].astype(np.int16)
+                relaxed = np.where(source_rows == UNREACHABLE, UNREACHABLE,
+                                   np.minimum(source_rows + 1, MAX_DISTANCE)).astype(np.uint8)
+                touched = np.unique(neighbors)
+                before = current(touched)
+                after = before.copy()
+                np.minimum.at(after, np.searchsorted(touched, neighbors), relaxed)
+                improved = (after < before).any(axis=1)
+                frontier = touched[improved]
+                changed_ids, changed = _merge_columns(changed_ids, changed, frontier, after[improved])
+
+        index = LandmarkIndex.__new__(LandmarkIndex)
+        index.landmark_ids = self.landmark_ids
+        index.merge_threshold = self.merge_threshold
+        index._base = self._base
+        index._num_nodes = num_nodes
+        added = changed_ids >= old_size
+        index._tail = self._grown_tail(num_nodes)
+        index._tail.data[:, changed_ids[added] - self.base_size] = changed[added].T
+        index._tail.size = num_nodes - self.base_size
+        index._overlay_ids, index._overlay_columns = _merge_columns(
+            self._overlay_ids, self._overlay_columns, changed_ids[~added], changed[~added])
+        # distances only drop, so the eccentricity can only grow through columns that became reachable
+        index.eccentricities = self.eccentricities
+        if len(changed):
+            index.eccentricities = np.maximum(
+                self.eccentricities, np.where(changed == UNREACHABLE, 0, changed).max(axis=0).astype(np.int64))
+        if index.overlay_size >= max(self.merge_threshold, num_nodes // 8):
+            index = LandmarkIndex(self.landmark_ids, index.distances, self.merge_threshold)
+        return index
+
+    def _grown_tail(self, num_nodes: int) -> _ColumnTail:
+        # tail with room for columns up to num_nodes: this index's own tail when it is the
+        # newest user and has capacity, otherwise a copy with doubled capacity (older
+        # indexes keep reading the buffer they hold)
+        used = self._num_nodes - self.base_size
+        needed = num_nodes - self.base_size
+        tail = self._tail
+        if tail.size == used and tail.data.shape[1] >= needed:
+            return tail
+        capacity = max(needed, 2 * tail.data.shape[1], 1024)
+        data = np.full((len(self), capacity), UNREACHABLE, dtype=np.uint8)
+        data[:, :used] = tail.data[:, :used]
+        return _ColumnTail(data, used)
+
+    def get_stats(self) -> Dict:
+        return {
+            'landmarks': len(self),
+            'words': self.num_nodes,
+            'bytes': self.nbytes
+        }
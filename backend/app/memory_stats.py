@@ -0,0 +1,56 @@
+import os
+from typing import Dict, Optional
+
+# fields of /proc/<pid>/smaps_rollup we report, all in kB
+_ROLLUP_FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty', 'Swap')
+
+
+def read_smaps_rollup(pid='self') -> Optional[Dict[str, int]]:
+    # raw smaps_rollup counters in bytes, None where /proc isn't available (non-Linux)
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    values = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].endswith(':') and parts[0][:-1] in _ROLLUP_FIELDS:
+            values[parts[0][:-1]] = int(parts[1]) * 1024
+    return values
+
+
+def process_memory(pid='self') -> Optional[Dict[str, int]]:
+    # RSS, PSS and USS of a process
+    # USS (private pages) is what each extra worker really costs; pages shared copy-on-write
+    # with the master show up in RSS but not in USS, and are split evenly in PSS
+    values = read_smaps_rollup(pid)
+    if values is None:
+        return None
+    return {
+        'pid': os.getpid() if pid == 'self' else int(pid),
+        'rssBytes': values.get('Rss', 0),
+        'pssBytes': values.get('Pss', 0),
+        'ussBytes': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0),
+        'sharedBytes': values.get('Shared_Clean', 0) + values.get('Shared_Dirty', 0),
+        'swapBytes': values.get('Swap', 0)
+    }
+
+
+def child_pids(pid: int):
+    # direct children of a process (e.g. the workers of a gunicorn master)
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # the command name is in parentheses and may contain spaces, the ppid follows it
+        fields = stat[stat.rindex(')') + 2:].split()
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return sorted(children)
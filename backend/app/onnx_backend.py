@@ -0,0 +1,231 @@
+import os
+import json
+import argparse
+import logging
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ONNX Runtime backend for the sentence-transformer
+# all-MiniLM-L6-v2 is a BERT encoder followed by mean pooling and L2 normalization;
+# the encoder is exported to ONNX (optionally int8-quantized) and pooling runs in NumPy,
+# so serving needs onnxruntime + tokenizers but never imports torch
+#
+# export:  python -m app.onnx_backend export --out models/onnx [--quantize]
+# check:   python -m app.onnx_backend check --onnx-dir models/onnx [--quantized]
+
+MODEL_FILE = 'model.onnx'
+QUANTIZED_MODEL_FILE = 'model.int8.onnx'
+TOKENIZER_FILE = 'tokenizer.json'
+CONFIG_FILE = 'onnx_config.json'
+
+
+def mean_pool(hidden_states: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    # average token embeddings over real (non-padding) tokens, then L2-normalize
+    # hidden_states: (batch, seq, dim), attention_mask: (batch, seq)
+    mask = attention_mask[:, :, None].astype(np.float32)
+    summed = (hidden_states * mask).sum(axis=1)
+    counts = np.clip(mask.sum(axis=1), 1e-9, None)
+    pooled = summed / counts
+    norms = np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+    return (pooled / norms).astype(np.float32)
+
+
+class OnnxEmbeddingBackend:
+    # runs an exported encoder with onnxruntime
+    # encode() takes the same arguments as SentenceTransformer.encode, so EmbeddingService
+    # can use either backend as its model
+
+    def __init__(self, model_dir: str, quantized: bool = False, num_threads: Optional[int] = None,
+                 batch_size: int = 64):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, CONFIG_FILE), 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
+        self.model_name = self.config['model_name']
+        self.quantized = quantized
+        self.batch_size = batch_size
+
+        tokenizer_path = os.path.join(model_dir, TOKENIZER_FILE)
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_padding()
+        # separate unpadded tokenizer for measuring lengths, so encode() threads never see it change
+        self._length_tokenizer = Tokenizer.from_file(tokenizer_path)
+        self._length_tokenizer.no_padding()
+        self.max_seq_length = self.config['max_seq_length']
+
+        options = onnxruntime.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        model_file = QUANTIZED_MODEL_FILE if quantized else MODEL_FILE
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, model_file), options, providers=['CPUExecutionProvider']
+        )
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+        logger.info(f"Loaded ONNX model {model_file} for {self.model_name}")
+
+    def encode(self, texts: List[str], batch_size: Optional[int] = None, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = True) -> np.ndarray:
+        # embed texts; output is always normalized float32 (the pooling includes normalization)
+        if isinstance(texts, str):
+            texts = [texts]
+        batch_size = batch_size or self.batch_size
+        chunks = [self._encode_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        if not chunks:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.concatenate(chunks)
+
+    @property
+    def max_seq_length(self) -> int:
+        return self._max_seq_length
+
+    @max_seq_length.setter
+    def max_seq_length(self, length: int):
+        self._max_seq_length = length
+        self.tokenizer.enable_truncation(length)
+        self._length_tokenizer.enable_truncation(length)
+
+    def token_lengths(self, texts: List[str]) -> List[int]:
+        # token count of each text, without padding
+        return [len(encoding.ids) for encoding in self._length_tokenizer.encode_batch(list(texts))]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config['embedding_dim']
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(list(texts))
+        feeds = {
+            'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+            'attention_mask': np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            'token_type_ids': np.array([e.type_ids for e in encodings], dtype=np.int64)
+        }
+        feeds = {name: value for name, value in feeds.items() if name in self._input_names}
+        hidden_states = self.session.run(None, feeds)[0]
+        return mean_pool(hidden_states, feeds['attention_mask'])
+
+
+def export_onnx(model_name: str, out_dir: str, quantize: bool = False, opset: int = 14) -> Dict:
+    # export the sentence-transformer's encoder to ONNX (needs torch, only run offline)
+    # quantize=True also writes a dynamically int8-quantized copy of the weights
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(out_dir, exist_ok=True)
+    model = SentenceTransformer(model_name, device='cpu')
+    encoder = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+
+    sample = tokenizer(['example'], return_tensors='pt')
+    input_names = ['input_ids', 'attention_mask', 'token_type_ids']
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+
+    model_path = os.path.join(out_dir, MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            encoder,
+            (sample['input_ids'], sample['attention_mask'], sample['token_type_ids']),
+            model_path,
+            input_names=input_names,
+            output_names=['last_hidden_state'],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset
+        )
+    tokenizer.backend_tokenizer.save(os.path.join(out_dir, TOKENIZER_FILE))
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(model_path, os.path.join(out_dir, QUANTIZED_MODEL_FILE), weight_type=QuantType.QInt8)
+
+    config = {
+        'model_name': model_name,
+        'embedding_dim': model.get_sentence_embedding_dimension(),
+        'max_seq_length': model.max_seq_length,
+        'opset': opset,
+        'quantized': quantize
+    }
+    with open(os.path.join(out_dir, CONFIG_FILE), 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+    logger.info(f"Exported {model_name} to {out_dir}")
+    return config
+
+
+def compare_backends(reference_encode: Callable[[List[str]], np.ndarray],
+                     candidate_encode: Callable[[List[str]], np.ndarray],
+                     words: List[str], similarity_threshold: float = 0.45, block_size: int = 1024) -> Dict:
+    # accuracy of a candidate backend against a reference over a vocabulary:
+    # cosine drift of every word's embedding, and how many graph edges
+    # (pairs with similarity >= threshold) appear or disappear
+    reference = np.asarray(reference_encode(words), dtype=np.float32)
+    candidate = np.asarray(candidate_encode(words), dtype=np.float32)
+
+    # both sides are normalized, so the row-wise dot product is the cosine
+    cosines = np.einsum('ij,ij->i', reference, candidate)
+    drift = 1.0 - cosines
+
+    reference_edges = 0
+    candidate_edges = 0
+    added = 0
+    removed = 0
+    for start in range(0, len(words), block_size):
+        end = min(start + block_size, len(words))
+        # only pairs (i, j) with j > i, each undirected edge once
+        upper = np.triu(np.ones((end - start, len(words)), dtype=bool), k=start + 1)
+        in_reference = (reference[start:end] @ reference.T >= similarity_threshold) & upper
+        in_candidate = (candidate[start:end] @ candidate.T >= similarity_threshold) & upper
+        reference_edges += int(in_reference.sum())
+        candidate_edges += int(in_candidate.sum())
+        added += int((in_candidate & ~in_reference).sum())
+        removed += int((in_reference & ~in_candidate).sum())
+
+    return {
+        'words': len(words),
+        'meanCosine': float(cosines.mean()) if len(words) else 1.0,
+        'minCosine': float(cosines.min()) if len(words) else 1.0,
+        'meanDrift': float(drift.mean()) if len(words) else 0.0,
+        'p99Drift': float(np.percentile(drift, 99)) if len(words) else 0.0,
+        'maxDrift': float(drift.max()) if len(words) else 0.0,
+        'similarityThreshold': similarity_threshold,
+        'referenceEdges': reference_edges,
+        'candidateEdges': candidate_edges,
+        'edgesAdded': added,
+        'edgesRemoved': removed,
+        'edgeChangeRate': (added + removed) / reference_edges if reference_edges else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and check the ONNX embedding backend")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help="export the model to ONNX")
+    export_parser.add_argument('--out', required=True, help="output directory")
+    export_parser.add_argument('--model', default=None, help="sentence-transformers model")
+    export_parser.add_argument('--quantize', action='store_true', help="also write an int8-quantized model")
+
+    check_parser = subparsers.add_parser('check', help="compare the ONNX backend with torch over the vocabulary")
+    check_parser.add_argument('--onnx-dir', required=True, help="directory written by export")
+    check_parser.add_argument('--quantized', action='store_true', help="check the int8 model")
+    check_parser.add_argument('--threshold', type=float, default=0.45, help="similarity threshold for edges")
+    check_parser.add_argument('--words', default=None, help="JSON word list (defaults to the built-in vocabulary)")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    from app.embedding_service import EmbeddingService, DEFAULT_MODEL_NAME
+    if args.command == 'export':
+        export_onnx(args.model or DEFAULT_MODEL_NAME, args.out, quantize=args.quantize)
+        return
+
+    from app.word_database import WordDatabase
+    words = WordDatabase(args.words).get_all_words()
+    onnx_backend = OnnxEmbeddingBackend(args.onnx_dir, quantized=args.quantized)
+    torch_service = EmbeddingService(onnx_backend.model_name, batch_max_wait_ms=0, backend='torch')
+    report = compare_backends(torch_service.encode, onnx_backend.encode, words, args.threshold)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
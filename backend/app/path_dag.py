@@ -0,0 +1,219 @@
+import random
+import logging
+from typing import Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# every shortest path between two words as a layered DAG
+# one bidirectional level BFS finds the length L and the layer where the two sides meet;
+# walking back from the meeting layer over each side's distances keeps exactly the words
+# with dist(start, w) + dist(w, target) == L, layer i holding the words i hops from the start
+# the DAG is small (a few layers of words) and answers count / sample / enumerate / membership
+# queries without searching again
+#
+# words outside a frozen vocabulary (virtual nodes) are a fixed prefix / suffix: the search
+# runs between their graph neighbors and they are added around every path
+
+
+class PathDAG:
+    # shortest-path DAG over one graph snapshot (see SemanticGraph.path_dag)
+    # layers[i]: sorted ids i hops after the prefix; edges[i]: (successor indptr, successor
+    # positions in layers[i + 1]) for each position in layers[i]
+
+    def __init__(self, snapshot, layers: List[np.ndarray], prefix: Sequence[str] = (),
+                 suffix: Sequence[str] = ()):
+        # snapshot: the GraphSnapshot the layers were built from
+        self.snapshot = snapshot
+        self.layers = layers
+        self.prefix = list(prefix)
+        self.suffix = list(suffix)
+        self.edges = [self._layer_edges(layers[i], layers[i + 1]) for i in range(len(layers) - 1)]
+
+        # paths from each layer word to the end of the DAG (int64 is plenty for <= 6 hops)
+        self.paths_to_end: List[np.ndarray] = [None] * len(layers)
+        if layers:
+            self.paths_to_end[-1] = np.ones(len(layers[-1]), dtype=np.int64)
+            for i in range(len(layers) - 2, -1, -1):
+                successor_indptr, successors = self.edges[i]
+                per_edge = self.paths_to_end[i + 1][successors]
+                sums = np.concatenate([[0], np.cumsum(per_edge)])
+                self.paths_to_end[i] = sums[successor_indptr[1:]] - sums[successor_indptr[:-1]]
+
+    @property
+    def length(self) -> int:
+        # hops of every path in the DAG
+        return len(self.prefix) + len(self.layers) + len(self.suffix) - 1
+
+    def count(self) -> int:
+        # number of distinct shortest paths
+        if not self.layers:
+            return 1
+        return int(self.paths_to_end[0].sum())
+
+    def iter_paths(self, limit: Optional[int] = None) -> Iterator[List[str]]:
+        # stream shortest paths (depth first, in word id order), at most limit of them
+        if limit is not None and limit <= 0:
+            return
+        if not self.layers:
+            yield self.prefix + self.suffix
+            return
+
+        emitted = 0
+        words = self.snapshot.embeddings.words
+        last = len(self.layers) - 1
+        # stack of (layer, position, partial path of positions)
+        stack: List[Tuple[int, int, List[int]]] = [
+            (0, position, [position]) for position in range(len(self.layers[0]) - 1, -1, -1)
+        ]
+        while stack:
+            layer, position, positions = stack.pop()
+            if layer == last:
+                ids = [int(self.layers[i][p]) for i, p in enumerate(positions)]
+                yield self.prefix + [words[i] for i in ids] + self.suffix
+                emitted += 1
+                if limit is not None and emitted >= limit:
+                    return
+                continue
+            successor_indptr, successors = self.edges[layer]
+            for successor in successors[successor_indptr[position]:successor_indptr[position + 1]][::-1].tolist():
+                stack.append((layer + 1, successor, positions + [successor]))
+
+    def sample(self, rng: Optional[random.Random] = None) -> List[str]:
+        # one shortest path drawn uniformly at random
+        # each step picks a successor in proportion to the paths continuing from it
+        rng = rng or random
+        if not self.layers:
+            return self.prefix + self.suffix
+        position = self._weighted_choice(rng, np.arange(len(self.layers[0])), self.paths_to_end[0])
+        positions = [position]
+        for i in range(len(self.layers) - 1):
+            successor_indptr, successors = self.edges[i]
+            choices = successors[successor_indptr[position]:successor_indptr[position + 1]]
+            position = self._weighted_choice(rng, choices, self.paths_to_end[i + 1][choices])
+            positions.append(position)
+        words = self.snapshot.embeddings.words
+        return self.prefix + [words[int(self.layers[i][p])] for i, p in enumerate(positions)] + self.suffix
+
+    def contains(self, path: Sequence[str]) -> bool:
+        # whether path (words, any case) is one of the shortest paths
+        path = [word.lower().strip() for word in path]
+        if len(path) != self.length + 1:
+            return False
+        inner_end = len(path) - len(self.suffix)
+        if path[:len(self.prefix)] != self.prefix or path[inner_end:] != self.suffix:
+            return False
+
+        previous = None
+        for layer, word in zip(self.layers, path[len(self.prefix):inner_end]):
+            word_id = self.snapshot.get_id(word)
+            if word_id is None:
+                return False
+            position = self._position(layer, word_id)
+            if position is None:
+                return False
+            if previous is not None and not self.snapshot.adjacency.has_edge(previous, word_id):
+                return False
+            previous = word_id
+        return True
+
+    def next_words(self, word: str) -> List[str]:
+        # words that continue a shortest path from word (empty when word is not in the DAG)
+        word = word.lower().strip()
+        words = self.snapshot.embeddings.words
+        if self.prefix and word == self.prefix[-1]:
+            if not self.layers:
+                return self.suffix[:1]
+            return [words[i] for i in self.layers[0].tolist()]
+
+        word_id = self.snapshot.get_id(word)
+        if word_id is None:
+            return []
+        for i, layer in enumerate(self.layers):
+            position = self._position(layer, word_id)
+            if position is None:
+                continue
+            if i == len(self.layers) - 1:
+                return self.suffix[:1]
+            successor_indptr, successors = self.edges[i]
+            next_ids = self.layers[i + 1][successors[successor_indptr[position]:successor_indptr[position + 1]]]
+            return [words[j] for j in next_ids.tolist()]
+        return []
+
+    def _layer_edges(self, layer: np.ndarray, next_layer: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # CSR of DAG edges from layer to next_layer, by position in each layer
+        neighbors, sources = self.snapshot.adjacency.expand(layer)
+        positions = np.searchsorted(next_layer, neighbors)
+        positions = np.minimum(positions, len(next_layer) - 1)
+        keep = next_layer[positions] == neighbors
+        source_positions = np.searchsorted(layer, sources[keep])
+        order = np.lexsort((positions[keep], source_positions))
+        successor_indptr = np.concatenate([[0], np.cumsum(np.bincount(source_positions, minlength=len(layer)))])
+        return successor_indptr, positions[keep][order]
+
+    @staticmethod
+    def _position(layer: np.ndarray, word_id: int) -> Optional[int]:
+        position = int(np.searchsorted(layer, word_id))
+        if position < len(layer) and layer[position] == word_id:
+            return position
+        return None
+
+    @staticmethod
+    def _weighted_choice(rng, choices: np.ndarray, weights: np.ndarray) -> int:
+        point = rng.random() * int(weights.sum())
+        index = int(np.searchsorted(np.cumsum(weights), point, side='right'))
+        return int(choices[min(index, len(choices) - 1)])
+
+
+def build_layers(adjacency, num_nodes: int, start_ids: Sequence[int], target_ids: Sequence[int],
+                 max_steps: int) -> Optional[List[np.ndarray]]:
+    # layers of the shortest-path DAG between two id sets, None when they are more than max_steps apart
+    # bidirectional: each round expands the smaller frontier by one whole level; the first
+    # round that reaches the other side fixes the length and the meeting layer
+    start_ids = np.unique(np.asarray(start_ids, dtype=np.int64))
+    target_ids = np.unique(np.asarray(target_ids, dtype=np.int64))
+    if len(start_ids) == 0 or len(target_ids) == 0:
+        return None
+    forward = np.full(num_nodes, -1, dtype=np.int16)
+    backward = np.full(num_nodes, -1, dtype=np.int16)
+    forward[start_ids] = 0
+    backward[target_ids] = 0
+    frontier_forward, frontier_backward = start_ids, target_ids
+    depth_forward = depth_backward = 0
+    meeting = start_ids[backward[start_ids] >= 0]
+
+    while len(meeting) == 0:
+        if depth_forward + depth_backward >= max_steps or not len(frontier_forward) or not len(frontier_backward):
+            return None
+        if len(frontier_forward) <= len(frontier_backward):
+            frontier_forward = _next_level(adjacency, frontier_forward, forward, depth_forward + 1)
+            depth_forward += 1
+            meeting = frontier_forward[backward[frontier_forward] >= 0]
+        else:
+            frontier_backward = _next_level(adjacency, frontier_backward, backward, depth_backward + 1)
+            depth_backward += 1
+            meeting = frontier_backward[forward[frontier_backward] >= 0]
+
+    # before the meeting round no word was reached from both sides, so every meeting word
+    # sits exactly depth_forward hops from the start and depth_backward from the target
+    length = depth_forward + depth_backward
+    layers: List[np.ndarray] = [None] * (length + 1)
+    layers[depth_forward] = np.sort(meeting)
+    for i in range(depth_forward - 1, -1, -1):
+        layers[i] = _adjacent_at(adjacency, layers[i + 1], forward, i)
+    for i in range(depth_forward + 1, length + 1):
+        layers[i] = _adjacent_at(adjacency, layers[i - 1], backward, length - i)
+    return layers
+
+
+def _next_level(adjacency, frontier: np.ndarray, distances: np.ndarray, level: int) -> np.ndarray:
+    neighbors, _ = adjacency.expand(frontier)
+    neighbors = np.unique(neighbors[distances[neighbors] < 0])
+    distances[neighbors] = level
+    return neighbors
+
+
+def _adjacent_at(adjacency, layer: np.ndarray, distances: np.ndarray, level: int) -> np.ndarray:
+    # neighbors of layer whose distance (from one side) is level, sorted
+    neighbors, _ = adjacency.expand(layer)
+    return np.unique(neighbors[distances[neighbors] == level])
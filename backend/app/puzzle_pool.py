@@ -0,0 +1,220 @@
+import os
+import random
+import threading
+import logging
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Puzzle(NamedTuple):
+    # a verified puzzle: start and target words plus the algorithm's optimal path
+    start: str
+    target: str
+    optimal_path: List[str]
+    steps: int
+    # graph version the path was verified at
+    graph_version: int = 0
+
+
+class PuzzlePool:
+    # bounded pool of verified puzzles, split into buckets by optimal step count
+    # a background producer keeps every bucket between low_watermark and capacity,
+    # so handing out a puzzle is an O(1) pop with no BFS on the request path
+
+    IDLE_ROUNDS_BEFORE_BACKOFF = 50
+    # a bucket that gets nothing for this many rounds in a row is exhausted: the graph
+    # (e.g. a small or sparse one) has no such pairs, so the producer stops refilling it
+    # until the graph version changes
+    DRY_ROUNDS_BEFORE_EXHAUSTED = 50
+
+    def __init__(self, generate_fn: Callable[[], List[Puzzle]], capacity: int = 32,
+                 low_watermark: int = 8, min_steps: int = 2, max_steps: int = 6,
+                 version_fn: Optional[Callable[[], int]] = None):
+        # generate_fn: produces a batch of verified puzzles (any step counts)
+        # capacity: max puzzles kept per step bucket
+        # low_watermark: the producer refills once any bucket drops below this
+        # version_fn: current graph version, exhausted buckets are retried once it changes
+        #   (without it a bucket stays exhausted)
+        self.generate_fn = generate_fn
+        self.version_fn = version_fn
+        self.capacity = capacity
+        self.low_watermark = min(low_watermark, capacity)
+        self.min_steps = min_steps
+        self.max_steps = max_steps
+
+        self.buckets: Dict[int, Deque[Puzzle]] = {
+            steps: deque() for steps in range(min_steps, max_steps + 1)
+        }
+        self._condition = threading.Condition()
+        self._producer: Optional[threading.Thread] = None
+        self._producer_pid: Optional[int] = None
+        self._stopped = False
+
+        # consecutive producer rounds that added nothing to each bucket, and the graph
+        # version each exhausted bucket was given up at
+        self._dry_rounds: Dict[int, int] = {steps: 0 for steps in self.buckets}
+        self.exhausted: Dict[int, int] = {}
+
+        # metrics
+        self.produced = 0
+        self.served = 0
+        self.empty_pops = 0
+        self.refills = 0
+
+    def start(self):
+        # start the background producer (again after a fork, threads don't survive it)
+        pid = os.getpid()
+        with self._condition:
+            if self._producer is not None and self._producer_pid == pid:
+                return
+            self._stopped = False
+            self._producer = threading.Thread(target=self._run, name='puzzle-pool', daemon=True)
+            self._producer_pid = pid
+            self._producer.start()
+
+    def stop(self, wait: bool = False):
+        # stop the producer; wait=True also joins it (before forking, so no thread holds a lock)
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            producer = self._producer if self._producer_pid == os.getpid() else None
+        if wait and producer is not None:
+            producer.join()
+
+    def pop(self, steps: Optional[int] = None) -> Optional[Puzzle]:
+        # take a puzzle, from the given step bucket or a random non-empty one
+        # returns None when the pool (or that bucket) is empty
+        with self._condition:
+            if steps is not None:
+                candidates = [steps] if self.buckets.get(steps) else []
+            else:
+                candidates = [s for s, bucket in self.buckets.items() if bucket]
+
+            if not candidates:
+                self.empty_pops += 1
+                self._condition.notify_all()
+                return None
+
+            puzzle = self.buckets[random.choice(candidates)].popleft()
+            self.served += 1
+            if self._needs_refill():
+                self._condition.notify_all()
+            return puzzle
+
+    def add(self, puzzles: List[Puzzle]) -> int:
+        # add puzzles to buckets that still have room, returns how many were kept
+        added = 0
+        with self._condition:
+            for puzzle in puzzles:
+                bucket = self.buckets.get(puzzle.steps)
+                if bucket is None or len(bucket) >= self.capacity:
+                    continue
+                bucket.append(puzzle)
+                added += 1
+            self.produced += added
+        return added
+
+    def fill(self, max_rounds: int = 100) -> int:
+        # fill the pool synchronously (used at startup and by the artifact builder)
+        added = 0
+        for _ in range(max_rounds):
+            if self.is_full():
+                break
+            added += self._add_round(self.generate_fn())
+        return added
+
+    def is_full(self) -> bool:
+        # every bucket at capacity, or exhausted on the current graph
+        with self._condition:
+            self._expire_exhausted()
+            return all(len(bucket) >= self.capacity or steps in self.exhausted
+                       for steps, bucket in self.buckets.items())
+
+    def depth(self) -> Dict[int, int]:
+        with self._condition:
+            return {steps: len(bucket) for steps, bucket in self.buckets.items()}
+
+    def get_stats(self) -> Dict:
+        depth = self.depth()
+        return {
+            'depth': depth,
+            'total': sum(depth.values()),
+            'capacity': self.capacity,
+            'lowWatermark': self.low_watermark,
+            'produced': self.produced,
+            'served': self.served,
+            'emptyPops': self.empty_pops,
+            'refills': self.refills,
+            'exhausted': sorted(self.exhausted)
+        }
+
+    def _graph_version(self) -> int:
+        return self.version_fn() if self.version_fn is not None else 0
+
+    def _expire_exhausted(self):
+        # a changed graph may have pairs that did not exist before (call with the lock held)
+        if not self.exhausted:
+            return
+        version = self._graph_version()
+        for steps in [s for s, v in self.exhausted.items() if v != version]:
+            del self.exhausted[steps]
+            self._dry_rounds[steps] = 0
+
+    def _needs_refill(self) -> bool:
+        self._expire_exhausted()
+        return any(len(bucket) < self.low_watermark and steps not in self.exhausted
+                   for steps, bucket in self.buckets.items())
+
+    def _add_round(self, puzzles: List[Puzzle]) -> int:
+        # add one generated batch, counting the rounds each unfilled bucket got nothing
+        with self._condition:
+            before = {steps: len(bucket) for steps, bucket in self.buckets.items()}
+            added = self.add(puzzles)
+            for steps, bucket in self.buckets.items():
+                if len(bucket) > before[steps] or len(bucket) >= self.capacity:
+                    self._dry_rounds[steps] = 0
+                    continue
+                if steps in self.exhausted:
+                    continue
+                self._dry_rounds[steps] += 1
+                if self._dry_rounds[steps] >= self.DRY_ROUNDS_BEFORE_EXHAUSTED:
+                    self.exhausted[steps] = self._graph_version()
+                    logger.info(f"No {steps}-step puzzles in {self._dry_rounds[steps]} rounds, "
+                                f"pausing that bucket until the graph changes")
+        return added
+
+    def _run(self):
+        # refill whenever a bucket drops below the low watermark, up to capacity
+        # backs off once many rounds in a row produce nothing, and gives up on buckets the
+        # graph can't fill (see DRY_ROUNDS_BEFORE_EXHAUSTED)
+        backoff = 0.0
+        idle_rounds = 0
+        while True:
+            with self._condition:
+                while not self._stopped and not self._needs_refill():
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                self.refills += 1
+
+            while not self._stopped and not self.is_full():
+                try:
+                    added = self._add_round(self.generate_fn())
+                except Exception as e:
+                    logger.error(f"Puzzle generation failed: {e}")
+                    added = 0
+
+                if added:
+                    backoff = 0.0
+                    idle_rounds = 0
+                    continue
+                idle_rounds += 1
+                if idle_rounds < self.IDLE_ROUNDS_BEFORE_BACKOFF:
+                    continue
+                backoff = min(max(backoff * 2, 0.1), 10.0)
+                with self._condition:
+                    self._condition.wait(backoff)
+                    if not self._needs_refill():
+                        break
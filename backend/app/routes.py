@@ -1,34 +1,138 @@
 # API routes for the game
 from flask import Blueprint, jsonify, request
 from app.game_service import GameService
+from app.initializer import BackgroundInitializer
+from app.embedding_sidecar import embedding_service_from_env
+from app.executors import ExecutorBusy, executor_from_env
+from app.memory_stats import process_memory
+from app.startup import startup_timer
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
 game_bp = Blueprint('game', __name__)
-_game_service = None
-
-def get_game_service():
-    # lazy initialization of game service
-    # with --preload flag, this should only run once at startup
-    global _game_service
-    if _game_service is None:
-        logger.info("Initializing game service (first request)...")
-        _game_service = GameService()
-        logger.info("Game service initialized and ready")
-    return _game_service
+
+# seconds clients are told to wait (Retry-After) while the game service initializes
+RETRY_AFTER_SECONDS = 5
+
+# seconds clients are told to wait (Retry-After) when an executor is full
+BUSY_RETRY_AFTER_SECONDS = 1
+
+# heavy work runs on bounded executors (see app/executors.py), cheap lookups stay on the request thread
+# INFERENCE_WORKERS: concurrent requests that may encode words (the encode batcher coalesces them)
+# SEARCH_WORKERS: concurrent uncached searches (paths, distance fields, scoring, new puzzles)
+inference_executor = executor_from_env('inference', 'INFERENCE_WORKERS', 4)
+search_executor = executor_from_env('search', 'SEARCH_WORKERS', 2)
+
+# routes that answer before the game service is ready
+UNGATED_ENDPOINTS = {
+    'game.health_check', 'game.readiness', 'game.get_startup_report', 'game.warmup', 'game.get_memory'
+}
+
+def _create_game_service():
+    logger.info("Initializing game service...")
+    # ARTIFACT_DIR points at a bundle from build_artifacts.py (skips embedding the vocabulary)
+    # EMBEDDING_SIDECAR=1 shares one model process between all workers (see app/embedding_sidecar.py)
+    # FREEZE_VOCABULARY=1 keeps the loaded graph fixed, outside words only get temporary embeddings
+    # PATH_SEARCH=astar searches optimal paths with A* instead of bidirectional BFS (see bench_search.py)
+    # LANDMARKS sets the landmark distance tables that bound and prune path searches (0 disables)
+    with startup_timer.phase('game_service'):
+        game_service = GameService(
+            artifact_dir=os.environ.get('ARTIFACT_DIR'),
+            embedding_service=embedding_service_from_env(),
+            freeze_vocabulary=os.environ.get('FREEZE_VOCABULARY', '0') == '1',
+            path_search=os.environ.get('PATH_SEARCH', 'bfs'),
+            landmark_count=int(os.environ.get('LANDMARKS', '32'))
+        )
+    logger.info("Game service initialized and ready")
+    return game_service
+
+_initializer = BackgroundInitializer(_create_game_service)
+_background_init = False
+
+def start_background_init():
+    # build the game service in a background thread (called from create_app)
+    # game routes answer 503 until it's ready instead of blocking the worker
+    global _background_init
+    _background_init = True
+    _initializer.start()
+
+def get_game_service(timeout=0):
+    # the game service; initialized synchronously on first use when background init is off
+    # raises ServiceNotReady while a background initialization is still running
+    return _initializer.get(timeout)
+
+def prepare_for_fork():
+    # finish initializing in the gunicorn master and freeze shared state before workers fork
+    # (called from gunicorn.conf.py's pre_fork hook)
+    _initializer.start()
+    game_service = get_game_service(timeout=None)
+    game_service.prepare_for_fork()
+
+def _not_ready_response():
+    state = _initializer.status()
+    response = jsonify({
+        'success': False,
+        'ready': False,
+        'status': state['status'],
+        'error': state['error'] or 'Game service is starting up, retry shortly'
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(RETRY_AFTER_SECONDS)
+    return response
+
+def _offload(executor, inline, fn, *args):
+    # run fn on the request thread when it is cheap (inline), otherwise on the bounded executor
+    # raises ExecutorBusy when the executor has no free slot
+    if inline:
+        return fn(*args)
+    return executor.run(fn, *args)
+
+def _busy_response(error, **fields):
+    response = jsonify(dict(success=False, error=f"{error}, retry shortly", **fields))
+    response.status_code = 503
+    response.headers['Retry-After'] = str(BUSY_RETRY_AFTER_SECONDS)
+    return response
+
+@game_bp.before_request
+def require_ready():
+    # fail fast while the background initialization runs
+    if not _background_init or request.endpoint in UNGATED_ENDPOINTS or _initializer.is_ready():
+        return None
+    # restarts the thread in a forked worker, or after a failed attempt
+    _initializer.start()
+    return _not_ready_response()
 
 @game_bp.route('/health', methods=['GET'])
 def health_check():
-    # game health check
+    # liveness check, answers as soon as the process serves requests
     return jsonify({'status': 'ok'}), 200
 
+@game_bp.route('/ready', methods=['GET'])
+def readiness():
+    # readiness check with initialization progress by phase
+    state = _initializer.status()
+    body = {
+        'ready': state['status'] == BackgroundInitializer.READY,
+        'status': state['status'],
+        'error': state['error'],
+        'phases': startup_timer.get_phases()
+    }
+    response = jsonify(body)
+    if not body['ready']:
+        response.status_code = 503
+        response.headers['Retry-After'] = str(RETRY_AFTER_SECONDS)
+    return response
+
 @game_bp.route('/warmup', methods=['GET'])
 def warmup():
     # warmup endpoint to pre-initialize the game service
-    # call this on deployment to avoid cold start latency
+    # kept for deploy scripts: waits for the background initialization to finish
     try:
-        game_service = get_game_service()
+        if _background_init:
+            _initializer.start()
+        game_service = get_game_service(timeout=None)
         # verify service is ready
         words_in_graph = len(game_service.semantic_graph.get_all_words())
         return jsonify({
@@ -48,13 +152,18 @@ def new_game():
     # get a new game with random word pair
     try:
         game_service = get_game_service()
-        start_word, target_word = game_service.get_random_word_pair()
+        # the pool answers right away, an empty pool means searching for a pair
+        start_word, target_word = _offload(
+            search_executor, game_service.has_puzzles(), game_service.get_random_word_pair
+        )
         
         return jsonify({
             'success': True,
             'startWord': start_word,
             'targetWord': target_word
         }), 200
+    except ExecutorBusy as e:
+        return _busy_response(e)
     except Exception as e:
         logger.error(f"Error creating new game: {e}")
         return jsonify({
@@ -78,7 +187,11 @@ def get_optimal_path():
             }), 400
         
         game_service = get_game_service()
-        path = game_service.find_optimal_path(start_word, target_word, max_steps)
+        path = _offload(
+            search_executor,
+            game_service.semantic_graph.has_cached_path(start_word, target_word, max_steps),
+            game_service.find_optimal_path, start_word, target_word, max_steps
+        )
         
         if path is None:
             return jsonify({
@@ -103,6 +216,8 @@ def get_optimal_path():
             'path': path,
             'steps': steps
         }), 200
+    except ExecutorBusy as e:
+        return _busy_response(e)
     except Exception as e:
         logger.error(f"Error finding path: {e}")
         return jsonify({
@@ -171,14 +286,19 @@ def validate_word_in_chain():
             words_to_add.append(word_lower)
         
         # Batch add words to ensure they connect to each other properly
+        # (encoding new words runs on the inference executor)
         if words_to_add:
-            game_service.semantic_graph.add_words(words_to_add)
+            _offload(inference_executor, False, game_service.semantic_graph.add_words, words_to_add)
         
-        # check if semantically connected
-        is_connected = game_service.semantic_graph.are_connected(last_word, word_lower)
+        # check if semantically connected (outside a frozen vocabulary this encodes too)
+        graph = game_service.semantic_graph
+        similarity = _offload(
+            inference_executor, graph.word_exists(last_word) and graph.word_exists(word_lower),
+            graph.get_similarity, last_word, word_lower
+        )
+        is_connected = similarity >= graph.similarity_threshold
         
         if is_connected:
-            similarity = game_service.semantic_graph.get_similarity(last_word, word_lower)
             return jsonify({
                 'success': True,
                 'valid': True,
@@ -191,6 +311,8 @@ def validate_word_in_chain():
                 'valid': False,
                 'error': f"'{word}' is not semantically connected to '{current_path[-1]}'. Try a different word.",
             }), 200
+    except ExecutorBusy as e:
+        return _busy_response(e, valid=False)
     except Exception as e:
         logger.error(f"Error validating word: {e}")
         return jsonify({
@@ -199,6 +321,12 @@ def validate_word_in_chain():
             'error': str(e)
         }), 500
 
+def _score_with_alternatives(game_service, path, start_word, target_word):
+    # score plus other optimal routes (from the shortest-path DAG), in one executor task
+    score, message, algorithm_path = game_service.calculate_score(path, start_word, target_word)
+    optimal_count, alternatives = game_service.get_alternative_paths(start_word, target_word, [algorithm_path, path])
+    return score, message, algorithm_path, optimal_count, alternatives
+
 @game_bp.route('/game/score', methods=['POST'])
 def calculate_score():
     # calculate score for a player's path
@@ -221,7 +349,9 @@ def calculate_score():
             }), 400
         
         game_service = get_game_service()
-        score, message, algorithm_path = game_service.calculate_score(path, start_word, target_word)
+        score, message, algorithm_path, optimal_count, alternatives = _offload(
+            search_executor, False, _score_with_alternatives, game_service, path, start_word, target_word
+        )
         
         # always return optimal path, even if player path is invalid
         algorithm_steps = len(algorithm_path) - 1 if algorithm_path else None
@@ -237,8 +367,12 @@ def calculate_score():
             'valid': is_valid,
             'algorithmPath': algorithm_path,
             'playerSteps': player_steps,
-            'algorithmSteps': algorithm_steps
+            'algorithmSteps': algorithm_steps,
+            'optimalPathCount': optimal_count,
+            'alternativePaths': alternatives
         }), 200
+    except ExecutorBusy as e:
+        return _busy_response(e)
     except Exception as e:
         logger.error(f"Error calculating score: {e}")
         return jsonify({
@@ -295,7 +429,18 @@ def get_similarity():
             }), 400
         
         game_service = get_game_service()
-        similarity = game_service.get_word_similarity(word1, word2)
+        for word in (word1, word2):
+            if not game_service.validate_word(word):
+                return jsonify({
+                    'success': False,
+                    'error': f"Word '{word}' is not in the database"
+                }), 400
+
+        graph = game_service.semantic_graph
+        similarity = _offload(
+            inference_executor, graph.word_exists(word1) and graph.word_exists(word2),
+            game_service.get_word_similarity, word1, word2
+        )
         
         return jsonify({
             'success': True,
@@ -304,6 +449,8 @@ def get_similarity():
             'similarity': similarity,
             'connected': similarity >= game_service.semantic_graph.similarity_threshold
         }), 200
+    except ExecutorBusy as e:
+        return _busy_response(e)
     except Exception as e:
         logger.error(f"Error getting similarity: {e}")
         return jsonify({
@@ -361,49 +508,26 @@ def get_hint():
             # use last word in current path
             current_position = current_words[-1]
         
-        # find optimal path FROM CURRENT POSITION to target
-        optimal_from_here = game_service.find_optimal_path(current_position, target_word, max_steps=6)
+        # next word and steps remaining come from the target's cached distance field
+        # a cached field and a graph word answer right away, anything else searches (or encodes)
+        hint_word, steps_remaining = _offload(
+            search_executor,
+            game_service.has_distance_field(target_word) and game_service.semantic_graph.word_exists(current_position),
+            game_service.get_hint, current_position, target_word, used_words
+        )
         
-        if optimal_from_here is None or len(optimal_from_here) < 2:
+        if steps_remaining is None:
             return jsonify({
                 'success': False,
                 'error': f'No path found from {current_position} to {target_word}',
                 'hint': None
             }), 404
         
-        # hint word is the next word in the optimal path from current position
-        # optimal_from_here[0] is current position, optimal_from_here[1] is the next word
-        hint_word = None
-        
-        # find first word in optimal_from_here that hasn't been used yet
-        for word in optimal_from_here[1:]:  # Skip the first word (current position)
-            if word.lower() not in used_words:
-                hint_word = word
-                break
-        
-        # if all words in optimal path have been used, find a semantic neighbor
-        if not hint_word:
-            neighbors = list(game_service.semantic_graph.get_neighbors(current_position.lower()))
-            if neighbors:
-                # find neighbor closest to target that hasn't been used
-                best_neighbor = None
-                best_similarity = -1
-                for neighbor in neighbors:
-                    # skip if already used
-                    if neighbor.lower() in used_words:
-                        continue
-                    sim = game_service.get_word_similarity(neighbor, target_word)
-                    if sim > best_similarity:
-                        best_similarity = sim
-                        best_neighbor = neighbor
-                hint_word = best_neighbor
-        
         # generate letter reveal hints only
         masked_word = None
         word_length = None
         fully_revealed = False
         message = ""
-        steps_remaining = len(optimal_from_here) - 1 if optimal_from_here else None
         
         if hint_word:
             word_length = len(hint_word)
@@ -441,6 +565,8 @@ def get_hint():
             'success': True,
             'hint': hint_data
         }), 200
+    except ExecutorBusy as e:
+        return _busy_response(e, hint=None)
     except Exception as e:
         logger.error(f"Error getting hint: {e}")
         return jsonify({
@@ -464,7 +590,22 @@ def get_stats():
                 'wordsInGraph': words_in_graph,
                 'similarityThreshold': game_service.semantic_graph.similarity_threshold,
                 'embeddingModel': game_service.embedding_service.model_name,
-                'embeddingDimension': game_service.embedding_service.get_embedding_dim()
+                'embeddingDimension': game_service.embedding_service.get_embedding_dim(),
+                'modelLoaded': game_service.embedding_service.is_model_loaded(),
+                'encodeBatching': game_service.embedding_service.get_batching_stats(),
+                'bulkEncoding': game_service.embedding_service.get_bulk_encoding_stats(),
+                'embeddingCache': game_service.embedding_service.get_cache_stats(),
+                'queryEmbeddings': game_service.semantic_graph.get_query_cache_stats(),
+                'graph': game_service.semantic_graph.get_memory_stats(),
+                'pathCache': game_service.semantic_graph.get_path_cache_stats(),
+                'graphWrites': game_service.semantic_graph.get_write_stats(),
+                'landmarks': game_service.semantic_graph.get_landmark_stats(),
+                'distanceFields': game_service.distance_fields.get_stats(),
+                'puzzlePool': game_service.puzzle_pool.get_stats() if game_service.puzzle_pool else None,
+                'executors': {
+                    'inference': inference_executor.get_stats(),
+                    'search': search_executor.get_stats()
+                }
             }
         }), 200
     except Exception as e:
@@ -472,4 +613,27 @@ def get_stats():
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+@game_bp.route('/startup', methods=['GET'])
+def get_startup_report():
+    # startup time by phase (imports, model load, vocabulary embedding, graph build)
+    # doesn't touch the game service, so it never triggers initialization itself
+    return jsonify({
+        'success': True,
+        'startup': startup_timer.get_report()
+    }), 200
+
+@game_bp.route('/memory', methods=['GET'])
+def get_memory():
+    # memory of the worker answering this request
+    # ussBytes is what this worker uses on its own; the frozen embedding / graph buffers
+    # are shared with the master and other workers and only count towards sharedBytes
+    graph = None
+    if _initializer.is_ready():
+        graph = get_game_service().semantic_graph.get_memory_stats()
+    return jsonify({
+        'success': True,
+        'process': process_memory(),
+        'graph': graph
+    }), 200
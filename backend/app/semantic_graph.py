@@ -1,34 +1,137 @@
+import heapq
+import threading
 import numpy as np
-from typing import List, Dict, Set, Optional, Tuple
-from collections import defaultdict, deque
+from typing import List, Dict, Set, Optional, Tuple, NamedTuple
 import logging
 from app.embedding_service import EmbeddingService
+from app.embedding_matrix import EmbeddingMatrix, EmbeddingView
+from app.adjacency import CSRAdjacency, AdjacencySnapshot, GraphView
+from app.lru_cache import LRUCache
+from app.embedding_cache import EmbeddingCache
+from app.graph_builder import threshold_join, collect_edges
+from app.path_dag import PathDAG, build_layers
+from app.landmarks import LandmarkIndex, UNREACHABLE
 
 logger = logging.getLogger(__name__)
 
+
+class GraphSnapshot(NamedTuple):
+    # immutable view of the graph at one version: the first `size` rows of the embedding
+    # matrix (rows past it may be mid-insert), the adjacency published with them and the
+    # landmark distance tables over them (None until built, see build_landmarks)
+    embeddings: EmbeddingMatrix
+    size: int
+    adjacency: AdjacencySnapshot
+    version: int
+    landmarks: Optional[LandmarkIndex] = None
+
+    def get_id(self, word: str) -> Optional[int]:
+        word_id = self.embeddings.get_id(word)
+        if word_id is None or word_id >= self.size:
+            return None
+        return word_id
+
+    def words(self, ids: List[int]) -> List[str]:
+        words = self.embeddings.words
+        return [words[i] for i in ids]
+
+
+class _PendingInsert:
+    # words queued for the next group commit, with their embeddings
+    __slots__ = ('words', 'embeddings', 'done', 'error')
+
+    def __init__(self, words: List[str], embeddings: np.ndarray):
+        self.words = words
+        self.embeddings = embeddings
+        self.done = False
+        self.error: Optional[Exception] = None
+
+
 class SemanticGraph:
     # words are nodes and edges represent semantic connections
     # edges are implicit - created dynamically based on cosine similarity threshold
+    #
+    # concurrency: readers (similarity, neighbors, BFS) take the current GraphSnapshot with a
+    # single attribute read and never lock; writers embed their words first, queue them and
+    # group-commit under one writer lock: whoever holds the lock applies every queued insert
+    # in one batch (one matrix append, one threshold join, one adjacency update) and then
+    # publishes a new snapshot in a single assignment
 
-    def __init__(self, embedding_service: EmbeddingService, similarity_threshold: float = 0.45):
+    # commits with at least this many words merge their edges straight into the CSR arrays
+    BULK_INSERT_WORDS = 64
+
+    # path search algorithms for bfs_path / find_path
+    SEARCH_METHODS = ('bfs', 'astar')
+    # slack (radians) on the A* hop bound for float32 rounding in the cosines: arccos is steep
+    # near 1, a word's float32 cosine with itself can already read as a few 1e-4 radians
+    ANGLE_TOLERANCE = 1e-3
+
+    def __init__(self, embedding_service: EmbeddingService, similarity_threshold: float = 0.45,
+                 path_cache_size: int = 4096, query_cache_size: int = 1024,
+                 query_cache_ttl: Optional[float] = 600.0, build_workers: int = 1, path_search: str = 'bfs'):
         # init semantic graph
         # embedding_service: service for generating word embeddings
         # similarity_threshold: minimum cosine similarity for words to be considered connected
         # 0.48 allows reasonable semantic connections (e.g., joy/harmony) while filtering weak associations
         # (e.g., disconnects coyote/willow while maintaining strong relationships like coyote/wolf)
+        # query_cache_size / query_cache_ttl: bounds on the temporary embeddings of outside words
+        # once the vocabulary is frozen (see freeze_vocabulary)
+        # build_workers: processes used to connect large batches of new words (app/graph_builder.py)
+        # path_search: 'bfs' (bidirectional) or 'astar' (guided by the angle to the target), both exact
+        if path_search not in self.SEARCH_METHODS:
+            raise ValueError(f"Unknown path search: {path_search}")
         
         self.embedding_service = embedding_service
         self.similarity_threshold = similarity_threshold
+        self.build_workers = build_workers
+        self.path_search = path_search
         
-        # word storage: word -> embedding vector
-        self.word_embeddings: Dict[str, np.ndarray] = {}
+        # word storage: contiguous embedding matrix with word <-> id index
+        # word_embeddings exposes it as a read-only word -> embedding mapping
+        self.embeddings = EmbeddingMatrix(embedding_service.get_embedding_dim())
+        self.word_embeddings = EmbeddingView(self.embeddings)
         
-        # graph structure: word -> set of connected words (neighbors)
-        # built dynamically based on similarity
-        self.graph: Dict[str, Set[str]] = defaultdict(set)
-        
-        # cache for similarity calculations
-        self.similarity_cache: Dict[Tuple[str, str], float] = {}
+        # graph structure: CSR adjacency over word ids, built dynamically based on similarity
+        # graph exposes it as a read-only word -> set of neighbor words mapping
+        self.adjacency = CSRAdjacency()
+        self.graph = GraphView(self.adjacency, self.embeddings.index, self.embeddings.words)
+
+        # published state; the version is bumped only when a commit actually adds edges,
+        # so cached paths stay valid until the graph really changes
+        self._snapshot = GraphSnapshot(self.embeddings, 0, self.adjacency.snapshot(), 0)
+
+        # group commit: inserts queue in _pending and are applied under _write_lock
+        self._write_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: List[_PendingInsert] = []
+        self.commits = 0
+        self.committed_words = 0
+
+        # LRU memo of (start, target, max_steps) -> path, tied to the graph version
+        self.path_cache = LRUCache(path_cache_size)
+        self._path_cache_version = 0
+        self.path_cache_invalidations = 0
+
+        # with a frozen vocabulary, unknown words are never inserted: their embeddings live in
+        # a bounded, expiring cache and they act as virtual nodes whose neighbors are computed
+        # on the fly, so ad-hoc lookups can't grow the graph
+        self.vocabulary_frozen = False
+        self.query_embeddings = EmbeddingCache(
+            query_cache_size, embedding_service.get_embedding_dim(), ttl_seconds=query_cache_ttl
+        )
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def snapshot(self) -> GraphSnapshot:
+        # current published state, safe to read from any thread
+        return self._snapshot
+
+    def freeze_vocabulary(self):
+        # stop adding words: the current words and edges are the whole graph from now on
+        self.vocabulary_frozen = True
+        logger.info(f"Vocabulary frozen at {self._snapshot.size} words")
     
     def add_word(self, word: str) -> np.ndarray:
         # add a word to the graph and generate its embedding
@@ -38,111 +141,162 @@ class SemanticGraph:
         word_lower = word.lower().strip()
         
         # if word already exists, return its embedding
-        if word_lower in self.word_embeddings:
-            return self.word_embeddings[word_lower]
+        snapshot = self._snapshot
+        word_id = snapshot.get_id(word_lower)
+        if word_id is not None:
+            return snapshot.embeddings.vector(word_id)
+        if self.vocabulary_frozen:
+            return self._query_vector(word_lower)
         
-        # generate embedding for the new word
+        # generate embedding for the new word (outside the writer lock), then commit it
         embedding = self.embedding_service.encode_word(word_lower)
-        self.word_embeddings[word_lower] = embedding
-        
-        # find semantic neighbors and create edges
-        self._update_connections(word_lower)
+        self._insert([word_lower], np.asarray(embedding, dtype=np.float32).reshape(1, -1))
         
         logger.debug(f"Added word: {word_lower}")
         return embedding
     
-    def add_words(self, words: List[str]) -> Dict[str, np.ndarray]:
+    def add_words(self, words: List[str], embeddings: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
         # add multiple words to the graph at once
         # optimized batch processing for better performance
+        # embeddings: optional precomputed rows aligned with words (skips the encode call)
         # returns a dictionary mapping words to their embeddings
 
         # normalize and filter out duplicates and existing words
+        snapshot = self._snapshot
         words_to_add = []
         for word in words:
             word_lower = word.lower().strip()
-            if word_lower not in self.word_embeddings:
+            if snapshot.get_id(word_lower) is None:
                 words_to_add.append(word_lower)
+        words_to_add = list(dict.fromkeys(words_to_add))
         
         if not words_to_add:
-            return {word.lower().strip(): self.word_embeddings[word.lower().strip()] for word in words}
+            return {word.lower().strip(): self._vector(word.lower().strip()) for word in words}
+        if self.vocabulary_frozen:
+            return {word: self._query_vector(word) for word in words_to_add}
         
         # batch generate embeddings for all new words
-        embeddings_batch = self.embedding_service.encode(words_to_add)
-        
-        # store embeddings
-        embeddings = {}
-        for word, embedding in zip(words_to_add, embeddings_batch):
-            self.word_embeddings[word] = embedding
-            embeddings[word] = embedding
-        
-        # batch update connections using vectorized operations
-        self._batch_update_connections(words_to_add)
+        if embeddings is not None:
+            rows = {word.lower().strip(): i for i, word in enumerate(words)}
+            embeddings_batch = embeddings[[rows[word] for word in words_to_add]]
+        else:
+            embeddings_batch = self.embedding_service.encode(words_to_add)
         
-        return embeddings
-    
-    def _update_connections(self, new_word: str):
-        # update graph connections for a newly added word
-        # creates edges to all existing words that meet the similarity threshold
-        new_embedding = self.word_embeddings[new_word]
-        
-        # get all existing words and their embeddings
-        existing_words = [w for w in self.word_embeddings.keys() if w != new_word]
-        if not existing_words:
+        self._insert(words_to_add, embeddings_batch)
+        snapshot = self._snapshot
+        return {word: snapshot.embeddings.vector(snapshot.get_id(word)) for word in words_to_add}
+
+    def _insert(self, words: List[str], embeddings: np.ndarray):
+        # queue words for the next commit and wait until some commit has applied them
+        # the first writer to get the lock commits everything queued so far, so writers
+        # that arrive while a commit is running are applied together in the next one
+        request = _PendingInsert(words, embeddings)
+        with self._pending_lock:
+            self._pending.append(request)
+
+        with self._write_lock:
+            if not request.done:
+                with self._pending_lock:
+                    batch, self._pending = self._pending, []
+                try:
+                    self._commit(batch)
+                except Exception as e:
+                    for pending in batch:
+                        pending.error = e
+                    raise
+                finally:
+                    for pending in batch:
+                        pending.done = True
+        if request.error is not None:
+            raise request.error
+
+    def _commit(self, batch: List[_PendingInsert]):
+        # apply queued inserts and publish a new snapshot (writer lock held)
+        # words committed earlier, or queued twice, are skipped
+        words = []
+        rows = []
+        seen = set()
+        for request in batch:
+            for word, row in zip(request.words, request.embeddings):
+                if word not in self.embeddings and word not in seen:
+                    seen.add(word)
+                    words.append(word)
+                    rows.append(row)
+        if not words:
             return
 
-        existing_embeddings = np.array([self.word_embeddings[w] for w in existing_words])
-        
+        # rows past the published size are invisible to readers until the snapshot below
+        start = len(self.embeddings)
+        self.embeddings.add_many(words, np.asarray(rows, dtype=np.float32))
+        end = len(self.embeddings)
+        self.adjacency.ensure_nodes(end)
+        added = self._connect(start, end)
+        adjacency = self.adjacency.snapshot()
+        landmarks = self._snapshot.landmarks
+        if landmarks is not None:
+            landmarks = landmarks.extended(adjacency, end, np.arange(start, end))
+
+        version = self._snapshot.version + (1 if added else 0)
+        self._snapshot = GraphSnapshot(self.embeddings, end, adjacency, version, landmarks)
+        self.commits += 1
+        self.committed_words += len(words)
+
+    def _connect(self, start: int, end: int) -> int:
+        # create edges between the new words [start, end) and every earlier word and each other,
+        # returns the number of edges added
+        if end - start >= self.BULK_INSERT_WORDS:
+            # blocked threshold join: similarities are computed tile by tile, so a
+            # full-vocabulary load never holds the new x existing matrix, only the edges it finds
+            edge_blocks = threshold_join(
+                self.embeddings.rows(0, end),
+                self.similarity_threshold,
+                start=start,
+                workers=self.build_workers
+            )
+            sources, targets = collect_edges(edge_blocks)
+            # batch loads go straight into the CSR arrays
+            return self.adjacency.add_edges(sources, targets, bulk=True)
+
+        # a few words: one matmul against the existing rows (base and tail separately, so a
+        # frozen base is never copied) and one among the new words, edges go to the overlay
         # embeddings are already normalized -> cosine similarity is dot product
-        similarities = np.dot(existing_embeddings, new_embedding)
-        mask = similarities >= self.similarity_threshold
-        
-        # bidirectional edges
-        for idx, word in enumerate(existing_words):
-            if mask[idx]:
-                self.graph[new_word].add(word)
-                self.graph[word].add(new_word)
-    
-    def _batch_update_connections(self, new_words: List[str]):
-        # batch update connections for multiple new words
-        if not new_words:
-            return
-        
-        # get all existing words (before adding new ones)
-        existing_words = [w for w in self.word_embeddings.keys() if w not in new_words]
-        
-        if not existing_words:
-            # if no existing words, just connect new words to each other
-            new_embeddings = np.array([self.word_embeddings[w] for w in new_words])
-            similarities = np.dot(new_embeddings, new_embeddings.T)
-            
-            for i, word1 in enumerate(new_words):
-                for j, word2 in enumerate(new_words):
-                    if i != j and similarities[i, j] >= self.similarity_threshold:
-                        self.graph[word1].add(word2)
-                        self.graph[word2].add(word1)
-            return        
-        new_embeddings = np.array([self.word_embeddings[w] for w in new_words])
-        existing_embeddings = np.array([self.word_embeddings[w] for w in existing_words])
-        
-        # calculate all similarities at once: (new_words, existing_words)
-        similarities_matrix = np.dot(new_embeddings, existing_embeddings.T)
-        
-        # create edges between new words and existing words
-        for i, new_word in enumerate(new_words):
-            mask = similarities_matrix[i] >= self.similarity_threshold
-            for j, existing_word in enumerate(existing_words):
-                if mask[j]:
-                    self.graph[new_word].add(existing_word)
-                    self.graph[existing_word].add(new_word)
-        
-        # connect new words to each other
-        new_similarities = np.dot(new_embeddings, new_embeddings.T)
-        for i, word1 in enumerate(new_words):
-            for j, word2 in enumerate(new_words):
-                if i < j and new_similarities[i, j] >= self.similarity_threshold:
-                    self.graph[word1].add(word2)
-                    self.graph[word2].add(word1)
+        new_embeddings = self.embeddings.rows(start, end)
+        sources = []
+        targets = []
+        if start > 0:
+            rows, cols = np.nonzero(self.embeddings.similarities(new_embeddings, end=start) >= self.similarity_threshold)
+            sources.append(rows + start)
+            targets.append(cols)
+        # upper triangle only, no self loops
+        rows, cols = np.nonzero(np.triu(new_embeddings @ new_embeddings.T >= self.similarity_threshold, k=1))
+        sources.append(rows + start)
+        targets.append(cols + start)
+        return self.adjacency.add_edges(np.concatenate(sources), np.concatenate(targets))
     
+    def _query_vector(self, word: str) -> np.ndarray:
+        # temporary embedding of a word outside the frozen vocabulary
+        vector = self.query_embeddings.get(word, None)
+        if vector is None:
+            vector = self.embedding_service.encode_word(word)
+            self.query_embeddings.put(word, vector)
+        return vector
+
+    def _vector(self, word: str) -> np.ndarray:
+        # embedding of a normalized word, inserting it unless the vocabulary is frozen
+        snapshot = self._snapshot
+        word_id = snapshot.get_id(word)
+        if word_id is not None:
+            return snapshot.embeddings.vector(word_id)
+        return self.add_word(word)
+
+    def _virtual_neighbor_ids(self, snapshot: GraphSnapshot, word: str) -> np.ndarray:
+        # ids of the graph words an outside word would connect to
+        similarities = snapshot.embeddings.similarities(self._query_vector(word), end=snapshot.size)
+        return np.nonzero(similarities >= self.similarity_threshold)[0]
+
+    def _is_virtual(self, snapshot: GraphSnapshot, word: str) -> bool:
+        return self.vocabulary_frozen and snapshot.get_id(word) is None
+
     def cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
         # calculate cosine similarity between two embedding vectors.
         # cosine similarity score between -1 and 1 (typically 0 to 1 for normalized embeddings)
@@ -150,28 +304,40 @@ class SemanticGraph:
     
     def get_similarity(self, word1: str, word2: str) -> float:
         # get cosine similarity between two words
-        word1_lower = word1.lower().strip()
-        word2_lower = word2.lower().strip()
-        
-        cache_key = tuple(sorted([word1_lower, word2_lower]))
-        if cache_key in self.similarity_cache:
-            return self.similarity_cache[cache_key]
-        
-        # check if both words exist
-        if word1_lower not in self.word_embeddings:
-            self.add_word(word1_lower)
-        if word2_lower not in self.word_embeddings:
-            self.add_word(word2_lower)
-        
-        # calculate similarity
-        similarity = self.cosine_similarity(
-            self.word_embeddings[word1_lower],
-            self.word_embeddings[word2_lower]
-        )
-        
-        # cache the result
-        self.similarity_cache[cache_key] = similarity
-        return similarity
+        # two id lookups and one dot product on the matrix rows, cheaper than caching pairs
+        # (adds missing words unless the vocabulary is frozen)
+        return self.cosine_similarity(self._vector(word1.lower().strip()), self._vector(word2.lower().strip()))
+
+    def get_similarities(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        # cosine similarity of each (word1, word2) pair with one row-wise dot product
+        # missing words are added in one batch first (or get temporary embeddings when frozen)
+        if not pairs:
+            return np.zeros(0, dtype=np.float32)
+        left = [word1.lower().strip() for word1, _ in pairs]
+        right = [word2.lower().strip() for _, word2 in pairs]
+        vectors = self._vectors(left + right)
+        return np.einsum('ij,ij->i', vectors[:len(pairs)], vectors[len(pairs):])
+
+    def _vectors(self, words: List[str]) -> np.ndarray:
+        # embeddings of normalized words, one row each
+        snapshot = self._snapshot
+        missing = [word for word in dict.fromkeys(words) if snapshot.get_id(word) is None]
+        added = {}
+        if missing:
+            added = self.add_words(missing)
+            snapshot = self._snapshot
+
+        ids = [snapshot.get_id(word) for word in words]
+        known = [i for i, word_id in enumerate(ids) if word_id is not None]
+        if len(known) == len(words):
+            return snapshot.embeddings.vectors(ids)
+        vectors = np.empty((len(words), snapshot.embeddings.embedding_dim), dtype=np.float32)
+        if known:
+            vectors[known] = snapshot.embeddings.vectors([ids[i] for i in known])
+        for i, word_id in enumerate(ids):
+            if word_id is None:
+                vectors[i] = added[words[i]]
+        return vectors
     
     def are_connected(self, word1: str, word2: str) -> bool:
         # check if two words are semantically connected
@@ -182,55 +348,503 @@ class SemanticGraph:
     def get_neighbors(self, word: str) -> Set[str]:
         # get all semantic neighbors of a word.
         word_lower = word.lower().strip()
-        if word_lower not in self.word_embeddings:
+        snapshot = self._snapshot
+        if self._is_virtual(snapshot, word_lower):
+            return set(snapshot.words(self._virtual_neighbor_ids(snapshot, word_lower).tolist()))
+        if snapshot.get_id(word_lower) is None:
             self.add_word(word_lower)
+            snapshot = self._snapshot
         
-        return self.graph.get(word_lower, set())
+        return set(snapshot.words(snapshot.adjacency.neighbors(snapshot.get_id(word_lower)).tolist()))
     
     def word_exists(self, word: str) -> bool:
-        return word.lower().strip() in self.word_embeddings
+        return self._snapshot.get_id(word.lower().strip()) is not None
     
     def get_all_words(self) -> List[str]:
-        return list(self.word_embeddings.keys())
+        snapshot = self._snapshot
+        return snapshot.embeddings.words[:snapshot.size]
     
     def bfs_path(self, start_word: str, target_word: str, max_steps: int = 6) -> Optional[List[str]]:
-        # find the shortest path between two words using BFS.           
+        # find the shortest path between two words using bidirectional BFS.
+        # returns None when the words are more than max_steps apart
         start = start_word.lower().strip()
         target = target_word.lower().strip()
         
-        # Ensure both words exist
-        if not self.word_exists(start):
+        # Ensure both words exist (as virtual nodes when the vocabulary is frozen)
+        if not self.word_exists(start) and not self.vocabulary_frozen:
             self.add_word(start)
-        if not self.word_exists(target):
+        if not self.word_exists(target) and not self.vocabulary_frozen:
             self.add_word(target)
         
         # If words are the same
         if start == target:
             return [start]
         
-        # BFS to find shortest path
-        queue = deque([(start, [start])])
-        visited = {start}
-        
+        # the whole search runs on one snapshot; paths (and misses) stay valid until a
+        # commit adds edges, and entries carry the version they were computed at
+        snapshot = self._snapshot
+        version = snapshot.version
+        if self._path_cache_version != version:
+            if len(self.path_cache):
+                self.path_cache_invalidations += 1
+            self.path_cache.clear()
+            self._path_cache_version = version
+        cache_key = (start, target, max_steps)
+        cached = self.path_cache.get(cache_key)
+        if cached is not LRUCache.MISSING and cached[0] == version:
+            return list(cached[1]) if cached[1] is not None else None
+
+        path_words = self._search_path(snapshot, start, target, max_steps, self.path_search)
+        # no path found within max_steps is cached as None
+        self.path_cache.put(cache_key, (version, tuple(path_words) if path_words is not None else None))
+        return path_words
+
+    def find_path(self, start_word: str, target_word: str, max_steps: int = 6, method: Optional[str] = None,
+                  weight: float = 1.0, stats: Optional[Dict[str, int]] = None) -> Optional[List[str]]:
+        # shortest path search without the path cache
+        # method: 'bfs' or 'astar' (defaults to path_search)
+        # weight: A* heuristic weight; above 1 expands fewer nodes but the path may be up to
+        #   weight times longer than the shortest one
+        # stats: dict whose 'expanded' count is increased by the nodes expanded
+        method = method or self.path_search
+        if method not in self.SEARCH_METHODS:
+            raise ValueError(f"Unknown path search: {method}")
+        start = start_word.lower().strip()
+        target = target_word.lower().strip()
+        if not self.word_exists(start) and not self.vocabulary_frozen:
+            self.add_word(start)
+        if not self.word_exists(target) and not self.vocabulary_frozen:
+            self.add_word(target)
+        if start == target:
+            return [start]
+        return self._search_path(self._snapshot, start, target, max_steps, method, weight, stats)
+
+    def path_dag(self, start_word: str, target_word: str, max_steps: int = 6) -> Optional[PathDAG]:
+        # every shortest path between two words, found in one bidirectional search
+        # (see app/path_dag.py); None when they are more than max_steps apart
+        start = start_word.lower().strip()
+        target = target_word.lower().strip()
+        if not self.word_exists(start) and not self.vocabulary_frozen:
+            self.add_word(start)
+        if not self.word_exists(target) and not self.vocabulary_frozen:
+            self.add_word(target)
+
+        snapshot = self._snapshot
+        start_virtual = self._is_virtual(snapshot, start)
+        target_virtual = self._is_virtual(snapshot, target)
+        if start == target:
+            if start_virtual:
+                return PathDAG(snapshot, [], prefix=[start])
+            return PathDAG(snapshot, [np.array([snapshot.get_id(start)])])
+        if start_virtual and target_virtual and self.are_connected(start, target):
+            return PathDAG(snapshot, [], prefix=[start], suffix=[target])
+
+        start_ids = self._virtual_neighbor_ids(snapshot, start) if start_virtual else [snapshot.get_id(start)]
+        target_ids = self._virtual_neighbor_ids(snapshot, target) if target_virtual else [snapshot.get_id(target)]
+        steps = max_steps - start_virtual - target_virtual
+        if steps < 0:
+            return None
+        layers = build_layers(snapshot.adjacency, snapshot.size, start_ids, target_ids, steps)
+        if layers is None:
+            return None
+        return PathDAG(snapshot, layers, prefix=[start] if start_virtual else [],
+                       suffix=[target] if target_virtual else [])
+
+    @property
+    def max_hop_angle(self) -> float:
+        # the largest angle a single edge can span: edges join words with cosine >= threshold
+        return float(np.arccos(np.clip(self.similarity_threshold, -1.0, 1.0)))
+
+    def hop_lower_bounds(self, vectors: np.ndarray, target_vector: np.ndarray) -> np.ndarray:
+        # fewest hops from each (normalized) vector to the target: the angle between them
+        # divided by max_hop_angle, rounded up. Angles obey the triangle inequality on the
+        # unit sphere, so this never overestimates and never drops by more than 1 per edge
+        # (an admissible, consistent A* heuristic)
+        angles = np.arccos(np.clip(vectors @ target_vector, -1.0, 1.0))
+        bounds = np.ceil((angles - self.ANGLE_TOLERANCE) / self.max_hop_angle)
+        return np.maximum(bounds, 0).astype(np.int64)
+
+    def has_cached_path(self, start_word: str, target_word: str, max_steps: int = 6) -> bool:
+        # whether bfs_path would answer from the path cache, without a search or a model call
+        start = start_word.lower().strip()
+        target = target_word.lower().strip()
+        if not self.vocabulary_frozen and not (self.word_exists(start) and self.word_exists(target)):
+            return False
+        if start == target:
+            return True
+        cached = self.path_cache.peek((start, target, max_steps))
+        return cached is not LRUCache.MISSING and cached[0] == self.version
+
+    def _search_path(self, snapshot: GraphSnapshot, start: str, target: str, max_steps: int,
+                     method: str = 'bfs', weight: float = 1.0,
+                     stats: Optional[Dict[str, int]] = None) -> Optional[List[str]]:
+        # shortest path between two distinct normalized words
+        # a virtual end (outside a frozen vocabulary) is one hop from each graph word it would
+        # connect to, so the search runs between those neighbor sets with the hops subtracted
+        # (always with BFS: A* needs a single start and target)
+        start_virtual = self._is_virtual(snapshot, start)
+        target_virtual = self._is_virtual(snapshot, target)
+        if not start_virtual and not target_virtual:
+            if method == 'astar':
+                path = self._astar(snapshot, snapshot.get_id(start), snapshot.get_id(target), max_steps, weight, stats)
+            else:
+                path = self._bidirectional_bfs(snapshot, snapshot.get_id(start), snapshot.get_id(target),
+                                               max_steps, stats)
+            return snapshot.words(path) if path is not None else None
+
+        if start_virtual and target_virtual and self.are_connected(start, target):
+            return [start, target]
+        start_ids = self._virtual_neighbor_ids(snapshot, start).tolist() if start_virtual else [snapshot.get_id(start)]
+        target_ids = self._virtual_neighbor_ids(snapshot, target).tolist() if target_virtual else [snapshot.get_id(target)]
+        steps = max_steps - start_virtual - target_virtual
+        if not start_ids or not target_ids or steps < 0:
+            return None
+
+        path = self._multi_source_bfs(snapshot, start_ids, target_ids, steps, stats)
+        if path is None:
+            return None
+        path_words = snapshot.words(path)
+        if start_virtual:
+            path_words.insert(0, start)
+        if target_virtual:
+            path_words.append(target)
+        return path_words
+
+    def _bidirectional_bfs(self, snapshot: GraphSnapshot, start_id: int, target_id: int,
+                           max_steps: int, stats: Optional[Dict[str, int]] = None) -> Optional[List[int]]:
+        # meet-in-the-middle BFS over word ids
+        # expands whole levels, always from the smaller frontier, and keeps parent pointers
+        # instead of copying paths. Before a level is expanded no node is within reach of
+        # both sides, so the first meeting found gives a shortest path.
+        # depth_forward + depth_backward never exceeds max_steps, so longer paths are never explored
+        if start_id == target_id:
+            return [start_id]
+        if snapshot.landmarks is not None and snapshot.landmarks.lower_bound(start_id, target_id) > max_steps:
+            return None
+        return self._multi_source_bfs(snapshot, [start_id], [target_id], max_steps, stats)
+
+    def _multi_source_bfs(self, snapshot: GraphSnapshot, start_ids: List[int], target_ids: List[int],
+                          max_steps: int, stats: Optional[Dict[str, int]] = None) -> Optional[List[int]]:
+        # bidirectional BFS between two sets of ids, returns a shortest path from any start
+        # to any target (used directly for virtual nodes, whose neighbors are the start set)
+        adjacency = snapshot.adjacency
+        parents_forward = {start_id: -1 for start_id in start_ids}
+        parents_backward = {target_id: -1 for target_id in target_ids}
+        for start_id in start_ids:
+            if start_id in parents_backward:
+                return [start_id]
+        frontier_forward = list(parents_forward)
+        frontier_backward = list(parents_backward)
+        depth_forward = depth_backward = 0
+        # between two single words, landmark tables drop reached words that can't be on a path
+        # within max_steps (their depth plus a lower bound to the other end is too large):
+        # they keep their parent but are never expanded (levels where no bound can be large
+        # enough skip the check)
+        landmarks = snapshot.landmarks if len(start_ids) == 1 and len(target_ids) == 1 else None
+        if landmarks is not None:
+            # largest bound any reached word can have towards the target / the start
+            max_bound_forward = landmarks.max_lower_bound(target_ids[0])
+            max_bound_backward = landmarks.max_lower_bound(start_ids[0])
+
+        while frontier_forward and frontier_backward and depth_forward + depth_backward < max_steps:
+            forward = len(frontier_forward) <= len(frontier_backward)
+            if forward:
+                frontier, parents, other_parents = frontier_forward, parents_forward, parents_backward
+                depth, other_end = depth_forward + 1, target_ids[0]
+                max_bound = max_bound_forward if landmarks is not None else 0
+            else:
+                frontier, parents, other_parents = frontier_backward, parents_backward, parents_forward
+                depth, other_end = depth_backward + 1, start_ids[0]
+                max_bound = max_bound_backward if landmarks is not None else 0
+
+            next_frontier = []
+            for current_id in frontier:
+                if stats is not None:
+                    stats['expanded'] = stats.get('expanded', 0) + 1
+                for neighbor in adjacency.neighbors(current_id).tolist():
+                    if neighbor in parents:
+                        continue
+                    parents[neighbor] = current_id
+                    if neighbor in other_parents:
+                        return self._join_paths(neighbor, parents_forward, parents_backward)
+                    next_frontier.append(neighbor)
+
+            if landmarks is not None and next_frontier and depth + max_bound > max_steps:
+                bounds = landmarks.lower_bounds(next_frontier, other_end).tolist()
+                next_frontier = [node for node, bound in zip(next_frontier, bounds) if depth + bound <= max_steps]
+            if forward:
+                frontier_forward = next_frontier
+                depth_forward = depth
+            else:
+                frontier_backward = next_frontier
+                depth_backward = depth
+
+        return None
+
+    def _astar(self, snapshot: GraphSnapshot, start_id: int, target_id: int, max_steps: int,
+               weight: float = 1.0, stats: Optional[Dict[str, int]] = None) -> Optional[List[int]]:
+        # A* over word ids, every edge costs one hop and hop_lower_bounds is the heuristic
+        # (raised to the landmark lower bound where that is larger: the maximum of two
+        # consistent heuristics is still consistent)
+        # nodes are expanded in order of hops so far + weight * bound, deepest first among ties,
+        # and anything whose bound can't fit in max_steps is never queued
+        # with weight 1 the heuristic is consistent, so the first time the target is popped
+        # its path is a shortest one
+        if start_id == target_id:
+            return [start_id]
+        embeddings = snapshot.embeddings
+        adjacency = snapshot.adjacency
+        target_vector = embeddings.vector(target_id)
+        start_bound = int(self._search_bounds(snapshot, [start_id], target_id, target_vector)[0])
+        if start_bound > max_steps:
+            return None
+
+        hops = {start_id: 0}
+        parents = {start_id: -1}
+        closed = set()
+        queue = [(weight * start_bound, 0, start_id)]
         while queue:
-            current_word, path = queue.popleft()
-            
-            # Check if we've exceeded max steps
-            steps_taken = len(path) - 1
-            if steps_taken > max_steps:
+            _, negative_hops, node = heapq.heappop(queue)
+            if node in closed:
                 continue
-            
-            # get neighbors
-            neighbors = self.get_neighbors(current_word)
-            
-            for neighbor in neighbors:
-                if neighbor == target:
-                    # found target!
-                    return path + [neighbor]
-                
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append((neighbor, path + [neighbor]))
-        
-        # no path found within max_steps
-        return None
\ No newline at end of file
+            if node == target_id:
+                path = []
+                while node != -1:
+                    path.append(node)
+                    node = parents[node]
+                return path[::-1]
+            closed.add(node)
+            if stats is not None:
+                stats['expanded'] = stats.get('expanded', 0) + 1
+
+            next_hops = 1 - negative_hops
+            if next_hops > max_steps:
+                continue
+            candidates = [n for n in adjacency.neighbors(node).tolist() if hops.get(n, max_steps + 1) > next_hops]
+            if not candidates:
+                continue
+            bounds = self._search_bounds(snapshot, candidates, target_id, target_vector)
+            for neighbor, bound in zip(candidates, bounds.tolist()):
+                if next_hops + bound > max_steps:
+                    continue
+                hops[neighbor] = next_hops
+                parents[neighbor] = node
+                heapq.heappush(queue, (next_hops + weight * bound, -next_hops, neighbor))
+        return None
+
+    def _search_bounds(self, snapshot: GraphSnapshot, ids: List[int], target_id: int,
+                       target_vector: np.ndarray) -> np.ndarray:
+        # A* heuristic: angular hop bound, raised by the landmark tables when they are built
+        bounds = self.hop_lower_bounds(snapshot.embeddings.vectors(ids), target_vector)
+        if snapshot.landmarks is not None:
+            bounds = np.maximum(bounds, snapshot.landmarks.lower_bounds(ids, target_id))
+        return bounds
+
+    def _join_paths(self, meeting_id: int, parents_forward: Dict[int, int], parents_backward: Dict[int, int]) -> List[int]:
+        # walk parent pointers from the meeting node back to the start and on to the target
+        path = []
+        node = meeting_id
+        while node != -1:
+            path.append(node)
+            node = parents_forward[node]
+        path.reverse()
+
+        node = parents_backward[meeting_id]
+        while node != -1:
+            path.append(node)
+            node = parents_backward[node]
+        return path
+
+    def level_bfs(self, start_word: str, target_word: Optional[str] = None,
+                  max_steps: int = 6) -> Tuple[Dict[str, int], Optional[List[str]]]:
+        # level-synchronous BFS from start_word, vectorized with NumPy
+        # returns (distances, path): hop distance to every word reachable within max_steps,
+        # and one shortest path to target_word (None if no target or not reachable)
+        # one call answers many queries from the same source (puzzle generation, difficulty labels)
+        # with a frozen vocabulary, outside words are virtual nodes: an outside start seeds
+        # the search with its graph neighbors at distance 1, an outside target is reached
+        # one hop after the closest graph word it would connect to
+        start = start_word.lower().strip()
+        if not self.word_exists(start) and not self.vocabulary_frozen:
+            self.add_word(start)
+        target = None
+        if target_word is not None:
+            target = target_word.lower().strip()
+            if not self.word_exists(target) and not self.vocabulary_frozen:
+                self.add_word(target)
+
+        snapshot = self._snapshot
+        start_virtual = self._is_virtual(snapshot, start)
+        if start_virtual:
+            distances, parents = self._level_bfs_ids(snapshot, self._virtual_neighbor_ids(snapshot, start),
+                                                     max_steps, first_level=1)
+        else:
+            distances, parents = self._level_bfs_ids(snapshot, np.array([snapshot.get_id(start)]), max_steps)
+
+        reached = np.nonzero(distances >= 0)[0]
+        distance_map = dict(zip(snapshot.words(reached.tolist()), distances[reached].tolist()))
+        if start_virtual:
+            distance_map[start] = 0
+
+        path = None
+        if target is not None and target == start:
+            path = [start]
+        elif target is not None:
+            end_id = None
+            target_virtual = self._is_virtual(snapshot, target)
+            if not target_virtual:
+                target_id = snapshot.get_id(target)
+                if distances[target_id] >= 0:
+                    end_id = target_id
+            else:
+                # closest graph word next to the outside target, one more hop still within max_steps
+                candidates = self._virtual_neighbor_ids(snapshot, target)
+                candidates = candidates[(distances[candidates] >= 0) & (distances[candidates] < max_steps)]
+                if len(candidates):
+                    end_id = int(candidates[np.argmin(distances[candidates])])
+                    distance_map[target] = int(distances[end_id]) + 1
+            if end_id is not None:
+                path_ids = [end_id]
+                while parents[path_ids[-1]] >= 0:
+                    path_ids.append(int(parents[path_ids[-1]]))
+                path = snapshot.words(path_ids[::-1])
+                if start_virtual:
+                    path.insert(0, start)
+                if target_virtual:
+                    path.append(target)
+
+        return distance_map, path
+
+    def _level_bfs_ids(self, snapshot: GraphSnapshot, source_ids: np.ndarray, max_steps: int,
+                       first_level: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        # BFS that expands a whole level per iteration with no Python loop per node
+        # source_ids start at distance first_level (1 for the neighbors of a virtual node)
+        # returns (distances, parents) indexed by word id; -1 marks unreached / no parent
+        num_words = snapshot.size
+        distances = np.full(num_words, -1, dtype=np.int16)
+        parents = np.full(num_words, -1, dtype=np.int32)
+        frontier = np.asarray(source_ids, dtype=np.int64)
+        if first_level > max_steps:
+            return distances, parents
+        distances[frontier] = first_level
+
+        for level in range(first_level + 1, max_steps + 1):
+            neighbors, sources = snapshot.adjacency.expand(frontier)
+            unvisited = distances[neighbors] < 0
+            neighbors = neighbors[unvisited]
+            if len(neighbors) == 0:
+                break
+
+            # first edge reaching each new node sets its parent
+            frontier, first = np.unique(neighbors, return_index=True)
+            distances[frontier] = level
+            parents[frontier] = sources[unvisited][first]
+
+        return distances, parents
+
+    def load_arrays(self, words: List[str], embeddings: np.ndarray, indptr: np.ndarray, indices: np.ndarray):
+        # replace the graph contents with prebuilt arrays (see app/artifacts.py)
+        # the arrays are used in place, so memory-mapped bundles stay shared and read-only
+        with self._write_lock:
+            self.embeddings = EmbeddingMatrix.from_array(words, embeddings)
+            self.word_embeddings = EmbeddingView(self.embeddings)
+            self.adjacency = CSRAdjacency.from_csr(indptr, indices)
+            self.graph = GraphView(self.adjacency, self.embeddings.index, self.embeddings.words)
+            self._snapshot = GraphSnapshot(self.embeddings, len(words), self.adjacency.snapshot(),
+                                           self._snapshot.version + 1)
+        logger.info(f"Loaded {len(words)} words and {self.adjacency.num_edges} edges into semantic graph")
+
+    def freeze(self):
+        # make the embedding matrix and CSR graph read-only before forking workers
+        # words added afterwards go to private tail buffers / the adjacency overlay
+        with self._write_lock:
+            self.embeddings.freeze()
+            self.adjacency.freeze()
+            self._snapshot = self._snapshot._replace(adjacency=self.adjacency.snapshot())
+
+    def export_arrays(self):
+        # graph contents as (words, embeddings, indptr, indices) for artifact bundles
+        with self._write_lock:
+            indptr, indices = self.adjacency.csr()
+            self._snapshot = self._snapshot._replace(adjacency=self.adjacency.snapshot())
+            return list(self.embeddings.words), self.embeddings.matrix, indptr, indices
+
+    def build_landmarks(self, count: int = 32):
+        # precompute landmark distance tables (app/landmarks.py) for the current graph
+        # commits after this extend them incrementally
+        with self._write_lock:
+            snapshot = self._snapshot
+            landmarks = LandmarkIndex.build(snapshot.adjacency, snapshot.size, count)
+            self._snapshot = snapshot._replace(landmarks=landmarks)
+
+    def load_landmarks(self, landmark_ids: np.ndarray, distances: np.ndarray):
+        # install prebuilt landmark tables (see app/artifacts.py), used in place like load_arrays
+        with self._write_lock:
+            snapshot = self._snapshot
+            if distances.ndim != 2 or distances.shape != (len(landmark_ids), snapshot.size):
+                raise ValueError(f"Landmark tables of shape {distances.shape} do not match "
+                                 f"{len(landmark_ids)} landmarks over {snapshot.size} words")
+            self._snapshot = snapshot._replace(landmarks=LandmarkIndex(landmark_ids, distances))
+
+    def export_landmarks(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        # landmark tables as (landmark ids, distances) for artifact bundles, None when not built
+        landmarks = self._snapshot.landmarks
+        if landmarks is None:
+            return None
+        return landmarks.landmark_ids, landmarks.distances
+
+    def distance_bounds(self, word1: str, word2: str) -> Optional[Tuple[int, Optional[int]]]:
+        # (lower, upper) bounds on the hops between two graph words from the landmark tables,
+        # without searching; upper is None when no landmark reaches both
+        # returns None when the landmarks prove there is no path
+        snapshot = self._snapshot
+        id1 = snapshot.get_id(word1.lower().strip())
+        id2 = snapshot.get_id(word2.lower().strip())
+        if id1 is None or id2 is None:
+            raise ValueError(f"Word not in graph: {word1 if id1 is None else word2}")
+        if id1 == id2:
+            return 0, 0
+        if snapshot.landmarks is None:
+            return 1, None
+        lower = snapshot.landmarks.lower_bound(id1, id2)
+        if lower >= UNREACHABLE:
+            return None
+        return max(lower, 1), snapshot.landmarks.upper_bound(id1, id2)
+
+    def get_landmark_stats(self) -> Dict:
+        landmarks = self._snapshot.landmarks
+        if landmarks is None:
+            return {'landmarks': 0, 'words': 0, 'bytes': 0}
+        return landmarks.get_stats()
+
+    def get_query_cache_stats(self) -> Dict:
+        # temporary embeddings of words outside the frozen vocabulary
+        return dict(self.query_embeddings.get_stats(), vocabularyFrozen=self.vocabulary_frozen)
+
+    def get_path_cache_stats(self) -> Dict:
+        # path cache counters plus the graph version it is tied to
+        stats = self.path_cache.get_stats()
+        stats['graphVersion'] = self.version
+        stats['invalidations'] = self.path_cache_invalidations
+        return stats
+
+    def get_write_stats(self) -> Dict:
+        # group commit counters: how many inserts were folded into each commit
+        return {
+            'commits': self.commits,
+            'wordsCommitted': self.committed_words,
+            'wordsPerCommit': self.committed_words / self.commits if self.commits else 0.0,
+            'pendingInserts': len(self._pending)
+        }
+
+    def get_memory_stats(self) -> Dict[str, int]:
+        # sizes of the graph data structures
+        snapshot = self._snapshot
+        return {
+            'words': snapshot.size,
+            'edges': snapshot.adjacency.num_edges,
+            'embeddingBytes': self.embeddings.nbytes,
+            'frozenEmbeddingBytes': self.embeddings.frozen_nbytes,
+            'frozenAdjacencyBytes': self.adjacency.frozen_nbytes,
+            'adjacencyBytes': self.adjacency.nbytes
+        }
@@ -0,0 +1,59 @@
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, List
+
+# wall-clock time this module was first imported, close enough to process start
+# since app/__init__.py imports it before anything heavy
+PROCESS_STARTED_AT = time.time()
+
+
+class StartupTimer:
+    # records how long each startup phase took (imports, model load, vocabulary embedding, ...)
+    # phases are kept in the order they started; a phase that runs again overwrites its entry
+
+    def __init__(self):
+        self._phases: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        # time a block as a named phase, marking it failed if it raises
+        started = time.perf_counter()
+        with self._lock:
+            self._phases.pop(name, None)
+            self._phases[name] = {
+                'status': 'running',
+                'startedAt': time.time() - PROCESS_STARTED_AT,
+                'seconds': None
+            }
+        try:
+            yield
+        except BaseException:
+            self._finish(name, 'failed', started)
+            raise
+        self._finish(name, 'done', started)
+
+    def _finish(self, name: str, status: str, started: float):
+        with self._lock:
+            self._phases[name]['status'] = status
+            self._phases[name]['seconds'] = round(time.perf_counter() - started, 4)
+
+    def get_phases(self) -> List[Dict]:
+        with self._lock:
+            return [{'name': name, **info} for name, info in self._phases.items()]
+
+    def get_report(self) -> Dict:
+        return {
+            'uptimeSeconds': round(time.time() - PROCESS_STARTED_AT, 3),
+            'phases': self.get_phases(),
+            # whether the heavy ML stack has been imported into this process yet
+            'torchImported': 'torch' in sys.modules,
+            'sentenceTransformersImported': 'sentence_transformers' in sys.modules,
+            'modulesLoaded': len(sys.modules)
+        }
+
+
+# process-wide timer shared by app creation, the embedding service and the game service
+startup_timer = StartupTimer()
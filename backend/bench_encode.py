@@ -0,0 +1,54 @@
+# full-vocabulary embedding benchmark: plain model.encode vs the token-length bucketed path
+#
+# usage: python bench_encode.py [--words words.json] [--repeat 3]
+import argparse
+import time
+
+import numpy as np
+
+from app.embedding_service import EmbeddingService
+from app.word_database import WordDatabase
+
+
+def _best_of(repeat, fn):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full-vocabulary embedding")
+    parser.add_argument('--words', default=None, help="JSON word list (defaults to the built-in vocabulary)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per variant, the best is reported")
+    args = parser.parse_args()
+
+    words = WordDatabase(args.words).get_all_words()
+    # no micro-batching, no in-memory cache and no embedding store, so every run goes
+    # through the model
+    service = EmbeddingService(batch_max_wait_ms=0, cache_size=0)
+    service.store = None
+    model = service.load_model()
+
+    # warm up and calibrate once, like the first preload in a server process
+    service.encode(words)
+
+    baseline_time, baseline = _best_of(args.repeat, lambda: model.encode(
+        words, batch_size=32, convert_to_numpy=True, normalize_embeddings=True))
+    bucketed_time, bucketed = _best_of(args.repeat, lambda: service.encode(words))
+
+    drift = float(np.max(1.0 - np.einsum('ij,ij->i', baseline, bucketed)))
+    stats = service.get_bulk_encoding_stats()
+    print(f"{len(words)} words, max_seq_length {stats['maxSeqLength']}, batch size {stats['batchSize']}")
+    print(f"token lengths: {stats['tokenLengthHistogram']}")
+    print(f"model.encode (batch 32): {baseline_time * 1000:8.1f} ms")
+    print(f"bucketed encode:         {bucketed_time * 1000:8.1f} ms  ({baseline_time / bucketed_time:.2f}x)")
+    print(f"max cosine drift: {drift:.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# path search benchmark: bidirectional BFS vs A* (angular heuristic) on the semantic graph
+# /game/path workload: optimal paths between random word pairs (uncached searches)
+# hint workload: a player walking a path towards one target and asking for a hint at every
+#   step, served from the target's distance field (one reverse BFS) or by one A* per hint
+#
+# usage: python bench_search.py [--artifacts artifacts] [--pairs 200] [--weight 1.5] [--seed 0]
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.game_service import GameService
+
+
+def _percentile(latencies, q):
+    return float(np.percentile(latencies, q) * 1000) if latencies else 0.0
+
+
+def _report(name, latencies, expanded, found):
+    print(f"{name:<24} found {found:4d}  expanded {expanded:9d}  "
+          f"p50 {_percentile(latencies, 50):7.3f} ms  p99 {_percentile(latencies, 99):7.3f} ms  "
+          f"total {sum(latencies) * 1000:9.1f} ms")
+
+
+def bench_paths(graph, pairs, method, weight=1.0, max_steps=6):
+    stats = {'expanded': 0}
+    latencies = []
+    lengths = []
+    for start, target in pairs:
+        started = time.perf_counter()
+        path = graph.find_path(start, target, max_steps, method=method, weight=weight, stats=stats)
+        latencies.append(time.perf_counter() - started)
+        lengths.append(len(path) - 1 if path else None)
+    return latencies, stats['expanded'], lengths
+
+
+def bench_hints(game_service, walks):
+    # hints from the distance field: one level BFS per target, then lookups
+    latencies = []
+    expanded = 0
+    for path in walks:
+        game_service.distance_fields.clear()
+        for position in path[:-1]:
+            started = time.perf_counter()
+            cached = game_service.has_distance_field(path[-1])
+            game_service.get_hint(position, path[-1], {position})
+            latencies.append(time.perf_counter() - started)
+            if not cached:
+                expanded += len(game_service.get_distance_field(path[-1]))
+    return latencies, expanded
+
+
+def bench_astar_hints(graph, walks):
+    # hints from one A* search per request (the first hop of the path)
+    stats = {'expanded': 0}
+    latencies = []
+    for path in walks:
+        for position in path[:-1]:
+            started = time.perf_counter()
+            graph.find_path(position, path[-1], 6, method='astar', stats=stats)
+            latencies.append(time.perf_counter() - started)
+    return latencies, stats['expanded']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BFS vs A* path search")
+    parser.add_argument('--artifacts', default=None, help="artifact bundle (defaults to embedding the vocabulary)")
+    parser.add_argument('--words', default=None, help="JSON word list (defaults to the built-in vocabulary)")
+    parser.add_argument('--pairs', type=int, default=200, help="random word pairs for the path workload")
+    parser.add_argument('--weight', type=float, default=1.5, help="heuristic weight for the weighted A* run")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for the word pairs")
+    args = parser.parse_args()
+
+    game_service = GameService(word_file=args.words, artifact_dir=args.artifacts,
+                               puzzle_pool_size=0, max_preload_words=None)
+    graph = game_service.semantic_graph
+    words = graph.get_all_words()
+    rng = random.Random(args.seed)
+    pairs = [tuple(rng.sample(words, 2)) for _ in range(args.pairs)]
+    print(f"{len(words)} words, {graph.adjacency.num_edges} edges, threshold {graph.similarity_threshold} "
+          f"(max {np.degrees(graph.max_hop_angle):.1f} degrees per hop), {len(pairs)} pairs")
+
+    print("\n/game/path workload")
+    bfs_latencies, bfs_expanded, bfs_lengths = bench_paths(graph, pairs, 'bfs')
+    _report('bidirectional BFS', bfs_latencies, bfs_expanded, sum(n is not None for n in bfs_lengths))
+    astar_latencies, astar_expanded, astar_lengths = bench_paths(graph, pairs, 'astar')
+    _report('A*', astar_latencies, astar_expanded, sum(n is not None for n in astar_lengths))
+    weighted_latencies, weighted_expanded, weighted_lengths = bench_paths(graph, pairs, 'astar', args.weight)
+    _report(f'weighted A* (w={args.weight})', weighted_latencies, weighted_expanded,
+            sum(n is not None for n in weighted_lengths))
+    mismatches = sum(a != b for a, b in zip(bfs_lengths, astar_lengths))
+    longer = sum(a is not None and b is not None and b > a for a, b in zip(bfs_lengths, weighted_lengths))
+    print(f"A* length mismatches: {mismatches}, weighted A* longer paths: {longer}")
+
+    print("\nhint workload")
+    walks = []
+    for start, target in pairs:
+        path = graph.find_path(start, target, 6, method='bfs')
+        if path and len(path) > 2:
+            walks.append(path)
+    hint_latencies, hint_expanded = bench_hints(game_service, walks)
+    _report('distance field', hint_latencies, hint_expanded, len(hint_latencies))
+    astar_hint_latencies, astar_hint_expanded = bench_astar_hints(graph, walks)
+    _report('A* per hint', astar_hint_latencies, astar_hint_expanded, len(astar_hint_latencies))
+
+
+if __name__ == '__main__':
+    main()
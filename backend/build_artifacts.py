@@ -0,0 +1,93 @@
+# offline artifact builder
+# embeds the whole vocabulary, builds the thresholded semantic graph and a puzzle pool once,
+# and writes them as a versioned bundle that the server memory-maps at startup (ARTIFACT_DIR)
+#
+# usage: python build_artifacts.py --out artifacts [--words words.json] [--threshold 0.45] [--puzzles 32] [--landmarks 32]
+import os
+import argparse
+import logging
+import time
+
+from app import artifacts
+from app.embedding_service import EmbeddingService, DEFAULT_MODEL_NAME
+from app.game_service import GameService
+
+logger = logging.getLogger(__name__)
+
+
+def build(out_dir: str, word_file: str = None, similarity_threshold: float = 0.45,
+          model_name: str = DEFAULT_MODEL_NAME, puzzles_per_step: int = 32, puzzle_rounds: int = 500,
+          embedding_service: EmbeddingService = None, workers: int = None, landmark_count: int = 32) -> dict:
+    # build a bundle for the given vocabulary and threshold, returns its manifest
+    # workers: processes for the graph's threshold join (defaults to every core)
+    # landmark_count: landmark distance tables stored with the graph (0 to skip)
+    started = time.time()
+    embedding_service = embedding_service or EmbeddingService(model_name)
+
+    # the game service does the full vocabulary load, so the bundle matches what the server would build
+    game_service = GameService(
+        similarity_threshold=similarity_threshold,
+        word_file=word_file,
+        puzzle_pool_size=puzzles_per_step,
+        embedding_service=embedding_service,
+        max_preload_words=None,
+        graph_build_workers=workers or os.cpu_count() or 1,
+        landmark_count=landmark_count
+    )
+
+    puzzles = []
+    if game_service.puzzle_pool is not None:
+        # stop the background producer and fill synchronously so the output is complete on exit
+        game_service.puzzle_pool.stop()
+        game_service.puzzle_pool.fill(max_rounds=puzzle_rounds)
+        for bucket in game_service.puzzle_pool.buckets.values():
+            puzzles.extend(
+                {'start': p.start, 'target': p.target, 'path': p.optimal_path}
+                for p in bucket
+            )
+
+    words, embeddings, indptr, indices = game_service.semantic_graph.export_arrays()
+    manifest = artifacts.save_bundle(
+        out_dir,
+        words,
+        embeddings,
+        indptr,
+        indices,
+        model_name=embedding_service.model_name,
+        similarity_threshold=similarity_threshold,
+        vocabulary=game_service.word_database.get_all_words(),
+        puzzles=puzzles,
+        landmarks=game_service.semantic_graph.export_landmarks(),
+        embedding_backend=embedding_service.backend
+    )
+    logger.info(f"Built artifact bundle in {time.time() - started:.1f}s")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the embedding / graph / puzzle artifact bundle")
+    parser.add_argument('--out', required=True, help="output directory for the bundle")
+    parser.add_argument('--words', default=None, help="JSON word list (defaults to the built-in vocabulary)")
+    parser.add_argument('--threshold', type=float, default=0.45, help="similarity threshold for graph edges")
+    parser.add_argument('--model', default=DEFAULT_MODEL_NAME, help="sentence-transformers model name")
+    parser.add_argument('--puzzles', type=int, default=32, help="puzzles per step count (0 to skip)")
+    parser.add_argument('--landmarks', type=int, default=32, help="landmark distance tables (0 to skip)")
+    parser.add_argument('--workers', type=int, default=None, help="graph build processes (defaults to every core)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    manifest = build(
+        args.out,
+        word_file=args.words,
+        similarity_threshold=args.threshold,
+        model_name=args.model,
+        puzzles_per_step=args.puzzles,
+        workers=args.workers,
+        landmark_count=args.landmarks
+    )
+    print(f"{manifest['word_count']} words, {manifest['edge_count']} edges, "
+          f"{manifest['puzzle_count']} puzzles -> {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+# gunicorn settings for pre-fork serving
+# the game service (model, embedding matrix, CSR graph) is built once in the master before
+# forking; its NumPy buffers are frozen read-only, so every worker shares one physical copy
+# check sharing with GET /api/memory or `python measure_memory.py <master pid>`
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5001')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+# threaded workers: a slow encode or search holds one thread, not the whole worker
+# heavy work is capped by the bounded executors in app/routes.py (INFERENCE_WORKERS,
+# SEARCH_WORKERS, EXECUTOR_QUEUE_SIZE); a request waits on its thread for the executor, so
+# every running or queued slot can hold a thread, and threads is kept at least
+# FREE_THREADS above their total so cheap lookups always find one
+FREE_THREADS = 4
+_queue_size = int(os.environ.get('EXECUTOR_QUEUE_SIZE', 4))
+# (same defaults as app/routes.py)
+executor_slots = (int(os.environ.get('INFERENCE_WORKERS', 4)) + _queue_size
+                  + int(os.environ.get('SEARCH_WORKERS', 2)) + _queue_size)
+worker_class = 'gthread'
+threads = max(int(os.environ.get('GUNICORN_THREADS', 16)), executor_slots + FREE_THREADS)
+timeout = 60
+preload_app = True
+
+# no collections in the master while preloading: a GC pass writes to every tracked object's
+# header, and freed holes would be refilled after the fork, dirtying shared pages
+gc.disable()
+
+
+def pre_fork(server, worker):
+    # runs in the master before each fork; the first call waits for initialization to finish
+    from app.routes import prepare_for_fork
+    prepare_for_fork()
+    # keep everything allocated so far out of the workers' collections
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
@@ -0,0 +1,36 @@
+# per-worker memory of a running gunicorn server
+# shows whether the preloaded embedding matrix and graph are shared copy-on-write:
+# with sharing, each worker's USS (unique set size) stays far below the master's RSS
+#
+# usage: python measure_memory.py <gunicorn master pid>
+import sys
+
+from app.memory_stats import child_pids, process_memory
+
+
+def _mb(value: int) -> str:
+    return f"{value / (1024 * 1024):8.1f}"
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("usage: python measure_memory.py <gunicorn master pid>")
+        sys.exit(1)
+
+    master = int(sys.argv[1])
+    rows = [('master', master)] + [('worker', pid) for pid in child_pids(master)]
+    print(f"{'role':8} {'pid':>8} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8} {'shared MB':>9}")
+    total_pss = 0
+    for role, pid in rows:
+        memory = process_memory(pid)
+        if memory is None:
+            print(f"{role:8} {pid:>8} unavailable")
+            continue
+        total_pss += memory['pssBytes']
+        print(f"{role:8} {pid:>8} {_mb(memory['rssBytes'])} {_mb(memory['pssBytes'])} "
+              f"{_mb(memory['ussBytes'])} {_mb(memory['sharedBytes'])}")
+    print(f"total PSS (actual memory used by the server): {_mb(total_pss).strip()} MB")
+
+
+if __name__ == '__main__':
+    main()
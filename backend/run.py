@@ -4,9 +4,8 @@ from app import create_app
 
 app = create_app()
 
-# note: With --preload flag in Procfile, the app loads once at startup
-# game service will initialize on first request via lazy loading
-# use /api/warmup endpoint after deployment to pre-initialize if needed
+# note: the game service initializes in a background thread started by create_app
+# game routes answer 503 (with Retry-After) until /api/ready reports ready
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5001))
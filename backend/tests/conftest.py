@@ -38,6 +38,45 @@ def mock_embedding_service():
     
     return mock_service
 
+@pytest.fixture
+def chain_words():
+    return [f"step{i}" for i in range(7)]
+
+@pytest.fixture
+def chain_embedding_service(chain_words):
+    """Mock embedding service whose chain words form a simple path step0 - step1 - ... - step6"""
+    # chain words sit 50 degrees apart on a circle, so neighbours have similarity
+    # cos(50) ~ 0.64 and anything further apart falls below a 0.6 threshold
+    angles = {word: np.radians(50 * i) for i, word in enumerate(chain_words)}
+    mock_service = Mock(spec=EmbeddingService)
+    mock_service.embedding_dim = 384
+
+    def create_embedding(word):
+        embedding = np.zeros(384, dtype=np.float32)
+        if word in angles:
+            embedding[0] = np.cos(angles[word])
+            embedding[1] = np.sin(angles[word])
+        else:
+            # unknown words are orthogonal to the chain
+            embedding[2 + hash(word) % 382] = 1.0
+        return embedding
+
+    def encode(words):
+        if isinstance(words, str):
+            words = [words]
+        return np.array([create_embedding(w) for w in words]).reshape(len(words), 384)
+
+    mock_service.encode_word.side_effect = create_embedding
+    mock_service.encode.side_effect = encode
+    mock_service.get_embedding_dim.return_value = 384
+    return mock_service
+
+@pytest.fixture
+def chain_graph(chain_embedding_service, chain_words):
+    graph = SemanticGraph(chain_embedding_service, similarity_threshold=0.6)
+    graph.add_words(chain_words)
+    return graph
+
 @pytest.fixture
 def real_embedding_service():
     return EmbeddingService()
@@ -0,0 +1,167 @@
+import time
+import pytest
+import numpy as np
+from app.adjacency import CSRAdjacency, GraphView
+
+@pytest.fixture
+def adjacency():
+    adjacency = CSRAdjacency(merge_threshold=6)
+    adjacency.ensure_nodes(5)
+    return adjacency
+
+def neighbor_set(adjacency, node):
+    return set(adjacency.neighbors(node).tolist())
+
+class TestCSRAdjacency:
+    def test_empty_adjacency(self, adjacency):
+        assert adjacency.num_edges == 0
+        assert len(adjacency.neighbors(0)) == 0
+        assert len(adjacency.neighbors(4)) == 0
+
+    def test_bulk_edges_are_undirected(self, adjacency):
+        added = adjacency.add_edges(np.array([0, 0, 1]), np.array([1, 2, 3]), bulk=True)
+
+        assert added == 3
+        assert adjacency.num_edges == 3
+        assert neighbor_set(adjacency, 0) == {1, 2}
+        assert neighbor_set(adjacency, 1) == {0, 3}
+        assert neighbor_set(adjacency, 3) == {1}
+        assert adjacency.indices.dtype == np.int32
+
+    def test_overlay_edges(self, adjacency):
+        adjacency.add_edges(np.array([0]), np.array([1]), bulk=True)
+        adjacency.add_edges(np.array([4]), np.array([0]))
+
+        assert adjacency.overlay
+        assert neighbor_set(adjacency, 0) == {1, 4}
+        assert neighbor_set(adjacency, 4) == {0}
+        assert adjacency.has_edge(0, 4)
+        assert not adjacency.has_edge(1, 4)
+
+    def test_overlay_is_merged_past_threshold(self, adjacency):
+        adjacency.add_edges(np.array([0, 1, 2]), np.array([4, 4, 4]))
+
+        assert not adjacency.overlay
+        assert neighbor_set(adjacency, 4) == {0, 1, 2}
+        assert adjacency.num_edges == 3
+
+    def test_compact_preserves_edges(self, adjacency):
+        adjacency.add_edges(np.array([0, 1]), np.array([1, 2]), bulk=True)
+        adjacency.add_edges(np.array([3]), np.array([0]))
+        before = {node: neighbor_set(adjacency, node) for node in range(5)}
+
+        adjacency.compact()
+        after = {node: neighbor_set(adjacency, node) for node in range(5)}
+        assert before == after
+
+    def test_csr_covers_all_nodes(self, adjacency):
+        adjacency.add_edges(np.array([0]), np.array([1]), bulk=True)
+        indptr, indices = adjacency.csr()
+
+        assert len(indptr) == 6
+        assert indptr[-1] == len(indices)
+
+    def test_expand_frontier(self, adjacency):
+        adjacency.add_edges(np.array([0, 0, 1]), np.array([1, 2, 3]), bulk=True)
+        adjacency.add_edges(np.array([4]), np.array([2]))
+
+        neighbors, sources = adjacency.expand(np.array([0, 2]))
+        edges = set(zip(sources.tolist(), neighbors.tolist()))
+        assert edges == {(0, 1), (0, 2), (2, 0), (2, 4)}
+
+    def test_expand_with_overlay_matches_compacted(self):
+        rng = np.random.default_rng(0)
+        adjacency = CSRAdjacency(merge_threshold=10 ** 6)
+        adjacency.ensure_nodes(200)
+        sources, targets = rng.integers(0, 150, 400), rng.integers(0, 150, 400)
+        adjacency.add_edges(sources[sources != targets], targets[sources != targets], bulk=True)
+        for node in range(150, 200):
+            adjacency.add_edges(np.full(3, node), rng.integers(0, node, 3))
+        assert len(adjacency.snapshot().overlay_nodes) > 50
+
+        frontier = np.unique(rng.integers(0, 200, 60))
+        def edges(neighbors, sources):
+            return sorted(zip(sources.tolist(), neighbors.tolist()))
+
+        before = edges(*adjacency.expand(frontier))
+        degrees = adjacency.degrees()
+        neighbors = [sorted(adjacency.neighbors(node).tolist()) for node in range(200)]
+        adjacency.compact()
+        assert before == edges(*adjacency.expand(frontier))
+        assert np.array_equal(degrees, adjacency.degrees())
+        assert neighbors == [sorted(adjacency.neighbors(node).tolist()) for node in range(200)]
+
+    def test_insert_cost_does_not_grow_with_overlay(self):
+        # a small insert only sorts its own entries: with a 200k-entry overlay it pays a copy
+        # of the overlay arrays, not a re-sort (which took ~100x the empty-overlay insert)
+        rng = np.random.default_rng(0)
+
+        def insert_seconds(overlay_edges):
+            adjacency = CSRAdjacency(merge_threshold=10 ** 7)
+            adjacency.ensure_nodes(50000)
+            sources, targets = rng.integers(0, 50000, 500000), rng.integers(0, 50000, 500000)
+            adjacency.add_edges(sources[sources != targets], targets[sources != targets], bulk=True)
+            if overlay_edges:
+                sources, targets = rng.integers(0, 50000, overlay_edges), rng.integers(0, 50000, overlay_edges)
+                adjacency.add_edges(sources[sources != targets], targets[sources != targets])
+            best = float('inf')
+            for _ in range(5):
+                sources, targets = rng.integers(0, 50000, 10), rng.integers(0, 50000, 10)
+                start = time.perf_counter()
+                adjacency.add_edges(sources[sources != targets], targets[sources != targets])
+                best = min(best, time.perf_counter() - start)
+            assert adjacency.snapshot().overlay_edges >= 2 * overlay_edges * 0.99
+            return best
+
+        assert insert_seconds(100000) < 10 * insert_seconds(0) + 0.002
+
+    def test_expand_empty_frontier(self, adjacency):
+        neighbors, sources = adjacency.expand(np.array([3], dtype=np.int64))
+        assert len(neighbors) == 0
+        assert len(sources) == 0
+
+    def test_degrees(self, adjacency):
+        adjacency.add_edges(np.array([0, 0]), np.array([1, 2]), bulk=True)
+        adjacency.add_edges(np.array([3]), np.array([0]))
+
+        assert adjacency.degrees().tolist() == [3, 1, 1, 1, 0]
+
+    def test_freeze_makes_csr_read_only(self, adjacency):
+        adjacency.add_edges(np.array([0]), np.array([1]), bulk=True)
+        adjacency.add_edges(np.array([2]), np.array([3]))
+        adjacency.freeze()
+
+        assert not adjacency.overlay
+        assert not adjacency.indptr.flags.writeable
+        assert not adjacency.indices.flags.writeable
+        assert adjacency.frozen_nbytes == adjacency.indptr.nbytes + adjacency.indices.nbytes
+
+        # later edges still work and never write the frozen arrays
+        frozen = adjacency.indices
+        adjacency.add_edges(np.array([1]), np.array([4]), bulk=True)
+        assert neighbor_set(adjacency, 1) == {0, 4}
+        assert neighbor_set(adjacency, 3) == {2}
+        assert adjacency.indices is not frozen
+
+    def test_snapshot_is_not_affected_by_later_edges(self, adjacency):
+        adjacency.add_edges(np.array([0]), np.array([1]), bulk=True)
+        snapshot = adjacency.snapshot()
+        adjacency.add_edges(np.array([0]), np.array([2]))
+        adjacency.add_edges(np.array([3]), np.array([4]), bulk=True)
+
+        assert set(snapshot.neighbors(0).tolist()) == {1}
+        assert snapshot.num_edges == 1
+        assert neighbor_set(adjacency, 0) == {1, 2}
+
+class TestGraphView:
+    def test_view_lists_connected_words(self, adjacency):
+        words = ["cat", "dog", "bird", "fish", "tree"]
+        index = {word: i for i, word in enumerate(words)}
+        view = GraphView(adjacency, index, words)
+        assert len(view) == 0
+
+        adjacency.add_edges(np.array([0]), np.array([1]), bulk=True)
+        assert len(view) == 2
+        assert set(view) == {"cat", "dog"}
+        assert view["cat"] == {"dog"}
+        assert view.get("tree", set()) == set()
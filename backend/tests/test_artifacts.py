@@ -0,0 +1,157 @@
+import json
+import numpy as np
+import pytest
+from app import artifacts
+from app.game_service import GameService
+from app.semantic_graph import SemanticGraph
+from build_artifacts import build
+
+
+@pytest.fixture
+def chain_word_file(tmp_path, chain_words):
+    path = tmp_path / 'words.json'
+    path.write_text(json.dumps(chain_words))
+    return str(path)
+
+
+@pytest.fixture
+def named_chain_service(chain_embedding_service):
+    chain_embedding_service.model_name = 'chain-model'
+    chain_embedding_service.backend = 'torch'
+    return chain_embedding_service
+
+
+class TestArtifactBundle:
+    def test_vocab_hash_ignores_order_and_case(self):
+        assert artifacts.vocab_hash(['Cat', 'dog']) == artifacts.vocab_hash(['dog', 'cat'])
+        assert artifacts.vocab_hash(['cat']) != artifacts.vocab_hash(['dog'])
+
+    def test_save_and_load_round_trip(self, tmp_path, chain_graph, chain_words):
+        words, embeddings, indptr, indices = chain_graph.export_arrays()
+        puzzles = [{'start': 'step0', 'target': 'step2', 'path': ['step0', 'step1', 'step2']}]
+        manifest = artifacts.save_bundle(str(tmp_path), words, embeddings, indptr, indices,
+                                         'chain-model', 0.6, chain_words, puzzles)
+
+        assert manifest['word_count'] == 7
+        assert manifest['edge_count'] == 6
+
+        bundle = artifacts.load_bundle(str(tmp_path))
+        assert bundle.words == words
+        assert np.array_equal(bundle.embeddings, embeddings)
+        assert np.array_equal(bundle.indptr, indptr)
+        assert np.array_equal(bundle.indices, indices)
+        assert bundle.puzzles == puzzles
+        # memory-mapped read-only
+        assert not bundle.embeddings.flags.writeable
+
+    def test_landmark_round_trip(self, tmp_path, chain_graph, chain_words):
+        words, embeddings, indptr, indices = chain_graph.export_arrays()
+        artifacts.save_bundle(str(tmp_path), words, embeddings, indptr, indices, 'chain-model', 0.6, chain_words)
+        assert artifacts.load_bundle(str(tmp_path)).landmark_distances is None
+
+        chain_graph.build_landmarks(3)
+        landmark_ids, distances = chain_graph.export_landmarks()
+        manifest = artifacts.save_bundle(str(tmp_path), words, embeddings, indptr, indices, 'chain-model', 0.6,
+                                         chain_words, landmarks=(landmark_ids, distances))
+        bundle = artifacts.load_bundle(str(tmp_path))
+
+        assert manifest['landmark_count'] == 3
+        assert np.array_equal(bundle.landmark_ids, landmark_ids)
+        assert np.array_equal(bundle.landmark_distances, distances)
+        assert not bundle.landmark_distances.flags.writeable
+
+    def test_missing_bundle(self, tmp_path):
+        assert artifacts.read_manifest(str(tmp_path)) is None
+        with pytest.raises(FileNotFoundError):
+            artifacts.load_bundle(str(tmp_path))
+
+    def test_mismatch_detection(self, tmp_path, chain_graph, chain_words):
+        words, embeddings, indptr, indices = chain_graph.export_arrays()
+        manifest = artifacts.save_bundle(str(tmp_path), words, embeddings, indptr, indices,
+                                         'chain-model', 0.6, chain_words)
+
+        assert artifacts.bundle_mismatch(manifest, 'chain-model', 0.6, chain_words) is None
+        assert artifacts.bundle_mismatch(manifest, 'other-model', 0.6, chain_words)
+        assert artifacts.bundle_mismatch(manifest, 'chain-model', 0.45, chain_words)
+        assert artifacts.bundle_mismatch(manifest, 'chain-model', 0.6, chain_words + ['extra'])
+        assert artifacts.bundle_mismatch(manifest, 'chain-model', 0.6, chain_words, 'onnx-int8')
+        assert artifacts.bundle_mismatch(dict(manifest, format_version=1), 'chain-model', 0.6, chain_words)
+
+
+class TestLoadArrays:
+    def test_loaded_graph_matches_built_graph(self, tmp_path, chain_graph, chain_embedding_service, chain_words):
+        words, embeddings, indptr, indices = chain_graph.export_arrays()
+        artifacts.save_bundle(str(tmp_path), words, embeddings, indptr, indices, 'chain-model', 0.6, chain_words)
+        bundle = artifacts.load_bundle(str(tmp_path))
+
+        loaded = SemanticGraph(chain_embedding_service, similarity_threshold=0.6)
+        loaded.load_arrays(bundle.words, bundle.embeddings, bundle.indptr, bundle.indices)
+
+        assert loaded.bfs_path('step0', 'step6') == chain_graph.bfs_path('step0', 'step6')
+        assert loaded.get_neighbors('step3') == {'step2', 'step4'}
+
+    def test_loaded_graph_accepts_new_words(self, tmp_path, chain_graph, chain_embedding_service, chain_words):
+        words, embeddings, indptr, indices = chain_graph.export_arrays()
+        artifacts.save_bundle(str(tmp_path), words, embeddings, indptr, indices, 'chain-model', 0.6, chain_words)
+        bundle = artifacts.load_bundle(str(tmp_path))
+
+        loaded = SemanticGraph(chain_embedding_service, similarity_threshold=0.6)
+        loaded.load_arrays(bundle.words, bundle.embeddings, bundle.indptr, bundle.indices)
+        loaded.add_word('unrelated')
+
+        assert loaded.word_exists('unrelated')
+        assert loaded.bfs_path('step0', 'step2') == ['step0', 'step1', 'step2']
+        # the mapped bundle is never written
+        assert np.array_equal(artifacts.load_bundle(str(tmp_path)).embeddings, embeddings)
+
+
+class TestBuildArtifacts:
+    def test_build_and_load_in_game_service(self, tmp_path, chain_word_file, named_chain_service):
+        out_dir = str(tmp_path / 'bundle')
+        manifest = build(out_dir, word_file=chain_word_file, similarity_threshold=0.6,
+                         puzzles_per_step=2, puzzle_rounds=50, embedding_service=named_chain_service)
+
+        assert manifest['word_count'] == 7
+        assert manifest['puzzle_count'] > 0
+
+        named_chain_service.encode.reset_mock()
+        service = GameService(similarity_threshold=0.6, word_file=chain_word_file, puzzle_pool_size=2,
+                              artifact_dir=out_dir, embedding_service=named_chain_service)
+        service.puzzle_pool.stop()
+
+        # vocabulary came from the bundle, not the model
+        named_chain_service.encode.assert_not_called()
+        assert service.find_optimal_path('step0', 'step3') == ['step0', 'step1', 'step2', 'step3']
+        assert service.puzzle_pool.get_stats()['total'] > 0
+        # landmark tables are mapped from the bundle instead of being rebuilt
+        assert manifest['landmark_count'] > 0
+        landmark_ids, distances = service.semantic_graph.export_landmarks()
+        assert len(landmark_ids) == manifest['landmark_count']
+        assert not distances.flags.writeable
+
+    def test_stale_bundle_is_ignored(self, tmp_path, chain_word_file, named_chain_service):
+        out_dir = str(tmp_path / 'bundle')
+        build(out_dir, word_file=chain_word_file, similarity_threshold=0.6,
+              puzzles_per_step=0, embedding_service=named_chain_service)
+
+        named_chain_service.encode.reset_mock()
+        service = GameService(similarity_threshold=0.65, word_file=chain_word_file, puzzle_pool_size=0,
+                              artifact_dir=out_dir, embedding_service=named_chain_service)
+
+        # threshold differs, so the vocabulary is embedded again
+        assert named_chain_service.encode.called
+        assert len(service.semantic_graph.get_all_words()) == 7
+
+    def test_bundle_from_other_backend_is_ignored(self, tmp_path, chain_word_file, named_chain_service):
+        out_dir = str(tmp_path / 'bundle')
+        manifest = build(out_dir, word_file=chain_word_file, similarity_threshold=0.6,
+                         puzzles_per_step=0, embedding_service=named_chain_service)
+        assert manifest['embedding_backend'] == 'torch'
+
+        named_chain_service.encode.reset_mock()
+        named_chain_service.backend = 'onnx-int8'
+        GameService(similarity_threshold=0.6, word_file=chain_word_file, puzzle_pool_size=0,
+                    artifact_dir=out_dir, embedding_service=named_chain_service)
+
+        # torch vectors are not mixed with onnx-encoded runtime words
+        assert named_chain_service.encode.called
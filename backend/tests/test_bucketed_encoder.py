@@ -0,0 +1,123 @@
+import time
+import numpy as np
+import pytest
+from app.bucketed_encoder import BucketedEncoder
+
+
+def fake_vector(text, dim=4):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[len(text) % dim] = 1.0
+    vector[-1] += len(text)
+    return vector
+
+
+class FakeModel:
+    # records every model call as (texts, batch_size)
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size):
+        self.calls.append((list(texts), batch_size))
+        return np.array([fake_vector(t) for t in texts], dtype=np.float32).reshape(len(texts), 4)
+
+    def lengths(self, texts):
+        # one token per character plus [CLS]/[SEP]
+        return [len(t) + 2 for t in texts]
+
+
+@pytest.fixture
+def model():
+    return FakeModel()
+
+
+class TestBucketedEncoder:
+    def test_results_keep_input_order(self, model):
+        encoder = BucketedEncoder(model.encode, model.lengths, batch_size=4)
+        texts = ['ccc', 'a', 'bb', 'dddd', 'e', 'ff']
+
+        embeddings = encoder.encode(texts)
+
+        np.testing.assert_array_equal(embeddings, np.array([fake_vector(t) for t in texts]))
+
+    def test_each_model_call_has_a_single_token_length(self, model):
+        encoder = BucketedEncoder(model.encode, model.lengths, batch_size=4)
+        encoder.encode(['ccc', 'a', 'bb', 'dddd', 'e', 'ff', 'ggg'])
+
+        for texts, _ in model.calls:
+            assert len({len(t) for t in texts}) == 1
+        assert len(model.calls) == 4
+
+        stats = encoder.get_stats()
+        assert stats['tokenLengthHistogram'] == {3: 2, 4: 2, 5: 2, 6: 1}
+        assert stats['textsEncoded'] == 7
+
+    def test_calibration_picks_a_candidate_and_keeps_results(self, model):
+        encoder = BucketedEncoder(model.encode, model.lengths, candidate_batch_sizes=(2, 4, 8))
+        texts = [f"w{i:02d}" for i in range(60)]
+
+        embeddings = encoder.encode(texts)
+
+        assert encoder.batch_size in (2, 4, 8)
+        assert set(encoder.calibration) == {2, 4, 8}
+        # calibration chunks are part of the output, nothing is encoded twice
+        assert sum(len(texts) for texts, _ in model.calls) == 60
+        # an untimed warm-up, then three interleaved rounds
+        assert [batch_size for _, batch_size in model.calls[:10]] == [2] + [2, 4, 8] * 3
+        np.testing.assert_array_equal(embeddings, np.array([fake_vector(t) for t in texts]))
+
+    def test_calibration_takes_best_of_repeats(self, model):
+        # per-text cost falls with the batch size, but the first timed batch of 8 is stalled
+        calls = []
+
+        def encode(texts, batch_size):
+            calls.append(batch_size)
+            time.sleep(0.002 + 0.0005 * batch_size + (0.1 if calls.count(8) == 1 and batch_size == 8 else 0))
+            return model.encode(texts, batch_size)
+
+        encoder = BucketedEncoder(encode, model.lengths, candidate_batch_sizes=(2, 4, 8))
+        encoder.encode([f"w{i:02d}" for i in range(44)])
+
+        assert encoder.batch_size == 8
+
+    def test_calibration_scales_to_the_bucket(self, model):
+        # 43 texts can't fill three rounds (44), so two rounds over every candidate
+        encoder = BucketedEncoder(model.encode, model.lengths, candidate_batch_sizes=(2, 4, 8))
+        texts = [f"w{i:02d}" for i in range(43)]
+
+        embeddings = encoder.encode(texts)
+
+        assert set(encoder.calibration) == {2, 4, 8}
+        assert [batch_size for _, batch_size in model.calls[:7]] == [2] + [2, 4, 8] * 2
+        np.testing.assert_array_equal(embeddings, np.array([fake_vector(t) for t in texts]))
+
+    def test_calibration_drops_candidates_that_dont_fit(self, model):
+        # 20 texts: two rounds of 8 don't fit after the warm-up, two rounds of 2 and 4 do
+        encoder = BucketedEncoder(model.encode, model.lengths, candidate_batch_sizes=(2, 4, 8))
+        encoder.encode([f"w{i:02d}" for i in range(20)])
+
+        assert set(encoder.calibration) == {2, 4}
+        assert encoder.batch_size in (2, 4)
+        assert sum(len(texts) for texts, _ in model.calls) == 20
+
+    def test_calibration_needs_full_chunks(self, model):
+        encoder = BucketedEncoder(model.encode, model.lengths, default_batch_size=16,
+                                  candidate_batch_sizes=(2, 4, 8))
+        encoder.encode([f"w{i:02d}" for i in range(13)])
+
+        assert encoder.batch_size is None
+        assert encoder.calibration is None
+
+    def test_small_inputs_wait_for_calibration(self, model):
+        encoder = BucketedEncoder(model.encode, model.lengths, default_batch_size=16,
+                                  candidate_batch_sizes=(2, 4, 8))
+        encoder.encode(['a', 'b', 'c'])
+
+        assert encoder.batch_size is None
+        assert model.calls == [(['a', 'b', 'c'], 16)]
+
+    def test_fixed_batch_size_skips_calibration(self, model):
+        encoder = BucketedEncoder(model.encode, model.lengths, batch_size=8, candidate_batch_sizes=(2, 4))
+        encoder.encode([f"w{i:02d}" for i in range(20)])
+
+        assert encoder.calibration is None
+        assert all(batch_size == 8 for _, batch_size in model.calls)
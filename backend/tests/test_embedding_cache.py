@@ -0,0 +1,79 @@
+import time
+import pytest
+import numpy as np
+from app.embedding_cache import EmbeddingCache
+
+def rows(n, dim=4):
+    return np.arange(n * dim, dtype=np.float32).reshape(n, dim)
+
+class TestEmbeddingCache:
+    def test_lookup_reports_missing_positions(self):
+        cache = EmbeddingCache(8, 4)
+        cache.put_many(["a", "c"], rows(2))
+
+        embeddings, missing = cache.lookup(["a", "b", "c", "d"])
+        assert missing == [1, 3]
+        np.testing.assert_array_equal(embeddings[0], rows(2)[0])
+        np.testing.assert_array_equal(embeddings[2], rows(2)[1])
+        assert not embeddings[1].any()
+
+    def test_cached_rows_are_copies(self):
+        cache = EmbeddingCache(8, 4)
+        data = rows(1)
+        cache.put_many(["a"], data)
+        data[0] = -1
+
+        embeddings, _ = cache.lookup(["a"])
+        embeddings[0] = -2
+        np.testing.assert_array_equal(cache.lookup(["a"])[0][0], rows(1)[0])
+
+    def test_least_recently_used_is_evicted(self):
+        cache = EmbeddingCache(2, 4)
+        cache.put_many(["a", "b"], rows(2))
+        cache.lookup(["a"])
+        cache.put_many(["c"], rows(1))
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.evictions == 1
+
+    def test_stats(self):
+        cache = EmbeddingCache(8, 4)
+        cache.put_many(["a", "b"], rows(2))
+        cache.lookup(["a", "b", "c", "d"])
+
+        stats = cache.get_stats()
+        assert stats['entries'] == 2
+        assert stats['bytes'] == 2 * 4 * 4
+        assert stats['hits'] == 2
+        assert stats['misses'] == 2
+        assert stats['hitRate'] == 0.5
+
+    def test_entries_expire(self):
+        cache = EmbeddingCache(8, 4, ttl_seconds=0.01)
+        cache.put_many(["a"], rows(1))
+        time.sleep(0.02)
+
+        _, missing = cache.lookup(["a"])
+        assert missing == [0]
+        assert "a" not in cache
+        assert cache.get_stats()['expirations'] == 1
+
+    def test_peek_leaves_stats_alone(self):
+        cache = EmbeddingCache(8, 4, ttl_seconds=0.05)
+        cache.put_many(["a"], rows(1))
+
+        np.testing.assert_array_equal(cache.peek("a"), rows(1)[0])
+        assert cache.peek("b", None) is None
+        assert cache.get_stats()['hits'] == cache.get_stats()['misses'] == 0
+        time.sleep(0.06)
+        assert cache.peek("a", None) is None
+
+    def test_returned_rows_are_read_only(self):
+        cache = EmbeddingCache(8, 4)
+        cache.put("a", rows(1)[0])
+
+        row = cache.get("a")
+        with pytest.raises(ValueError):
+            row /= 2
+        np.testing.assert_array_equal(cache.get("a"), rows(1)[0])
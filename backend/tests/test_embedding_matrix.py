@@ -0,0 +1,102 @@
+import pytest
+import numpy as np
+from app.embedding_matrix import EmbeddingMatrix, EmbeddingView
+
+def unit_vectors(count, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.random((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+@pytest.fixture
+def matrix():
+    return EmbeddingMatrix(8, initial_capacity=2)
+
+class TestEmbeddingMatrix:
+    def test_empty_matrix(self, matrix):
+        assert len(matrix) == 0
+        assert matrix.matrix.shape == (0, 8)
+
+    def test_add_assigns_sequential_ids(self, matrix):
+        vectors = unit_vectors(2)
+        assert matrix.add("cat", vectors[0]) == 0
+        assert matrix.add("dog", vectors[1]) == 1
+        assert matrix.add("cat", vectors[1]) == 0
+        assert matrix.words == ["cat", "dog"]
+        np.testing.assert_array_equal(matrix.vector(0), vectors[0])
+
+    def test_add_many_grows_capacity(self, matrix):
+        vectors = unit_vectors(10)
+        ids = matrix.add_many([f"w{i}" for i in range(10)], vectors)
+
+        assert list(ids) == list(range(10))
+        assert len(matrix) == 10
+        np.testing.assert_array_equal(matrix.matrix, vectors)
+
+    def test_matrix_is_a_view(self, matrix):
+        matrix.add_many(["cat", "dog"], unit_vectors(2))
+        assert np.shares_memory(matrix.matrix, matrix._data)
+
+    def test_similarities(self, matrix):
+        vectors = unit_vectors(3)
+        matrix.add_many(["a", "b", "c"], vectors)
+
+        np.testing.assert_allclose(matrix.similarities(vectors[0]), vectors @ vectors[0], rtol=1e-6)
+        assert matrix.similarities(vectors[:2]).shape == (2, 3)
+
+    def test_freeze_moves_rows_to_read_only_base(self, matrix):
+        vectors = unit_vectors(3)
+        matrix.add_many(["a", "b", "c"], vectors)
+        matrix.freeze()
+
+        assert matrix.base_size == 3
+        assert matrix.frozen_nbytes == vectors.nbytes
+        assert not matrix.matrix.flags.writeable
+        np.testing.assert_array_equal(matrix.matrix, vectors)
+
+    def test_add_after_freeze_uses_private_tail(self, matrix):
+        vectors = unit_vectors(5)
+        matrix.add_many(["a", "b", "c"], vectors[:3])
+        matrix.freeze()
+        base = matrix._base
+
+        assert matrix.add("d", vectors[3]) == 3
+        assert list(matrix.add_many(["e"], vectors[4:])) == [4]
+
+        assert matrix._base is base
+        np.testing.assert_array_equal(matrix.matrix, vectors)
+        np.testing.assert_array_equal(matrix.vector(1), vectors[1])
+        np.testing.assert_array_equal(matrix.vector(4), vectors[4])
+        np.testing.assert_array_equal(matrix.vectors([4, 0, 3]), vectors[[4, 0, 3]])
+        np.testing.assert_array_equal(matrix.rows(2, 5), vectors[2:5])
+
+    def test_similarities_across_frozen_base(self, matrix):
+        vectors = unit_vectors(5)
+        matrix.add_many(["a", "b", "c"], vectors[:3])
+        matrix.freeze()
+        matrix.add_many(["d", "e"], vectors[3:])
+
+        np.testing.assert_allclose(matrix.similarities(vectors[0]), vectors @ vectors[0], rtol=1e-6)
+        np.testing.assert_allclose(matrix.similarities(vectors[3:], end=4), vectors[3:] @ vectors[:4].T, rtol=1e-6)
+
+    def test_from_array_does_not_copy(self):
+        vectors = unit_vectors(3)
+        vectors.flags.writeable = False
+        matrix = EmbeddingMatrix.from_array(["a", "b", "c"], vectors)
+
+        assert np.shares_memory(matrix.matrix, vectors)
+        assert matrix.add("d", unit_vectors(1, seed=1)[0]) == 3
+        np.testing.assert_array_equal(matrix.rows(0, 3), vectors)
+
+    def test_view_behaves_like_a_dict(self, matrix):
+        view = EmbeddingView(matrix)
+        assert view == {}
+
+        vectors = unit_vectors(2)
+        matrix.add_many(["cat", "dog"], vectors)
+        assert "cat" in view
+        assert "bird" not in view
+        assert list(view) == ["cat", "dog"]
+        assert len(view) == 2
+        np.testing.assert_array_equal(view["dog"], vectors[1])
+        with pytest.raises(KeyError):
+            view["bird"]
@@ -1,6 +1,8 @@
 import pytest
 import numpy as np
+from unittest.mock import Mock
 from app.embedding_service import EmbeddingService
+from app.word_database import WordDatabase
 
 class TestEmbeddingService:    
     def test_embedding_service_initialization(self, real_embedding_service):
@@ -8,6 +10,58 @@ class TestEmbeddingService:
         assert real_embedding_service.model_name == "sentence-transformers/all-MiniLM-L6-v2"
         assert real_embedding_service.embedding_dim == 384
     
+    def test_model_loads_lazily(self):
+        service = EmbeddingService(batch_max_wait_ms=0)
+        assert not service.is_model_loaded()
+
+        service.encode_word("cat")
+        assert service.is_model_loaded()
+
+    def test_max_seq_length_is_capped(self, real_embedding_service):
+        assert real_embedding_service.model.max_seq_length <= real_embedding_service.max_seq_length
+
+    def test_bulk_encode_matches_small_batches(self, real_embedding_service):
+        # 80 words take the token-length bucketed path, one word at a time doesn't
+        words = sorted(WordDatabase().get_all_words())[:80]
+
+        bulk = real_embedding_service.encode(words)
+        single = np.array([real_embedding_service.encode([word])[0] for word in words])
+
+        assert bulk.shape == (80, 384)
+        np.testing.assert_allclose(bulk, single, atol=1e-4)
+
+    def test_cache_encodes_only_misses(self):
+        service = EmbeddingService(batch_max_wait_ms=0, cache_size=16)
+        service.model = Mock()
+        service.model.encode.side_effect = lambda texts, **kwargs: np.ones((len(texts), 384), dtype=np.float32)
+
+        service.encode(["cat", "dog"])
+        embeddings = service.encode(["Cat", "bird", "dog", "bird"])
+
+        assert embeddings.shape == (4, 384)
+        assert service.model.encode.call_count == 2
+        assert service.model.encode.call_args.args[0] == ["bird"]
+        stats = service.get_cache_stats()
+        assert stats['entries'] == 3
+        assert stats['hits'] == 2
+
+    def test_encode_word_counts_each_request_once(self):
+        service = EmbeddingService(batch_max_wait_ms=1, cache_size=16)
+        service.model = Mock()
+        service.model.encode.side_effect = lambda texts, **kwargs: np.ones((len(texts), 384), dtype=np.float32)
+
+        service.encode_word("cat")
+        service.encode_word("Cat")
+
+        stats = service.get_cache_stats()
+        assert (stats['hits'], stats['misses']) == (1, 1)
+        assert service.model.encode.call_count == 1
+
+    def test_cache_can_be_disabled(self):
+        service = EmbeddingService(batch_max_wait_ms=0, cache_size=0)
+        assert service.cache is None
+        assert service.get_cache_stats() is None
+
     def test_get_embedding_dim(self, real_embedding_service):
         dim = real_embedding_service.get_embedding_dim()
         assert dim == 384
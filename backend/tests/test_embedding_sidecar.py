@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest.mock import Mock
+import numpy as np
+import pytest
+from app.embedding_service import EmbeddingService
+from app.embedding_sidecar import EmbeddingSidecarServer, SidecarEmbeddingClient, embedding_service_from_env
+
+
+def word_vector(word, dim=8):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[hash(word) % dim] = 1.0
+    return vector
+
+
+@pytest.fixture
+def fake_service():
+    service = Mock(spec=EmbeddingService)
+    service.model_name = 'fake-model'
+    service.encode.side_effect = lambda texts: np.stack([word_vector(t) for t in texts])
+    service.get_embedding_dim.return_value = 8
+    return service
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to ~100 characters, so stay out of pytest's tmp_path
+    directory = tempfile.mkdtemp(dir='/tmp')
+    yield os.path.join(directory, 'embed.sock')
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def server(fake_service, socket_path):
+    server = EmbeddingSidecarServer(socket_path, fake_service, max_batch_size=8, max_wait_ms=20)
+    server.start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def client(server, socket_path):
+    return SidecarEmbeddingClient(socket_path, 'fake-model', embedding_dim=8, connect_timeout=5)
+
+
+class TestEmbeddingSidecar:
+    def test_encode_round_trip(self, client):
+        embeddings = client.encode(['cat', 'dog'])
+
+        assert embeddings.dtype == np.float32
+        assert embeddings.shape == (2, 8)
+        np.testing.assert_array_equal(embeddings[0], word_vector('cat'))
+        np.testing.assert_array_equal(client.encode_word('dog'), word_vector('dog'))
+
+    def test_bulk_encode_bypasses_batcher(self, client, fake_service):
+        words = [f"w{i}" for i in range(20)]
+        embeddings = client.encode(words)
+
+        assert embeddings.shape == (20, 8)
+        fake_service.encode.assert_called_once_with(words)
+
+    def test_load_model_waits_for_sidecar(self, client):
+        assert not client.is_model_loaded()
+        client.load_model()
+        assert client.is_model_loaded()
+
+    def test_first_encode_waits_for_sidecar(self, fake_service, socket_path):
+        # the sidecar binds its socket only after loading its model
+        client = SidecarEmbeddingClient(socket_path, 'fake-model', embedding_dim=8, connect_timeout=5)
+        servers = []
+
+        def start_late():
+            servers.append(EmbeddingSidecarServer(socket_path, fake_service))
+            servers[0].start()
+
+        timer = threading.Timer(0.3, start_late)
+        timer.start()
+        try:
+            np.testing.assert_array_equal(client.encode_word('cat'), word_vector('cat'))
+            assert client.is_model_loaded()
+        finally:
+            timer.join()
+            for server in servers:
+                server.shutdown()
+
+    def test_socket_is_owner_only(self, server, socket_path):
+        assert os.stat(socket_path).st_mode & 0o777 == 0o600
+
+    def test_unreachable_encode(self, socket_path):
+        client = SidecarEmbeddingClient(socket_path + '.missing', connect_timeout=0)
+        with pytest.raises(RuntimeError):
+            client.encode(['cat'])
+
+    def test_unreachable_sidecar(self, socket_path):
+        client = SidecarEmbeddingClient(socket_path + '.missing', connect_timeout=0)
+        with pytest.raises(RuntimeError):
+            client.load_model()
+
+    def test_encode_error_is_reported(self, client, fake_service):
+        fake_service.encode.side_effect = ValueError("model exploded")
+        with pytest.raises(RuntimeError, match="model exploded"):
+            client.encode(['cat'])
+
+        # the connection is still usable afterwards
+        fake_service.encode.side_effect = lambda texts: np.stack([word_vector(t) for t in texts])
+        assert client.encode(['cat']).shape == (1, 8)
+
+    def test_requests_from_many_clients_are_batched(self, server, client, fake_service):
+        barrier = threading.Barrier(8)
+        results = {}
+
+        def worker(i):
+            barrier.wait()
+            results[i] = client.encode_word(f"word{i}")
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for i in range(8):
+            np.testing.assert_array_equal(results[i], word_vector(f"word{i}"))
+        stats = client.get_batching_stats()
+        assert stats['items'] == 8
+        assert stats['batches'] < 8
+        assert fake_service.encode.call_count == stats['batches']
+
+
+class TestEmbeddingServiceFromEnv:
+    def test_disabled_by_default(self, monkeypatch):
+        monkeypatch.delenv('EMBEDDING_SIDECAR', raising=False)
+        assert embedding_service_from_env() is None
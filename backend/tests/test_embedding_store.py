@@ -0,0 +1,128 @@
+import os
+import json
+import pytest
+import numpy as np
+from app.embedding_store import EmbeddingStore
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+def make_embeddings(count, dim=384, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.random((count, dim)).astype(np.float32)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+@pytest.fixture
+def store(tmp_path):
+    return EmbeddingStore(str(tmp_path), MODEL_NAME, 384, initial_capacity=4)
+
+class TestEmbeddingStore:
+    def test_empty_store(self, store):
+        assert len(store) == 0
+        embeddings, missing = store.lookup(["cat", "dog"])
+        assert embeddings.shape == (2, 384)
+        assert missing == [0, 1]
+
+    def test_append_and_lookup(self, store):
+        vectors = make_embeddings(2)
+        store.append(["cat", "dog"], vectors)
+
+        embeddings, missing = store.lookup(["dog", "bird", "cat"])
+        assert missing == [1]
+        np.testing.assert_array_equal(embeddings[0], vectors[1])
+        np.testing.assert_array_equal(embeddings[2], vectors[0])
+
+    def test_lookup_is_normalized(self, store):
+        store.append([" Cat "], make_embeddings(1))
+        assert "cat" in store
+        _, missing = store.lookup(["CAT"])
+        assert missing == []
+
+    def test_append_skips_existing_words(self, store):
+        first = make_embeddings(1, seed=1)
+        store.append(["cat"], first)
+        store.append(["cat"], make_embeddings(1, seed=2))
+
+        assert len(store) == 1
+        embeddings, _ = store.lookup(["cat"])
+        np.testing.assert_array_equal(embeddings[0], first[0])
+
+    def test_store_grows_past_initial_capacity(self, store):
+        words = [f"word{i}" for i in range(20)]
+        vectors = make_embeddings(20)
+        store.append(words, vectors)
+
+        embeddings, missing = store.lookup(words)
+        assert missing == []
+        np.testing.assert_array_equal(embeddings, vectors)
+
+    def test_store_persists_across_instances(self, tmp_path, store):
+        vectors = make_embeddings(3)
+        store.append(["cat", "dog", "bird"], vectors)
+
+        reopened = EmbeddingStore(str(tmp_path), MODEL_NAME, 384)
+        assert len(reopened) == 3
+        embeddings, missing = reopened.lookup(["bird"])
+        assert missing == []
+        np.testing.assert_array_equal(embeddings[0], vectors[2])
+
+    def test_store_sees_appends_from_other_instances(self, tmp_path, store):
+        other = EmbeddingStore(str(tmp_path), MODEL_NAME, 384)
+        vectors = make_embeddings(1)
+        other.append(["cat"], vectors)
+
+        embeddings, missing = store.lookup(["cat"])
+        assert missing == []
+        np.testing.assert_array_equal(embeddings[0], vectors[0])
+
+    def test_stores_are_separated_by_model(self, tmp_path, store):
+        store.append(["cat"], make_embeddings(1))
+        other_model = EmbeddingStore(str(tmp_path), "other-model", 384)
+        assert len(other_model) == 0
+
+    def test_words_are_appended_to_a_log(self, tmp_path, store):
+        store.append(["cat"], make_embeddings(1))
+        log_path = os.path.join(store.path, EmbeddingStore.WORDS_FILE)
+        size = os.path.getsize(log_path)
+        store.append(["dog"], make_embeddings(1, seed=1))
+
+        with open(log_path) as f:
+            assert f.read().splitlines() == ['"cat"', '"dog"']
+        assert os.path.getsize(log_path) > size
+        with open(os.path.join(store.path, EmbeddingStore.VOCAB_FILE)) as f:
+            assert 'words' not in json.load(f)
+
+    def test_sees_appends_within_one_mtime_tick(self, tmp_path, store):
+        other = EmbeddingStore(str(tmp_path), MODEL_NAME, 384)
+        log_path = os.path.join(store.path, EmbeddingStore.WORDS_FILE)
+        other.append(["cat"], make_embeddings(1))
+        mtime = os.stat(log_path).st_mtime_ns
+        assert store.lookup(["cat"])[1] == []
+
+        vectors = make_embeddings(1, seed=3)
+        other.append(["dog"], vectors)
+        os.utime(log_path, ns=(mtime, mtime))
+        embeddings, missing = store.lookup(["dog"])
+        assert missing == []
+        np.testing.assert_array_equal(embeddings[0], vectors[0])
+
+    def test_partial_log_line_is_ignored(self, tmp_path, store):
+        store.append(["cat"], make_embeddings(1))
+        with open(os.path.join(store.path, EmbeddingStore.WORDS_FILE), 'a') as f:
+            f.write('"do')
+
+        other = EmbeddingStore(str(tmp_path), MODEL_NAME, 384)
+        assert len(other) == 1
+        other.append(["bird"], make_embeddings(1))
+        assert len(EmbeddingStore(str(tmp_path), MODEL_NAME, 384)) == 2
+
+    def test_migrates_vocab_word_list(self, tmp_path, store):
+        vectors = make_embeddings(2)
+        store.append(["cat", "dog"], vectors)
+        os.remove(os.path.join(store.path, EmbeddingStore.WORDS_FILE))
+        with open(os.path.join(store.path, EmbeddingStore.VOCAB_FILE), 'w') as f:
+            json.dump({'model_name': MODEL_NAME, 'embedding_dim': 384, 'words': ["cat", "dog"]}, f)
+
+        reopened = EmbeddingStore(str(tmp_path), MODEL_NAME, 384)
+        embeddings, missing = reopened.lookup(["dog", "cat"])
+        assert missing == []
+        np.testing.assert_array_equal(embeddings, vectors[::-1])
@@ -0,0 +1,88 @@
+import threading
+import pytest
+import numpy as np
+from app.encode_batcher import EncodeBatcher
+
+class RecordingEncoder:
+    # fake batch encoder that records the batches it receives
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        return np.array([[float(len(t)), float(i)] for i, t in enumerate(texts)], dtype=np.float32)
+
+@pytest.fixture
+def encoder():
+    return RecordingEncoder()
+
+class TestEncodeBatcher:
+    def test_single_request(self, encoder):
+        batcher = EncodeBatcher(encoder, max_batch_size=8, max_wait_ms=1)
+        row = batcher.encode("cat")
+
+        assert row[0] == 3.0
+        assert encoder.batches == [["cat"]]
+
+    def test_concurrent_requests_are_coalesced(self, encoder):
+        batcher = EncodeBatcher(encoder, max_batch_size=8, max_wait_ms=200)
+        words = [f"word{i}" for i in range(8)]
+        results = {}
+        barrier = threading.Barrier(len(words))
+
+        def worker(word):
+            barrier.wait()
+            results[word] = batcher.encode(word)
+
+        threads = [threading.Thread(target=worker, args=(w,)) for w in words]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(encoder.batches) < len(words)
+        for word in words:
+            assert results[word][0] == float(len(word))
+
+    def test_batch_size_is_capped(self, encoder):
+        batcher = EncodeBatcher(encoder, max_batch_size=2, max_wait_ms=50)
+        futures = [batcher.submit(f"w{i}") for i in range(5)]
+        for future in futures:
+            future.result()
+
+        assert all(len(batch) <= 2 for batch in encoder.batches)
+
+    def test_duplicate_texts_share_a_row(self, encoder):
+        batcher = EncodeBatcher(encoder, max_batch_size=4, max_wait_ms=50)
+        futures = [batcher.submit("cat") for _ in range(3)]
+        rows = [f.result() for f in futures]
+
+        assert all(b == ["cat"] for b in encoder.batches)
+        for row in rows:
+            np.testing.assert_array_equal(row, rows[0])
+
+    def test_errors_propagate_to_callers(self):
+        def failing(texts):
+            raise RuntimeError("model exploded")
+
+        batcher = EncodeBatcher(failing, max_batch_size=4, max_wait_ms=1)
+        with pytest.raises(RuntimeError):
+            batcher.encode("cat")
+
+    def test_stats(self, encoder):
+        batcher = EncodeBatcher(encoder, max_batch_size=4, max_wait_ms=1)
+        batcher.encode("cat")
+        batcher.encode("dog")
+
+        stats = batcher.get_stats()
+        assert stats['batches'] == 2
+        assert stats['items'] == 2
+        assert stats['avgBatchSize'] == 1.0
+        assert stats['avgFillRatio'] == 0.25
+        assert stats['batchSizeHistogram'] == {1: 2}
+
+    def test_invalid_batch_size(self, encoder):
+        with pytest.raises(ValueError):
+            EncodeBatcher(encoder, max_batch_size=0)
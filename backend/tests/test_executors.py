@@ -0,0 +1,87 @@
+import threading
+import pytest
+from app.executors import BoundedExecutor, ExecutorBusy, executor_from_env
+
+
+@pytest.fixture
+def blocked_executor():
+    # one worker, one queue slot, both taken by tasks waiting on release
+    executor = BoundedExecutor('test', max_workers=1, max_queue=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        return 'done'
+
+    futures = [executor.submit(blocking), executor.submit(blocking)]
+    assert started.wait(5)
+    yield executor, release, futures
+    release.set()
+    executor.shutdown()
+
+
+class TestBoundedExecutor:
+    def test_run_returns_result(self):
+        executor = BoundedExecutor('test', max_workers=2)
+        assert executor.run(lambda a, b: a + b, 2, 3) == 5
+        stats = executor.get_stats()
+        assert stats['submitted'] == 1
+        assert stats['completed'] == 1
+        executor.shutdown()
+
+    def test_rejects_when_full(self, blocked_executor):
+        executor, _, _ = blocked_executor
+        with pytest.raises(ExecutorBusy):
+            executor.submit(lambda: None)
+
+        stats = executor.get_stats()
+        assert stats['running'] == 1
+        assert stats['queued'] == 1
+        assert stats['rejected'] == 1
+
+    def test_slots_free_up_after_completion(self, blocked_executor):
+        executor, release, futures = blocked_executor
+        release.set()
+        assert [future.result(5) for future in futures] == ['done', 'done']
+
+        assert executor.run(lambda: 'next') == 'next'
+        stats = executor.get_stats()
+        assert stats['running'] == 0
+        assert stats['queued'] == 0
+
+    def test_exceptions_propagate_and_release_the_slot(self):
+        executor = BoundedExecutor('test', max_workers=1)
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            executor.run(fail)
+        assert executor.run(lambda: 1) == 1
+        executor.shutdown()
+
+    def test_pool_is_recreated_in_a_forked_process(self):
+        executor = BoundedExecutor('test', max_workers=1)
+        executor.run(lambda: None)
+        parent_pool = executor._pool
+        # pretend the pool was started by a parent process
+        executor._pid = -1
+        assert executor.run(lambda: 'child') == 'child'
+        assert executor._pool is not parent_pool
+        parent_pool.shutdown()
+        executor.shutdown()
+
+    def test_invalid_sizes(self):
+        with pytest.raises(ValueError):
+            BoundedExecutor('test', max_workers=0)
+        with pytest.raises(ValueError):
+            BoundedExecutor('test', max_workers=1, max_queue=-1)
+
+    def test_executor_from_env(self, monkeypatch):
+        monkeypatch.setenv('TEST_WORKERS', '3')
+        monkeypatch.setenv('EXECUTOR_QUEUE_SIZE', '7')
+        executor = executor_from_env('test', 'TEST_WORKERS', 1)
+        assert executor.max_workers == 3
+        assert executor.max_queue == 7
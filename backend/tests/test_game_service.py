@@ -239,4 +239,96 @@ class TestGameService:
     
     def test_preload_words(self, game_service):
         words_in_graph = game_service.semantic_graph.get_all_words()        
-        assert len(words_in_graph) > 0
\ No newline at end of file
+        assert len(words_in_graph) > 0
+
+    def test_distance_field_is_cached(self, game_service):
+        field1 = game_service.get_distance_field("dog")
+        field2 = game_service.get_distance_field("dog")
+
+        assert field1 is field2
+        assert field1["dog"] == 0
+        assert all(0 <= steps <= 6 for steps in field1.values())
+
+    def test_path_dag_is_cached(self, game_service):
+        dag = game_service.get_path_dag("cat", "dog")
+        assert game_service.get_path_dag("Cat", "dog") is dag
+        path = game_service.find_optimal_path("cat", "dog")
+        if path:
+            assert dag.contains(path)
+            assert dag.count() >= 1
+
+    def test_alternative_paths_exclude_given_paths(self, game_service):
+        path = game_service.find_optimal_path("cat", "dog")
+        count, alternatives = game_service.get_alternative_paths("cat", "dog", [path], limit=2)
+        if path is None:
+            assert (count, alternatives) == (0, [])
+        else:
+            assert len(alternatives) == min(2, count - 1)
+            assert path not in alternatives
+
+    def test_alternative_paths_unknown_word(self, game_service):
+        assert game_service.get_alternative_paths("cat", "notaword123", []) == (0, [])
+
+    def test_has_distance_field(self, game_service):
+        assert not game_service.has_distance_field("dog")
+        game_service.get_distance_field("dog")
+        assert game_service.has_distance_field("Dog")
+        assert not game_service.has_distance_field("dog", max_steps=3)
+
+    def test_distance_field_matches_optimal_path(self, game_service):
+        path = game_service.find_optimal_path("cat", "dog", max_steps=6)
+        field = game_service.get_distance_field("dog")
+
+        if path:
+            assert field["cat"] == len(path) - 1
+        else:
+            assert "cat" not in field
+
+    def test_get_hint_moves_one_step_closer(self, game_service):
+        hint_word, steps_remaining = game_service.get_hint("cat", "dog", {"cat"})
+        field = game_service.get_distance_field("dog")
+
+        if steps_remaining is not None:
+            assert steps_remaining == field["cat"]
+            if hint_word:
+                assert hint_word in game_service.semantic_graph.get_neighbors("cat")
+                assert field[hint_word] == steps_remaining - 1
+
+    def test_get_hint_skips_used_words(self, game_service):
+        hint_word, steps_remaining = game_service.get_hint("cat", "dog", {"cat"})
+
+        if hint_word:
+            second_hint, _ = game_service.get_hint("cat", "dog", {"cat", hint_word})
+            assert second_hint != hint_word
+
+    def test_get_hint_invalid_word(self, game_service):
+        assert game_service.get_hint("nonexistentword123", "dog", set()) == (None, None)
+
+    def test_puzzle_pool_serves_verified_puzzles(self, game_service):
+        game_service.puzzle_pool.fill(max_rounds=20)
+        puzzle = game_service.get_puzzle()
+
+        if puzzle:
+            assert 2 <= puzzle.steps <= 6
+            assert puzzle.optimal_path[0] == puzzle.start
+            assert puzzle.optimal_path[-1] == puzzle.target
+            assert game_service.validate_word(puzzle.start)
+            assert game_service.validate_word(puzzle.target)
+            path = game_service.find_optimal_path(puzzle.start, puzzle.target)
+            assert len(path) - 1 == puzzle.steps
+
+    def test_frozen_vocabulary_does_not_grow_graph(self):
+        service = GameService(similarity_threshold=0.49, puzzle_pool_size=0, max_preload_words=50,
+                              freeze_vocabulary=True)
+        graph = service.semantic_graph
+        size = len(graph.get_all_words())
+        outside = [w for w in service.word_database.get_all_words() if not graph.word_exists(w)][:3]
+
+        path = service.find_optimal_path(outside[0], outside[1])
+        if path:
+            assert path[0] == outside[0] and path[-1] == outside[1]
+        service.get_hint(outside[0], outside[2], set())
+        service.validate_path(outside)
+
+        assert len(graph.get_all_words()) == size
+        assert graph.get_query_cache_stats()['entries'] == 3
@@ -0,0 +1,47 @@
+import numpy as np
+from app.graph_builder import threshold_join, collect_edges
+
+def random_embeddings(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((n, dim)).astype(np.float32)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+def brute_force_edges(embeddings, threshold, start=0):
+    similarities = embeddings @ embeddings.T
+    return {(i, j) for i in range(start, len(embeddings)) for j in range(i) if similarities[i, j] >= threshold}
+
+def edge_set(blocks):
+    sources, targets = collect_edges(blocks)
+    return set(zip(sources.tolist(), targets.tolist()))
+
+class TestThresholdJoin:
+    def test_matches_brute_force(self):
+        embeddings = random_embeddings(300)
+        expected = brute_force_edges(embeddings, 0.4)
+
+        for block_size in (7, 64, 1000):
+            assert edge_set(threshold_join(embeddings, 0.4, block_size=block_size)) == expected
+
+    def test_joins_only_new_rows(self):
+        embeddings = random_embeddings(200)
+        edges = edge_set(threshold_join(embeddings, 0.4, start=150, block_size=32))
+        assert edges == brute_force_edges(embeddings, 0.4, start=150)
+
+    def test_edges_are_int32_without_self_loops(self):
+        embeddings = random_embeddings(100)
+        sources, targets = collect_edges(threshold_join(embeddings, -1.0, block_size=16))
+
+        assert sources.dtype == np.int32
+        assert len(sources) == 100 * 99 // 2
+        assert (targets < sources).all()
+
+    def test_process_pool_matches_serial(self):
+        embeddings = random_embeddings(400)
+        serial = edge_set(threshold_join(embeddings, 0.4, block_size=50))
+        parallel = edge_set(threshold_join(embeddings, 0.4, block_size=50, workers=2))
+        assert parallel == serial
+
+    def test_no_new_rows(self):
+        embeddings = random_embeddings(10)
+        sources, targets = collect_edges(threshold_join(embeddings, 0.4, start=10))
+        assert len(sources) == 0 and len(targets) == 0
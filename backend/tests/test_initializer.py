@@ -0,0 +1,86 @@
+import threading
+import pytest
+from app.initializer import BackgroundInitializer, ServiceNotReady
+
+
+class TestBackgroundInitializer:
+    def test_synchronous_init_on_first_get(self):
+        calls = []
+        initializer = BackgroundInitializer(lambda: calls.append(1) or 'service')
+
+        assert initializer.status()['status'] == BackgroundInitializer.NOT_STARTED
+        assert initializer.get() == 'service'
+        assert initializer.get() == 'service'
+        assert len(calls) == 1
+        assert initializer.status()['status'] == BackgroundInitializer.READY
+
+    def test_background_init(self):
+        release = threading.Event()
+
+        def factory():
+            release.wait(5)
+            return 'service'
+
+        initializer = BackgroundInitializer(factory)
+        initializer.start()
+
+        assert initializer.status()['status'] == BackgroundInitializer.INITIALIZING
+        assert not initializer.is_ready()
+        with pytest.raises(ServiceNotReady):
+            initializer.get(timeout=0)
+
+        release.set()
+        assert initializer.get(timeout=5) == 'service'
+        assert initializer.is_ready()
+
+    def test_start_is_idempotent(self):
+        release = threading.Event()
+        calls = []
+
+        def factory():
+            calls.append(1)
+            release.wait(5)
+            return 'service'
+
+        initializer = BackgroundInitializer(factory)
+        initializer.start()
+        initializer.start()
+        release.set()
+        initializer.get(timeout=5)
+        initializer.start()
+
+        assert len(calls) == 1
+
+    def test_failed_init(self):
+        def factory():
+            raise ValueError("model missing")
+
+        initializer = BackgroundInitializer(factory)
+        initializer.start()
+        with pytest.raises(ServiceNotReady):
+            initializer.get(timeout=5)
+
+        status = initializer.status()
+        assert status['status'] == BackgroundInitializer.FAILED
+        assert 'model missing' in status['error']
+
+    def test_retry_after_failure(self):
+        attempts = []
+
+        def factory():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ValueError("transient")
+            return 'service'
+
+        initializer = BackgroundInitializer(factory)
+        initializer.start()
+        initializer._thread.join(5)
+        # the failed attempt has finished: get() reports it instead of building in the caller
+        with pytest.raises(ServiceNotReady, match='transient'):
+            initializer.get(timeout=5)
+        assert len(attempts) == 1
+
+        initializer.start()
+        assert initializer.get(timeout=5) == 'service'
+        assert len(attempts) == 2
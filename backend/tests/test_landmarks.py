@@ -0,0 +1,189 @@
+import pytest
+import numpy as np
+from app.adjacency import CSRAdjacency
+from app.landmarks import LandmarkIndex, UNREACHABLE, bfs_distances
+
+def random_adjacency(num_nodes, num_edges, seed=0, components=1):
+    # random graph split into components id ranges, plus one isolated node at the end
+    rng = np.random.default_rng(seed)
+    size = (num_nodes - 1) // components
+    sources = []
+    targets = []
+    for c in range(components):
+        low = c * size
+        sources.append(rng.integers(low, low + size, num_edges // components))
+        targets.append(rng.integers(low, low + size, num_edges // components))
+    sources = np.concatenate(sources)
+    targets = np.concatenate(targets)
+    keep = sources != targets
+    adjacency = CSRAdjacency()
+    adjacency.ensure_nodes(num_nodes)
+    adjacency.add_edges(sources[keep], targets[keep], bulk=True)
+    return adjacency
+
+def all_distances(adjacency, num_nodes):
+    return np.stack([bfs_distances(adjacency, num_nodes, i) for i in range(num_nodes)]).astype(np.int64)
+
+class TestLandmarkIndex:
+    def test_bounds_bracket_true_distances(self):
+        adjacency = random_adjacency(121, 240)
+        index = LandmarkIndex.build(adjacency, 121, count=8)
+        truth = all_distances(adjacency, 121)
+
+        assert len(index) == 8
+        assert index.distances.dtype == np.uint8
+        for target in range(0, 120, 7):
+            bounds = index.lower_bounds(np.arange(120), target)
+            reachable = truth[:120, target] != UNREACHABLE
+            assert np.all(bounds[reachable] <= truth[:120, target][reachable])
+            for source in range(0, 120, 11):
+                upper = index.upper_bound(source, target)
+                if truth[source, target] != UNREACHABLE:
+                    assert upper is not None and upper >= truth[source, target]
+
+    def test_max_lower_bound(self):
+        adjacency = random_adjacency(121, 240, components=2)
+        index = LandmarkIndex.build(adjacency, 121, count=6)
+        truth = all_distances(adjacency, 121)
+
+        for target in range(0, 120, 5):
+            connected = np.flatnonzero(truth[target] != UNREACHABLE)
+            assert index.lower_bounds(connected, target).max() <= index.max_lower_bound(target)
+            assert index.max_lower_bound(target) <= truth[target][connected].max()
+
+    def test_landmark_distances_are_exact(self):
+        adjacency = random_adjacency(121, 240)
+        index = LandmarkIndex.build(adjacency, 121, count=4)
+        truth = all_distances(adjacency, 121)
+
+        for landmark, row in zip(index.landmark_ids.tolist(), index.distances):
+            assert np.array_equal(row, truth[landmark])
+            # the bound from a landmark to any node is the exact distance
+            assert np.array_equal(index.lower_bounds(np.arange(121), landmark)[truth[landmark] != UNREACHABLE],
+                                  truth[landmark][truth[landmark] != UNREACHABLE])
+
+    def test_farthest_point_selection(self):
+        adjacency = random_adjacency(121, 240)
+        index = LandmarkIndex.build(adjacency, 121, count=6)
+        degrees = adjacency.degrees()[:121]
+
+        assert index.landmark_ids[0] == np.argmax(degrees)
+        assert len(set(index.landmark_ids.tolist())) == 6
+        # each landmark is the node farthest from those chosen before it
+        for k in range(1, 6):
+            nearest = index.distances[:k].astype(np.int64).min(axis=0)
+            nearest[degrees == 0] = -1
+            assert nearest[index.landmark_ids[k]] == nearest.max()
+
+    def test_every_component_gets_a_landmark(self):
+        adjacency = random_adjacency(121, 240, components=3)
+        index = LandmarkIndex.build(adjacency, 121, count=3)
+
+        assert sorted(i // 40 for i in index.landmark_ids.tolist()) == [0, 1, 2]
+        # isolated node is never a landmark
+        assert 120 not in index.landmark_ids.tolist()
+
+    def test_disconnected_pairs(self):
+        adjacency = random_adjacency(121, 240, components=2)
+        index = LandmarkIndex.build(adjacency, 121, count=4)
+
+        assert index.lower_bound(0, 70) == UNREACHABLE
+        assert index.lower_bound(0, 30) < UNREACHABLE
+        # the isolated node is reached by no landmark, so nothing is proven about it
+        assert index.upper_bound(0, 120) is None
+
+    def test_stops_when_every_node_is_a_landmark(self):
+        adjacency = CSRAdjacency()
+        adjacency.ensure_nodes(3)
+        adjacency.add_edges(np.array([0, 1]), np.array([1, 2]), bulk=True)
+        index = LandmarkIndex.build(adjacency, 3, count=10)
+
+        assert sorted(index.landmark_ids.tolist()) == [0, 1, 2]
+
+    def test_empty_graph(self):
+        adjacency = CSRAdjacency()
+        adjacency.ensure_nodes(4)
+        index = LandmarkIndex.build(adjacency, 4, count=8)
+
+        assert len(index) == 0
+        assert index.lower_bounds([0, 1], 2).tolist() == [0, 0]
+        assert index.upper_bound(0, 1) is None
+        assert index.get_stats() == {'landmarks': 0, 'words': 4, 'bytes': 0}
+
+    @pytest.mark.parametrize('seed', [0, 1, 2])
+    def test_extended_matches_rebuild(self, seed):
+        # grow a graph in two batches: the incremental tables must equal a fresh BFS per landmark
+        rng = np.random.default_rng(seed)
+        adjacency = random_adjacency(121, 200, seed=seed, components=2)
+        index = LandmarkIndex.build(adjacency, 121, count=6)
+
+        new_ids = np.arange(121, 131)
+        adjacency.ensure_nodes(131)
+        sources = rng.integers(121, 131, 30)
+        targets = rng.integers(0, 131, 30)
+        keep = sources != targets
+        adjacency.add_edges(sources[keep], targets[keep])
+        extended = index.extended(adjacency, 131, new_ids)
+
+        expected = np.stack([bfs_distances(adjacency, 131, landmark) for landmark in index.landmark_ids.tolist()])
+        assert np.array_equal(extended.landmark_ids, index.landmark_ids)
+        assert np.array_equal(extended.distances, expected)
+        # the original index is unchanged
+        assert index.num_nodes == 121
+
+    def test_extensions_share_storage_copy_on_write(self):
+        # a chain of commits: each extension shares the base and tail, and earlier indexes
+        # keep answering for their own graph
+        rng = np.random.default_rng(3)
+        adjacency = random_adjacency(121, 200, components=2)
+        index = LandmarkIndex.build(adjacency, 121, count=6)
+        indexes = [index]
+        snapshots = [index.distances.copy()]
+        for size in range(126, 151, 5):
+            new_ids = np.arange(size - 5, size)
+            adjacency.ensure_nodes(size)
+            sources = np.repeat(new_ids, 3)
+            targets = rng.integers(0, size, len(sources))
+            keep = sources != targets
+            adjacency.add_edges(sources[keep], targets[keep])
+            index = index.extended(adjacency, size, new_ids)
+            indexes.append(index)
+            snapshots.append(index.distances.copy())
+
+        expected = np.stack([bfs_distances(adjacency, 146, landmark) for landmark in index.landmark_ids.tolist()])
+        assert np.array_equal(index.distances, expected)
+        assert all(i._base is indexes[0]._base for i in indexes)
+        assert all(i._tail is indexes[1]._tail for i in indexes[1:])
+        for old, distances in zip(indexes, snapshots):
+            assert np.array_equal(old.distances, distances)
+        # eccentricities may over-estimate but never under-estimate
+        exact = np.where(expected == UNREACHABLE, 0, expected).max(axis=1)
+        assert np.all(index.eccentricities >= exact)
+
+    def test_extending_an_older_index_copies_the_tail(self):
+        adjacency = random_adjacency(121, 200)
+        index = LandmarkIndex.build(adjacency, 121, count=4)
+        adjacency.ensure_nodes(122)
+        adjacency.add_edges(np.array([121]), np.array([0]))
+        first = index.extended(adjacency, 122, [121])
+        second = index.extended(adjacency, 122, [121])
+        latest = first.extended(adjacency, 122, [])
+
+        assert first._tail is latest._tail
+        assert second._tail is not first._tail
+        assert np.array_equal(first.distances, second.distances)
+
+    def test_overlay_is_merged_into_the_base(self):
+        # a word joining the two components lowers many existing columns
+        adjacency = random_adjacency(121, 240, components=2)
+        index = LandmarkIndex.build(adjacency, 121, count=4)
+        index.merge_threshold = 0
+        adjacency.ensure_nodes(122)
+        adjacency.add_edges(np.array([121, 121]), np.array([0, 70]))
+        extended = index.extended(adjacency, 122, [121])
+
+        expected = np.stack([bfs_distances(adjacency, 122, landmark) for landmark in index.landmark_ids.tolist()])
+        assert extended.overlay_size == 0
+        assert extended.base_size == 122
+        assert np.array_equal(extended.distances, expected)
+        assert np.array_equal(extended.eccentricities, np.where(expected == UNREACHABLE, 0, expected).max(axis=1))
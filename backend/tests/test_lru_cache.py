@@ -0,0 +1,61 @@
+import pytest
+from app.lru_cache import LRUCache
+
+class TestLRUCache:
+    def test_get_missing_key(self):
+        cache = LRUCache(2)
+        assert cache.get("a") is LRUCache.MISSING
+        assert cache.get("a", 0) == 0
+        assert cache.misses == 2
+
+    def test_none_is_a_valid_value(self):
+        cache = LRUCache(2)
+        cache.put("a", None)
+        assert cache.get("a") is None
+        assert cache.hits == 1
+
+    def test_least_recently_used_is_evicted(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.evictions == 1
+
+    def test_stats(self):
+        cache = LRUCache(4)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("b")
+
+        stats = cache.get_stats()
+        assert stats['entries'] == 1
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hitRate'] == 0.5
+
+    def test_peek_leaves_order_and_counters_alone(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.peek("a") == 1
+        assert cache.peek("c") is LRUCache.MISSING
+        cache.put("c", 3)
+
+        assert "a" not in cache
+        assert cache.hits == 0
+        assert cache.misses == 0
+
+    def test_clear(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            LRUCache(0)
@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+from app.embedding_matrix import EmbeddingMatrix
+from app.memory_stats import child_pids, process_memory
+
+pytestmark = pytest.mark.skipif(not os.path.exists('/proc/self/smaps_rollup'),
+                                reason="needs /proc/<pid>/smaps_rollup (Linux)")
+
+
+class TestProcessMemory:
+    def test_process_memory(self):
+        memory = process_memory()
+
+        assert memory['pid'] == os.getpid()
+        assert memory['rssBytes'] > 0
+        assert 0 < memory['ussBytes'] <= memory['rssBytes']
+        assert memory['pssBytes'] <= memory['rssBytes']
+
+    def test_child_pids(self):
+        child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(5)'])
+        try:
+            assert child.pid in child_pids(os.getpid())
+        finally:
+            child.kill()
+            child.wait()
+
+    def test_missing_process(self):
+        assert process_memory(2 ** 22 + 1) is None
+
+
+class TestForkSharing:
+    def test_frozen_matrix_stays_shared_after_fork(self):
+        # 20000 x 384 float32 is ~30 MB; a worker that reads it and adds words must not copy it
+        rng = np.random.default_rng(0)
+        vectors = rng.random((20000, 384), dtype=np.float32)
+        matrix = EmbeddingMatrix(384)
+        matrix.add_many([f"w{i}" for i in range(len(vectors))], vectors)
+        matrix.freeze()
+        del vectors
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            before = process_memory()['ussBytes']
+            query = matrix.vector(0).copy()
+            matrix.add("new", query)
+            matrix.similarities(query)
+            growth = process_memory()['ussBytes'] - before
+            os.write(write_fd, str(growth).encode())
+            os._exit(0)
+
+        os.close(write_fd)
+        with os.fdopen(read_fd) as pipe:
+            growth = int(pipe.read())
+        os.waitpid(pid, 0)
+
+        assert growth < matrix.frozen_nbytes // 4
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from app.embedding_service import EmbeddingService
+from app.onnx_backend import compare_backends, mean_pool
+
+
+def unit_rows(count, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = rng.standard_normal((count, dim)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+class TestMeanPool:
+    def test_ignores_padding_and_normalizes(self):
+        hidden = np.array([[[1.0, 0.0], [3.0, 0.0], [100.0, 100.0]]], dtype=np.float32)
+        mask = np.array([[1, 1, 0]])
+
+        pooled = mean_pool(hidden, mask)
+
+        assert pooled.dtype == np.float32
+        np.testing.assert_allclose(pooled, [[1.0, 0.0]], atol=1e-6)
+
+
+class TestCompareBackends:
+    def test_identical_backends(self):
+        words = [f"w{i}" for i in range(50)]
+        rows = unit_rows(50)
+        encode = lambda texts: rows
+
+        report = compare_backends(encode, encode, words, similarity_threshold=0.2, block_size=16)
+
+        assert report['maxDrift'] == pytest.approx(0.0, abs=1e-6)
+        assert report['edgesAdded'] == 0
+        assert report['edgesRemoved'] == 0
+        assert report['referenceEdges'] == report['candidateEdges']
+
+    def test_edge_changes_match_brute_force(self):
+        words = [f"w{i}" for i in range(40)]
+        reference = unit_rows(40, seed=1)
+        noisy = reference + 0.05 * unit_rows(40, seed=2)
+        candidate = noisy / np.linalg.norm(noisy, axis=1, keepdims=True)
+
+        report = compare_backends(lambda t: reference, lambda t: candidate, words,
+                                  similarity_threshold=0.3, block_size=7)
+
+        upper = np.triu(np.ones((40, 40), dtype=bool), k=1)
+        expected_reference = (reference @ reference.T >= 0.3) & upper
+        expected_candidate = (candidate @ candidate.T >= 0.3) & upper
+        assert report['referenceEdges'] == int(expected_reference.sum())
+        assert report['edgesAdded'] == int((expected_candidate & ~expected_reference).sum())
+        assert report['edgesRemoved'] == int((expected_reference & ~expected_candidate).sum())
+        assert 0 < report['meanDrift'] < 0.01
+
+
+class TestBackendSelection:
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            EmbeddingService(backend='tensorflow')
+
+    def test_onnx_backend_uses_its_own_store(self, tmp_path):
+        torch_service = EmbeddingService(store_dir=str(tmp_path), backend='torch')
+        onnx_service = EmbeddingService(store_dir=str(tmp_path), backend='onnx-int8')
+
+        assert torch_service.store.path != onnx_service.store.path
+        assert not onnx_service.is_model_loaded()
+
+
+class TestOnnxExport:
+    def test_export_matches_torch(self, tmp_path):
+        pytest.importorskip('torch')
+        pytest.importorskip('onnxruntime')
+        from app.onnx_backend import OnnxEmbeddingBackend, export_onnx
+        from app.embedding_service import DEFAULT_MODEL_NAME
+
+        export_onnx(DEFAULT_MODEL_NAME, str(tmp_path))
+        backend = OnnxEmbeddingBackend(str(tmp_path))
+        torch_service = EmbeddingService(batch_max_wait_ms=0, backend='torch')
+
+        words = ['cat', 'dog', 'ocean', 'mountain', 'happiness']
+        report = compare_backends(torch_service.encode, backend.encode, words)
+        assert report['maxDrift'] < 1e-4
+        assert report['edgesAdded'] == 0
+        assert report['edgesRemoved'] == 0
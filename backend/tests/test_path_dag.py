@@ -0,0 +1,111 @@
+import random
+from math import comb
+import pytest
+import numpy as np
+from app.adjacency import CSRAdjacency
+from app.embedding_matrix import EmbeddingMatrix
+from app.semantic_graph import GraphSnapshot
+from app.path_dag import PathDAG, build_layers
+
+GRID = 4
+
+@pytest.fixture
+def grid_snapshot():
+    # GRID x GRID lattice, words "r{row}c{col}", edges between horizontal / vertical neighbors
+    words = [f"r{r}c{c}" for r in range(GRID) for c in range(GRID)]
+    sources = []
+    targets = []
+    for r in range(GRID):
+        for c in range(GRID):
+            if c + 1 < GRID:
+                sources.append(r * GRID + c)
+                targets.append(r * GRID + c + 1)
+            if r + 1 < GRID:
+                sources.append(r * GRID + c)
+                targets.append((r + 1) * GRID + c)
+    adjacency = CSRAdjacency()
+    adjacency.ensure_nodes(len(words))
+    adjacency.add_edges(np.array(sources), np.array(targets), bulk=True)
+    embeddings = EmbeddingMatrix.from_array(words, np.zeros((len(words), 4), dtype=np.float32))
+    return GraphSnapshot(embeddings, len(words), adjacency.snapshot(), 0)
+
+def grid_dag(snapshot, start, target, max_steps=10, **kwargs):
+    layers = build_layers(snapshot.adjacency, snapshot.size, [snapshot.get_id(start)],
+                          [snapshot.get_id(target)], max_steps)
+    return PathDAG(snapshot, layers, **kwargs) if layers is not None else None
+
+class TestPathDAG:
+    def test_counts_every_shortest_path(self, grid_snapshot):
+        dag = grid_dag(grid_snapshot, "r0c0", "r3c3")
+
+        assert dag.length == 6
+        assert dag.count() == comb(6, 3)
+        paths = list(dag.iter_paths())
+        assert len(paths) == len(set(map(tuple, paths))) == comb(6, 3)
+        assert all(path[0] == "r0c0" and path[-1] == "r3c3" and len(path) == 7 for path in paths)
+
+    def test_partial_grid(self, grid_snapshot):
+        dag = grid_dag(grid_snapshot, "r1c0", "r3c2")
+        assert dag.count() == comb(4, 2)
+        assert len(dag.layers) == 5
+
+    def test_iter_paths_limit(self, grid_snapshot):
+        dag = grid_dag(grid_snapshot, "r0c0", "r3c3")
+        assert len(list(dag.iter_paths(limit=5))) == 5
+        assert list(dag.iter_paths(limit=0)) == []
+
+    def test_contains(self, grid_snapshot):
+        dag = grid_dag(grid_snapshot, "r0c0", "r2c2")
+
+        assert dag.contains(["r0c0", "r0c1", "r0c2", "r1c2", "r2c2"])
+        assert dag.contains(["R0C0", "r1c0", "r1c1", "r2c1", "r2c2"])
+        # a shortest-length walk through a non-adjacent jump
+        assert not dag.contains(["r0c0", "r0c1", "r1c0", "r2c1", "r2c2"])
+        assert not dag.contains(["r0c0", "r0c1", "r1c1", "r2c1", "r2c2", "r2c2"])
+        assert not dag.contains(["r0c0", "r0c1", "r0c2", "r0c3", "r1c3", "r2c3", "r2c2"])
+        assert not dag.contains(["r0c0", "unknown", "r0c2", "r1c2", "r2c2"])
+
+    def test_next_words(self, grid_snapshot):
+        dag = grid_dag(grid_snapshot, "r0c0", "r1c1")
+
+        assert sorted(dag.next_words("r0c0")) == ["r0c1", "r1c0"]
+        assert dag.next_words("r0c1") == ["r1c1"]
+        assert dag.next_words("r1c1") == []
+        assert dag.next_words("r3c3") == []
+
+    def test_sample_is_uniform(self, grid_snapshot):
+        dag = grid_dag(grid_snapshot, "r0c0", "r2c2")
+        rng = random.Random(0)
+        counts = {}
+        for _ in range(3000):
+            path = tuple(dag.sample(rng))
+            counts[path] = counts.get(path, 0) + 1
+
+        assert len(counts) == dag.count() == 6
+        assert all(dag.contains(path) for path in counts)
+        assert all(400 < count < 600 for count in counts.values())
+
+    def test_too_far(self, grid_snapshot):
+        assert grid_dag(grid_snapshot, "r0c0", "r3c3", max_steps=5) is None
+        assert grid_dag(grid_snapshot, "r0c0", "r3c3", max_steps=6) is not None
+
+    def test_virtual_ends(self, grid_snapshot):
+        # start seeded from two graph words, as for a word outside a frozen vocabulary
+        layers = build_layers(grid_snapshot.adjacency, grid_snapshot.size,
+                              [grid_snapshot.get_id("r0c1"), grid_snapshot.get_id("r1c0")],
+                              [grid_snapshot.get_id("r1c1")], 5)
+        dag = PathDAG(grid_snapshot, layers, prefix=["outside"])
+
+        assert dag.length == 2
+        assert dag.count() == 2
+        assert sorted(dag.iter_paths()) == [["outside", "r0c1", "r1c1"], ["outside", "r1c0", "r1c1"]]
+        assert sorted(dag.next_words("outside")) == ["r0c1", "r1c0"]
+        assert dag.contains(["outside", "r1c0", "r1c1"])
+
+    def test_direct_virtual_path(self, grid_snapshot):
+        dag = PathDAG(grid_snapshot, [], prefix=["outside"], suffix=["other"])
+
+        assert dag.length == 1
+        assert dag.count() == 1
+        assert list(dag.iter_paths()) == [["outside", "other"]]
+        assert dag.next_words("outside") == ["other"]
@@ -0,0 +1,125 @@
+import time
+import pytest
+from app.puzzle_pool import PuzzlePool, Puzzle
+
+def make_puzzle(steps, index=0):
+    path = [f"w{index}_{i}" for i in range(steps + 1)]
+    return Puzzle(path[0], path[-1], path, steps)
+
+class CountingGenerator:
+    # fake puzzle generator producing one puzzle per step count
+    def __init__(self, step_counts=(2, 3, 4, 5, 6)):
+        self.step_counts = step_counts
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return [make_puzzle(steps, self.calls) for steps in self.step_counts]
+
+@pytest.fixture
+def generator():
+    return CountingGenerator()
+
+class TestPuzzlePool:
+    def test_empty_pool(self, generator):
+        pool = PuzzlePool(generator, capacity=4)
+        assert pool.pop() is None
+        assert pool.get_stats()['emptyPops'] == 1
+
+    def test_fill_respects_capacity(self, generator):
+        pool = PuzzlePool(generator, capacity=4)
+        pool.fill()
+
+        assert pool.is_full()
+        assert pool.depth() == {2: 4, 3: 4, 4: 4, 5: 4, 6: 4}
+
+    def test_pop_by_steps(self, generator):
+        pool = PuzzlePool(generator, capacity=2)
+        pool.fill()
+
+        puzzle = pool.pop(steps=5)
+        assert puzzle.steps == 5
+        assert len(puzzle.optimal_path) == 6
+        assert pool.depth()[5] == 1
+
+    def test_pop_random_bucket(self, generator):
+        pool = PuzzlePool(generator, capacity=2)
+        pool.fill()
+
+        puzzle = pool.pop()
+        assert 2 <= puzzle.steps <= 6
+        assert pool.get_stats()['served'] == 1
+
+    def test_out_of_range_puzzles_are_dropped(self):
+        pool = PuzzlePool(lambda: [], capacity=2)
+        assert pool.add([make_puzzle(1), make_puzzle(7), make_puzzle(3)]) == 1
+
+    def test_background_producer_refills(self, generator):
+        pool = PuzzlePool(generator, capacity=3, low_watermark=2)
+        pool.start()
+        try:
+            deadline = time.time() + 5
+            while not pool.is_full() and time.time() < deadline:
+                time.sleep(0.01)
+            assert pool.is_full()
+
+            for _ in range(2):
+                pool.pop(steps=2)
+            deadline = time.time() + 5
+            while pool.depth()[2] < 3 and time.time() < deadline:
+                time.sleep(0.01)
+            assert pool.depth()[2] == 3
+        finally:
+            pool.stop()
+
+    def test_producer_survives_unfillable_bucket(self):
+        generator = CountingGenerator(step_counts=(2, 3))
+        pool = PuzzlePool(generator, capacity=2, low_watermark=1)
+        pool.start()
+        try:
+            deadline = time.time() + 5
+            while pool.depth()[3] < 2 and time.time() < deadline:
+                time.sleep(0.01)
+            assert pool.depth()[2] == 2
+            assert pool.depth()[6] == 0
+        finally:
+            pool.stop()
+
+    def test_unfillable_bucket_is_exhausted(self):
+        generator = CountingGenerator(step_counts=(2, 3))
+        pool = PuzzlePool(generator, capacity=2, low_watermark=1)
+        pool.fill(max_rounds=1000)
+
+        # gives up after DRY_ROUNDS_BEFORE_EXHAUSTED rounds instead of running every round
+        assert generator.calls == PuzzlePool.DRY_ROUNDS_BEFORE_EXHAUSTED
+        assert pool.is_full()
+        assert pool.get_stats()['exhausted'] == [4, 5, 6]
+
+    def test_exhausted_bucket_retried_after_graph_change(self):
+        version = [0]
+        generator = CountingGenerator(step_counts=(2,))
+        pool = PuzzlePool(generator, capacity=2, low_watermark=1, version_fn=lambda: version[0])
+        pool.fill(max_rounds=1000)
+        assert pool.get_stats()['exhausted'] == [3, 4, 5, 6]
+
+        version[0] = 1
+        generator.step_counts = (2, 3, 4, 5, 6)
+        assert not pool.is_full()
+        assert pool.get_stats()['exhausted'] == []
+        pool.fill()
+        assert pool.depth() == {2: 2, 3: 2, 4: 2, 5: 2, 6: 2}
+
+    def test_producer_idles_on_exhausted_buckets(self):
+        generator = CountingGenerator(step_counts=(2, 3))
+        pool = PuzzlePool(generator, capacity=2, low_watermark=1)
+        pool.start()
+        try:
+            deadline = time.time() + 5
+            while not pool.get_stats()['exhausted'] and time.time() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.05)
+            calls = generator.calls
+            time.sleep(0.2)
+            assert generator.calls == calls
+        finally:
+            pool.stop()
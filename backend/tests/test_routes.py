@@ -1,11 +1,15 @@
 import pytest
 import json
+import threading
 from flask import Flask
 from app import create_app
+from app import routes
+from app.initializer import BackgroundInitializer
+from app.executors import BoundedExecutor
 
 @pytest.fixture
 def client():
-    app = create_app()
+    app = create_app(background_init=False)
     app.config['TESTING'] = True
     with app.test_client() as client:
         yield client
@@ -18,6 +22,55 @@ class TestHealthEndpoint:
         data = json.loads(response.data)
         assert data['status'] == 'ok'
 
+class TestReadiness:
+    @pytest.fixture
+    def initializing_client(self, monkeypatch):
+        # background init whose factory blocks until released
+        release = threading.Event()
+
+        def factory():
+            release.wait(5)
+            return object()
+
+        monkeypatch.setattr(routes, '_initializer', BackgroundInitializer(factory))
+        monkeypatch.setattr(routes, '_background_init', False)
+        app = create_app(background_init=False)
+        app.config['TESTING'] = True
+        routes.start_background_init()
+        with app.test_client() as client:
+            yield client, release
+        release.set()
+
+    def test_game_routes_fail_fast_until_ready(self, initializing_client):
+        client, _ = initializing_client
+        response = client.get('/api/game/new')
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == str(routes.RETRY_AFTER_SECONDS)
+        data = json.loads(response.data)
+        assert data['success'] is False
+        assert data['status'] == 'initializing'
+
+    def test_health_answers_while_initializing(self, initializing_client):
+        client, _ = initializing_client
+        assert client.get('/api/health').status_code == 200
+
+    def test_ready_reports_progress(self, initializing_client):
+        client, release = initializing_client
+        response = client.get('/api/ready')
+
+        assert response.status_code == 503
+        assert 'Retry-After' in response.headers
+        data = json.loads(response.data)
+        assert data['ready'] is False
+        assert isinstance(data['phases'], list)
+
+        release.set()
+        routes.get_game_service(timeout=5)
+        response = client.get('/api/ready')
+        assert response.status_code == 200
+        assert json.loads(response.data)['ready'] is True
+
 class TestNewGameEndpoint:    
     def test_new_game_success(self, client):
         response = client.get('/api/game/new')
@@ -220,6 +273,23 @@ class TestScoreEndpoint:
         data = json.loads(response.data)
         assert 'algorithmPath' in data
 
+    def test_calculate_score_returns_alternatives(self, client):
+        response = client.post('/api/game/score',
+                              json={
+                                  'path': ['cat', 'dog'],
+                                  'startWord': 'cat',
+                                  'targetWord': 'dog'
+                              })
+
+        data = json.loads(response.data)
+        assert isinstance(data['optimalPathCount'], int)
+        assert isinstance(data['alternativePaths'], list)
+        if data['algorithmPath']:
+            assert data['optimalPathCount'] >= 1
+            assert len(data['alternativePaths']) <= 3
+            assert data['algorithmPath'] not in data['alternativePaths']
+            assert all(len(p) == len(data['algorithmPath']) for p in data['alternativePaths'])
+
 class TestSubmitEndpoint:
     def test_submit_chain(self, client):
         game_response = client.get('/api/game/new')
@@ -289,6 +359,17 @@ class TestSimilarityEndpoint:
         data = json.loads(response.data)
         assert data['success'] is False
 
+    def test_get_similarity_unknown_word(self, client):
+        response = client.post('/api/word/similarity',
+                              json={
+                                  'word1': 'cat',
+                                  'word2': 'xyzqwerty'
+                              })
+
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert data['success'] is False
+
 class TestHintEndpoint:
     def test_get_hint_success(self, client):
         game_response = client.get('/api/game/new')
@@ -338,6 +419,59 @@ class TestHintEndpoint:
         
         assert response.status_code in [200, 404]
 
+class TestExecutors:
+    @pytest.fixture
+    def busy_search(self, monkeypatch):
+        # a search executor whose only slot is held until released
+        executor = BoundedExecutor('search', max_workers=1)
+        release = threading.Event()
+        started = threading.Event()
+
+        def hold():
+            started.set()
+            release.wait(5)
+
+        executor.submit(hold)
+        assert started.wait(5)
+        monkeypatch.setattr(routes, 'search_executor', executor)
+        yield executor
+        release.set()
+        executor.shutdown()
+
+    def test_heavy_request_fails_fast_when_busy(self, client, busy_search):
+        response = client.post('/api/game/score',
+                              json={
+                                  'path': ['cat', 'dog'],
+                                  'startWord': 'cat',
+                                  'targetWord': 'dog'
+                              })
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == str(routes.BUSY_RETRY_AFTER_SECONDS)
+        data = json.loads(response.data)
+        assert data['success'] is False
+        assert busy_search.get_stats()['rejected'] == 1
+
+    def test_cheap_requests_answer_while_busy(self, client, busy_search):
+        game_service = routes.get_game_service()
+        start_word, target_word = game_service.semantic_graph.get_all_words()[:2]
+        # warm the target's distance field, the hint is then a lookup
+        game_service.get_distance_field(target_word)
+
+        response = client.get('/api/game/hint',
+                            query_string={'startWord': start_word, 'targetWord': target_word})
+        assert response.status_code in [200, 404]
+
+        response = client.post('/api/word/validate', json={'word': start_word})
+        assert response.status_code == 200
+        assert busy_search.get_stats()['rejected'] == 0
+
+    def test_stats_report_executors(self, client):
+        response = client.get('/api/stats')
+        executors = json.loads(response.data)['stats']['executors']
+        assert set(executors) == {'inference', 'search'}
+        assert 'rejected' in executors['search']
+
 class TestStatsEndpoint:
     def test_get_stats(self, client):
         response = client.get('/api/stats')
@@ -351,4 +485,16 @@ class TestStatsEndpoint:
         assert 'wordsInGraph' in stats
         assert 'similarityThreshold' in stats
         assert 'embeddingModel' in stats
-        assert 'embeddingDimension' in stats
\ No newline at end of file
+        assert 'embeddingDimension' in stats
+
+class TestStartupEndpoint:
+    def test_get_startup_report(self, client):
+        response = client.get('/api/startup')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['success'] is True
+        report = data['startup']
+        assert 'uptimeSeconds' in report
+        assert 'torchImported' in report
+        assert 'routes_import' in [phase['name'] for phase in report['phases']]
@@ -1,3 +1,5 @@
+import time
+import threading
 import pytest
 import numpy as np
 from app.semantic_graph import SemanticGraph
@@ -74,16 +76,24 @@ class TestSemanticGraph:
         assert word1 in semantic_graph.word_embeddings
         assert word2 in semantic_graph.word_embeddings
     
-    def test_similarity_caching(self, semantic_graph):
-        word1 = "cat"
-        word2 = "dog"
-        
-        similarity1 = semantic_graph.get_similarity(word1, word2)
-        similarity2 = semantic_graph.get_similarity(word1, word2)
+    def test_similarity_is_symmetric_and_stable(self, semantic_graph):
+        similarity1 = semantic_graph.get_similarity("cat", "dog")
+        similarity2 = semantic_graph.get_similarity("cat", "dog")
         
         assert similarity1 == similarity2
-        cache_key = tuple(sorted([word1, word2]))
-        assert cache_key in semantic_graph.similarity_cache
+        assert similarity1 == pytest.approx(semantic_graph.get_similarity("dog", "cat"))
+
+    def test_get_similarities_matches_pairwise(self, semantic_graph):
+        pairs = [("cat", "dog"), ("dog", "bird"), ("Bird", "cat")]
+        similarities = semantic_graph.get_similarities(pairs)
+
+        assert similarities.shape == (3,)
+        for (word1, word2), similarity in zip(pairs, similarities):
+            assert similarity == pytest.approx(semantic_graph.get_similarity(word1, word2), abs=1e-6)
+        assert semantic_graph.word_exists("bird")
+
+    def test_get_similarities_empty(self, semantic_graph):
+        assert len(semantic_graph.get_similarities([])) == 0
     
     def test_are_connected_high_similarity(self, semantic_graph):
         word1 = "cat"
@@ -214,4 +224,404 @@ class TestSemanticGraph:
         
         assert len(semantic_graph.word_embeddings) == 50        
         neighbors = semantic_graph.get_neighbors("word0")
-        assert isinstance(neighbors, set)
\ No newline at end of file
+        assert isinstance(neighbors, set)
+
+    def test_chain_graph_neighbors(self, chain_graph):
+        assert chain_graph.get_neighbors("step0") == {"step1"}
+        assert chain_graph.get_neighbors("step3") == {"step2", "step4"}
+
+    def test_bfs_path_finds_shortest_path(self, chain_graph, chain_words):
+        for i in range(len(chain_words)):
+            for j in range(len(chain_words)):
+                expected = chain_words[i:j + 1] if i <= j else chain_words[j:i + 1][::-1]
+                assert chain_graph.bfs_path(chain_words[i], chain_words[j]) == expected
+
+    def test_bfs_path_strictly_respects_max_steps(self, chain_graph):
+        assert len(chain_graph.bfs_path("step0", "step6", max_steps=6)) == 7
+        assert chain_graph.bfs_path("step0", "step6", max_steps=5) is None
+        assert chain_graph.bfs_path("step0", "step2", max_steps=1) is None
+        assert chain_graph.bfs_path("step0", "step1", max_steps=1) == ["step0", "step1"]
+
+    def test_bfs_path_disconnected_words(self, chain_graph):
+        chain_graph.add_word("island")
+        assert chain_graph.bfs_path("step0", "island") is None
+
+    def test_level_bfs_distances(self, chain_graph, chain_words):
+        distances, path = chain_graph.level_bfs("step2", max_steps=6)
+
+        assert path is None
+        assert distances == {"step0": 2, "step1": 1, "step2": 0, "step3": 1,
+                             "step4": 2, "step5": 3, "step6": 4}
+
+    def test_level_bfs_path_matches_bfs_path(self, chain_graph, chain_words):
+        distances, path = chain_graph.level_bfs("step0", "step5")
+
+        assert path == chain_words[:6]
+        assert distances["step5"] == len(path) - 1
+
+    def test_level_bfs_respects_max_steps(self, chain_graph):
+        distances, path = chain_graph.level_bfs("step0", "step4", max_steps=3)
+
+        assert path is None
+        assert set(distances) == {"step0", "step1", "step2", "step3"}
+
+    def test_bfs_path_is_cached(self, chain_graph):
+        path1 = chain_graph.bfs_path("step0", "step3")
+        path2 = chain_graph.bfs_path("step0", "step3")
+
+        assert path1 == path2
+        stats = chain_graph.get_path_cache_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+
+    def test_cached_path_is_a_copy(self, chain_graph):
+        chain_graph.bfs_path("step0", "step3").append("mutated")
+        assert chain_graph.bfs_path("step0", "step3") == ["step0", "step1", "step2", "step3"]
+
+    def test_missing_paths_are_cached(self, chain_graph):
+        assert chain_graph.bfs_path("step0", "step6", max_steps=2) is None
+        assert chain_graph.bfs_path("step0", "step6", max_steps=2) is None
+        assert chain_graph.get_path_cache_stats()['hits'] == 1
+
+    def test_path_dag(self, chain_graph):
+        dag = chain_graph.path_dag("step0", "step3")
+        assert dag.count() == 1
+        assert list(dag.iter_paths()) == [chain_graph.bfs_path("step0", "step3")]
+        assert chain_graph.path_dag("step0", "step6", max_steps=5) is None
+        assert list(chain_graph.path_dag("step2", "step2").iter_paths()) == [["step2"]]
+
+    def test_path_dag_counts_parallel_routes(self, chain_graph, chain_embedding_service):
+        # a word at 52 degrees is next to step0, step1 and step2, a second way through step1's place
+        twin = np.zeros(384, dtype=np.float32)
+        twin[0], twin[1] = np.cos(np.radians(52)), np.sin(np.radians(52))
+        chain_graph.add_words(["twin"], twin.reshape(1, -1))
+
+        dag = chain_graph.path_dag("step0", "step3")
+        assert dag.count() == 2
+        assert sorted(dag.iter_paths()) == [["step0", "step1", "step2", "step3"], ["step0", "twin", "step2", "step3"]]
+        assert sorted(dag.next_words("step0")) == ["step1", "twin"]
+
+    def test_has_cached_path(self, chain_graph):
+        assert not chain_graph.has_cached_path("step0", "step3")
+        chain_graph.bfs_path("step0", "step3")
+
+        assert chain_graph.has_cached_path("Step0", "step3")
+        assert not chain_graph.has_cached_path("step0", "step3", max_steps=2)
+        assert not chain_graph.has_cached_path("step0", "unknown")
+        assert chain_graph.get_path_cache_stats()['hits'] == 0
+
+    def test_graph_version_only_bumps_when_edges_are_added(self, chain_graph):
+        version = chain_graph.version
+        chain_graph.bfs_path("step0", "step3")
+
+        # an isolated word adds no edges, so cached paths stay valid
+        chain_graph.add_word("island")
+        assert chain_graph.version == version
+        chain_graph.bfs_path("step0", "step3")
+        assert chain_graph.get_path_cache_stats()['hits'] == 1
+
+    def test_new_edges_invalidate_path_cache(self, chain_graph, chain_embedding_service):
+        chain_graph.bfs_path("step0", "step3")
+        version = chain_graph.version
+
+        # a word between step0 and step1 connects to both
+        shortcut = np.zeros(384, dtype=np.float32)
+        shortcut[0], shortcut[1] = np.cos(np.radians(25)), np.sin(np.radians(25))
+        chain_embedding_service.encode_word.side_effect = lambda word: shortcut
+        chain_graph.add_word("between")
+
+        assert chain_graph.version > version
+        chain_graph.bfs_path("step0", "step3")
+        stats = chain_graph.get_path_cache_stats()
+        assert stats['hits'] == 0
+        assert stats['invalidations'] >= 1
+
+@pytest.fixture
+def frozen_chain_graph(chain_embedding_service, chain_words):
+    # the chain without step3, which stays outside the frozen vocabulary
+    graph = SemanticGraph(chain_embedding_service, similarity_threshold=0.6, query_cache_size=4)
+    graph.add_words([word for word in chain_words if word != "step3"])
+    graph.freeze_vocabulary()
+    return graph
+
+class TestFrozenVocabulary:
+    def test_outside_words_are_not_inserted(self, frozen_chain_graph):
+        version = frozen_chain_graph.version
+        edges = frozen_chain_graph.adjacency.num_edges
+
+        assert frozen_chain_graph.get_neighbors("step3") == {"step2", "step4"}
+        frozen_chain_graph.get_similarity("step3", "step2")
+        frozen_chain_graph.add_word("island")
+
+        assert not frozen_chain_graph.word_exists("step3")
+        assert not frozen_chain_graph.word_exists("island")
+        assert len(frozen_chain_graph.get_all_words()) == 6
+        assert frozen_chain_graph.adjacency.num_edges == edges
+        assert frozen_chain_graph.version == version
+
+    def test_similarity_with_outside_word(self, frozen_chain_graph):
+        assert frozen_chain_graph.are_connected("step3", "step4")
+        assert not frozen_chain_graph.are_connected("step3", "step0")
+
+        similarities = frozen_chain_graph.get_similarities([("step2", "step3"), ("step3", "step0")])
+        assert similarities[0] >= 0.6 > similarities[1]
+        assert not frozen_chain_graph.word_exists("step3")
+
+    def test_bfs_path_through_outside_words(self, frozen_chain_graph):
+        assert frozen_chain_graph.bfs_path("step3", "step6") == ["step3", "step4", "step5", "step6"]
+        assert frozen_chain_graph.bfs_path("step0", "step3") == ["step0", "step1", "step2", "step3"]
+        assert frozen_chain_graph.bfs_path("step3", "step6", max_steps=2) is None
+        assert frozen_chain_graph.bfs_path("step3", "island") is None
+
+    def test_graph_path_avoids_outside_words(self, frozen_chain_graph):
+        # step3 isn't a graph node, so step2 and step4 are disconnected
+        assert frozen_chain_graph.bfs_path("step0", "step6") is None
+
+    def test_path_dag_through_outside_words(self, frozen_chain_graph):
+        dag = frozen_chain_graph.path_dag("step3", "step6")
+        assert list(dag.iter_paths()) == [["step3", "step4", "step5", "step6"]]
+        assert dag.contains(["step3", "step4", "step5", "step6"])
+        assert frozen_chain_graph.path_dag("step3", "step6", max_steps=2) is None
+
+    def test_level_bfs_from_outside_word(self, frozen_chain_graph):
+        distances, path = frozen_chain_graph.level_bfs("step3", "step0")
+        assert distances["step3"] == 0
+        assert distances["step2"] == 1
+        assert distances["step0"] == 3
+        assert "step6" in distances
+        assert path == ["step3", "step2", "step1", "step0"]
+
+    def test_level_bfs_to_outside_word(self, frozen_chain_graph):
+        distances, path = frozen_chain_graph.level_bfs("step5", "step3")
+        assert distances["step3"] == 2
+        assert path == ["step5", "step4", "step3"]
+
+        distances, path = frozen_chain_graph.level_bfs("step5", "step3", max_steps=1)
+        assert "step3" not in distances
+        assert path is None
+
+    def test_query_embeddings_are_bounded(self, frozen_chain_graph):
+        for i in range(10):
+            frozen_chain_graph.get_neighbors(f"outside{i}")
+
+        stats = frozen_chain_graph.get_query_cache_stats()
+        assert stats['entries'] == 4
+        assert stats['evictions'] == 6
+        assert stats['vocabularyFrozen'] is True
+
+@pytest.fixture
+def sphere_graph(chain_embedding_service):
+    # 300 random points on a 3-d sphere (padded to 384 dims), neighbors within ~26 degrees
+    rng = np.random.default_rng(7)
+    points = rng.normal(size=(300, 3))
+    points /= np.linalg.norm(points, axis=1, keepdims=True)
+    words = [f"p{i}" for i in range(len(points))]
+    embeddings = np.zeros((len(points), 384), dtype=np.float32)
+    embeddings[:, :3] = points
+    graph = SemanticGraph(chain_embedding_service, similarity_threshold=0.9)
+    graph.add_words(words, embeddings)
+    return graph
+
+class TestAStar:
+    def test_hop_bounds_never_overestimate(self, sphere_graph):
+        distances, _ = sphere_graph.level_bfs("p0", max_steps=20)
+        words = list(distances)
+        snapshot = sphere_graph.snapshot()
+        vectors = snapshot.embeddings.vectors([snapshot.get_id(word) for word in words])
+        bounds = sphere_graph.hop_lower_bounds(vectors, snapshot.embeddings.vector(snapshot.get_id("p0")))
+
+        assert all(bound <= distances[word] for word, bound in zip(words, bounds.tolist()))
+        assert bounds.max() > 1
+        # every word is 0 hops from itself despite float32 rounding
+        self_bounds = [sphere_graph.hop_lower_bounds(vectors[i:i + 1], vectors[i])[0] for i in range(len(vectors))]
+        assert max(self_bounds) == 0
+
+    def test_astar_matches_bfs_lengths(self, sphere_graph):
+        for i in range(1, 300):
+            target = f"p{i}"
+            bfs = sphere_graph.find_path("p0", target, max_steps=8, method='bfs')
+            astar = sphere_graph.find_path("p0", target, max_steps=8, method='astar')
+            if bfs is None:
+                assert astar is None
+                continue
+            assert len(astar) == len(bfs)
+            assert astar[0] == "p0" and astar[-1] == target
+            assert all(sphere_graph.are_connected(a, b) for a, b in zip(astar, astar[1:]))
+
+    def test_astar_expands_fewer_nodes(self, sphere_graph):
+        bfs_stats = {}
+        astar_stats = {}
+        for i in range(1, 60):
+            sphere_graph.find_path("p0", f"p{i}", max_steps=8, method='bfs', stats=bfs_stats)
+            sphere_graph.find_path("p0", f"p{i}", max_steps=8, method='astar', stats=astar_stats)
+
+        assert 0 < astar_stats['expanded'] < bfs_stats['expanded']
+
+    def test_weighted_astar_is_bounded(self, sphere_graph):
+        for i in range(1, 30):
+            optimal = sphere_graph.find_path("p0", f"p{i}", max_steps=8, method='bfs')
+            weighted = sphere_graph.find_path("p0", f"p{i}", max_steps=8, method='astar', weight=2.0)
+            if optimal is None:
+                continue
+            assert weighted is not None
+            assert len(weighted) - 1 <= 2 * (len(optimal) - 1)
+
+    def test_bfs_path_uses_configured_search(self, chain_embedding_service, chain_words):
+        graph = SemanticGraph(chain_embedding_service, similarity_threshold=0.6, path_search='astar')
+        graph.add_words(chain_words)
+
+        assert graph.bfs_path("step0", "step3") == ["step0", "step1", "step2", "step3"]
+        assert graph.bfs_path("step0", "step6", max_steps=5) is None
+
+    def test_astar_with_outside_words(self, frozen_chain_graph):
+        frozen_chain_graph.path_search = 'astar'
+        assert frozen_chain_graph.bfs_path("step3", "step6") == ["step3", "step4", "step5", "step6"]
+
+    def test_unknown_search_method(self, chain_graph, chain_embedding_service):
+        with pytest.raises(ValueError):
+            SemanticGraph(chain_embedding_service, path_search='dijkstra')
+        with pytest.raises(ValueError):
+            chain_graph.find_path("step0", "step3", method='dijkstra')
+
+class TestLandmarks:
+    def test_pruned_searches_match_unpruned(self, sphere_graph, chain_embedding_service):
+        plain = {}
+        for method in ('bfs', 'astar'):
+            for i in range(1, 300):
+                path = sphere_graph.find_path("p0", f"p{i}", max_steps=6, method=method)
+                plain[method, i] = len(path) if path else None
+
+        sphere_graph.build_landmarks(16)
+        for method in ('bfs', 'astar'):
+            for i in range(1, 300):
+                path = sphere_graph.find_path("p0", f"p{i}", max_steps=6, method=method)
+                assert (len(path) if path else None) == plain[method, i]
+                if path:
+                    assert all(sphere_graph.are_connected(a, b) for a, b in zip(path, path[1:]))
+
+    def test_landmarks_reduce_expansions(self, sphere_graph):
+        before = {}
+        for i in range(1, 100):
+            sphere_graph.find_path("p0", f"p{i}", max_steps=4, method='bfs', stats=before)
+        sphere_graph.build_landmarks(16)
+        after = {}
+        for i in range(1, 100):
+            sphere_graph.find_path("p0", f"p{i}", max_steps=4, method='bfs', stats=after)
+
+        assert after['expanded'] < before['expanded']
+
+    def test_distance_bounds(self, sphere_graph):
+        assert sphere_graph.distance_bounds("p0", "p5") == (1, None)
+        sphere_graph.build_landmarks(16)
+        distances, _ = sphere_graph.level_bfs("p0", max_steps=50)
+
+        assert sphere_graph.distance_bounds("p0", "P0") == (0, 0)
+        for i in range(1, 300):
+            bounds = sphere_graph.distance_bounds("p0", f"p{i}")
+            if f"p{i}" in distances:
+                lower, upper = bounds
+                assert lower <= distances[f"p{i}"] <= upper
+        with pytest.raises(ValueError):
+            sphere_graph.distance_bounds("p0", "unknown")
+
+    def test_disconnected_words(self, chain_embedding_service, chain_words):
+        # two separate chains: step0..step2 and step4..step6
+        graph = SemanticGraph(chain_embedding_service, similarity_threshold=0.6)
+        graph.add_words(chain_words[:3] + chain_words[4:])
+        graph.build_landmarks(4)
+
+        assert graph.distance_bounds("step0", "step5") is None
+        assert graph.distance_bounds("step0", "step2") == (2, 2)
+        stats = {}
+        assert graph.find_path("step0", "step5", stats=stats) is None
+        assert stats.get('expanded', 0) == 0
+
+    def test_tables_follow_added_words(self, chain_embedding_service, chain_words):
+        graph = SemanticGraph(chain_embedding_service, similarity_threshold=0.6)
+        graph.add_words(chain_words[:3] + chain_words[4:])
+        graph.build_landmarks(4)
+        graph.add_words(["step3"])
+
+        assert graph.get_landmark_stats()['words'] == 7
+        assert graph.distance_bounds("step0", "step5")[0] <= 5
+        assert graph.find_path("step0", "step6") == chain_words
+        landmark_ids, distances = graph.export_landmarks()
+        snapshot = graph.snapshot()
+        for landmark, row in zip(landmark_ids.tolist(), distances):
+            levels, _ = graph.level_bfs(snapshot.embeddings.words[landmark], max_steps=10)
+            assert {word: int(row[snapshot.get_id(word)]) for word in chain_words} == levels
+
+    def test_load_landmarks(self, chain_graph):
+        assert chain_graph.export_landmarks() is None
+        chain_graph.build_landmarks(2)
+        landmark_ids, distances = chain_graph.export_landmarks()
+
+        chain_graph.load_landmarks(landmark_ids, distances)
+        assert chain_graph.get_landmark_stats() == {'landmarks': 2, 'words': 7, 'bytes': 2 * 7 + 2 * 4}
+        with pytest.raises(ValueError):
+            chain_graph.load_landmarks(landmark_ids, distances[:, :5])
+
+class TestConcurrency:
+    def test_snapshot_is_immutable(self, chain_graph):
+        snapshot = chain_graph.snapshot()
+        chain_graph.add_word("island")
+
+        assert snapshot.get_id("island") is None
+        assert snapshot.size == 7
+        assert chain_graph.snapshot().get_id("island") == 7
+
+    def test_queued_inserts_share_one_commit(self, chain_graph):
+        commits = chain_graph.commits
+        words = [f"queued{i}" for i in range(5)]
+
+        # hold the writer lock so every insert queues up behind it
+        with chain_graph._write_lock:
+            threads = [threading.Thread(target=chain_graph.add_word, args=(word,)) for word in words]
+            for thread in threads:
+                thread.start()
+            deadline = time.monotonic() + 5
+            while len(chain_graph._pending) < len(words) and time.monotonic() < deadline:
+                time.sleep(0.001)
+        for thread in threads:
+            thread.join()
+
+        assert chain_graph.commits == commits + 1
+        assert all(chain_graph.word_exists(word) for word in words)
+        assert chain_graph.get_write_stats()['pendingInserts'] == 0
+
+    def test_reads_during_writes(self, chain_graph):
+        errors = []
+        stop = threading.Event()
+
+        def read():
+            try:
+                while not stop.is_set():
+                    assert chain_graph.bfs_path("step0", "step3") == ["step0", "step1", "step2", "step3"]
+                    assert "step1" in chain_graph.get_neighbors("step0")
+                    chain_graph.level_bfs("step6")
+            except Exception as e:
+                errors.append(e)
+
+        def write(offset):
+            try:
+                for i in range(30):
+                    chain_graph.add_word(f"extra{offset}_{i}")
+            except Exception as e:
+                errors.append(e)
+
+        readers = [threading.Thread(target=read) for _ in range(3)]
+        writers = [threading.Thread(target=write, args=(n,)) for n in range(3)]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+
+        assert not errors
+        assert len(chain_graph.get_all_words()) == 7 + 90
+        adjacency = chain_graph.adjacency
+        for node in range(len(chain_graph.get_all_words())):
+            for neighbor in adjacency.neighbors(node).tolist():
+                assert adjacency.has_edge(neighbor, node)
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import pytest
+from app.startup import StartupTimer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestStartupTimer:
+    def test_records_phases_in_order(self):
+        timer = StartupTimer()
+        with timer.phase('first'):
+            pass
+        with timer.phase('second'):
+            pass
+
+        phases = timer.get_phases()
+        assert [phase['name'] for phase in phases] == ['first', 'second']
+        assert all(phase['status'] == 'done' for phase in phases)
+        assert all(phase['seconds'] >= 0 for phase in phases)
+
+    def test_failed_phase(self):
+        timer = StartupTimer()
+        with pytest.raises(ValueError):
+            with timer.phase('broken'):
+                raise ValueError("boom")
+
+        assert timer.get_phases()[0]['status'] == 'failed'
+
+    def test_running_phase(self):
+        timer = StartupTimer()
+        with timer.phase('slow'):
+            phase = timer.get_phases()[0]
+            assert phase['status'] == 'running'
+            assert phase['seconds'] is None
+
+    def test_report(self):
+        report = StartupTimer().get_report()
+        assert report['phases'] == []
+        assert report['uptimeSeconds'] >= 0
+        assert report['modulesLoaded'] > 0
+
+
+class TestLazyImport:
+    def test_create_app_does_not_import_ml_stack(self):
+        # run in a fresh interpreter, other tests in this process load the model
+        code = (
+            "import sys\n"
+            "from app import create_app\n"
+            "create_app(background_init=False)\n"
+            "assert 'sentence_transformers' not in sys.modules\n"
+            "assert 'torch' not in sys.modules\n"
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
@@ -174,6 +174,78 @@ describe('API Utility Functions', () => {
       )
     })
 
+    test('should retry busy responses after Retry-After', async () => {
+      const busyHeaders = new Headers()
+      busyHeaders.set('retry-after', '0')
+      const mockHeaders = new Headers()
+      mockHeaders.set('content-type', 'application/json')
+
+      fetch.mockResolvedValueOnce({
+        ok: false,
+        status: 503,
+        json: async () => ({ success: false, error: 'busy' }),
+        headers: busyHeaders,
+      })
+      fetch.mockResolvedValueOnce({
+        ok: true,
+        status: 200,
+        json: async () => ({ success: true, stats: {} }),
+        headers: mockHeaders,
+      })
+
+      const result = await api.getStats()
+
+      expect(fetch).toHaveBeenCalledTimes(2)
+      expect(result.success).toBe(true)
+    })
+
+    test('should wait a second before retrying a 503 without Retry-After', async () => {
+      jest.useFakeTimers()
+      const mockHeaders = new Headers()
+      mockHeaders.set('content-type', 'application/json')
+
+      fetch.mockResolvedValueOnce({
+        ok: false,
+        status: 503,
+        text: async () => 'Service Unavailable',
+        headers: new Headers(),
+      })
+      fetch.mockResolvedValueOnce({
+        ok: true,
+        status: 200,
+        json: async () => ({ success: true, stats: {} }),
+        headers: mockHeaders,
+      })
+
+      try {
+        const pending = api.getStats()
+        await jest.advanceTimersByTimeAsync(999)
+        expect(fetch).toHaveBeenCalledTimes(1)
+        await jest.advanceTimersByTimeAsync(1)
+        const result = await pending
+        expect(fetch).toHaveBeenCalledTimes(2)
+        expect(result.success).toBe(true)
+      } finally {
+        jest.useRealTimers()
+      }
+    })
+
+    test('should report a busy server after repeated 503s', async () => {
+      const busyHeaders = new Headers()
+      busyHeaders.set('retry-after', '0')
+
+      fetch.mockResolvedValue({
+        ok: false,
+        status: 503,
+        json: async () => ({ success: false, error: 'busy' }),
+        headers: busyHeaders,
+      })
+
+      await expect(api.getStats()).rejects.toThrow('server is busy')
+      expect(fetch).toHaveBeenCalledTimes(4)
+      fetch.mockReset()
+    })
+
     test('should handle non-JSON responses', async () => {
       const mockHeaders = new Headers()
       mockHeaders.set('content-type', 'text/html')
@@ -5,6 +5,37 @@ const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || (
     : 'https://6-degrees-production.up.railway.app/api'
 )
 
+// The backend answers 503 with a Retry-After header while it starts up or when its
+// inference / search executors are full; such requests are retried a few times
+const MAX_BUSY_RETRIES = 3
+const MAX_RETRY_DELAY_SECONDS = 10
+const BUSY_MESSAGE = 'The server is busy right now. Please try again in a moment.'
+
+function retryDelayMs(response) {
+  // proxies and the hosting platform answer 503 without the header: use the fallback
+  const raw = response.headers.get('retry-after')
+  if (raw === null || raw.trim() === '') {
+    return 1000
+  }
+  const seconds = Number(raw)
+  if (!Number.isFinite(seconds) || seconds < 0) {
+    return 1000
+  }
+  return Math.min(seconds, MAX_RETRY_DELAY_SECONDS) * 1000
+}
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms))
+
+async function fetchWithRetry(url, config) {
+  for (let attempt = 0; ; attempt++) {
+    const response = await fetch(url, config)
+    if (response.status !== 503 || attempt >= MAX_BUSY_RETRIES) {
+      return response
+    }
+    await sleep(retryDelayMs(response))
+  }
+}
+
 async function apiRequest(endpoint, options = {}) {
   const url = `${API_BASE_URL}${endpoint}`
   const config = {
@@ -16,7 +47,10 @@ async function apiRequest(endpoint, options = {}) {
   }
 
   try {
-    const response = await fetch(url, config)
+    const response = await fetchWithRetry(url, config)
+    if (response.status === 503) {
+      throw new Error(BUSY_MESSAGE)
+    }
     
     // Handle non-JSON responses
     let data